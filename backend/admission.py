@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+# Priorities: interactive requests (someone is waiting on the page) always
+# go ahead of bulk work (ingestion) waiting for the same stage.
+INTERACTIVE = 0
+BULK = 1
+
+# Recent samples kept per latency window
+LATENCY_WINDOW = 1000
+
+
+class Overloaded(HTTPException):
+    """A request shed because a stage is full; tells the client when to come back."""
+
+    def __init__(self, stage: str, status_code: int, retry_after: float):
+        super().__init__(
+            status_code=status_code,
+            detail=f"Server busy ({stage}); retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class LatencyWindow:
+    """Summary (mean, p95, max) of the most recent samples, in milliseconds."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds * 1000)
+
+    def stats(self) -> dict:
+        if not self._samples:
+            return {"count": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self._samples)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+
+class AdmissionStage:
+    """
+    Bounded concurrency for one stage of work, with a bounded wait queue in
+    front of it.
+
+    At most `concurrency` callers hold a slot at once; the rest wait, best
+    priority first (FIFO within a priority). `reserved` of the slots are
+    only ever given to INTERACTIVE callers, so a full load of bulk work can't
+    make a recruiter wait for a whole bulk job to finish. When `max_queue`
+    callers are already waiting, new ones are rejected at once with
+    `status_code` and a Retry-After estimated from recent service times,
+    unless they ask not to be shed (internal work that is already bounded).
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, reserved: int = 0, status_code: int = 503):
+        if not 0 <= reserved < concurrency:
+            raise ValueError(f"{name}: reserved slots must be fewer than the {concurrency} slots")
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.reserved = reserved
+        self.status_code = status_code
+        self._active = 0
+        self._active_bulk = 0
+        self._queued = 0
+        self._waiters = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self._service_seconds = 0.0  # moving average of slot hold time
+        self.admitted = 0
+        self.rejected = 0
+        self.wait = LatencyWindow()
+
+    def _can_start(self, priority: int) -> bool:
+        if self._active >= self.concurrency:
+            return False
+        return priority == INTERACTIVE or self._active_bulk < self.concurrency - self.reserved
+
+    def _take(self, priority: int):
+        self._active += 1
+        if priority != INTERACTIVE:
+            self._active_bulk += 1
+
+    def _release(self, priority: int):
+        self._active -= 1
+        if priority != INTERACTIVE:
+            self._active_bulk -= 1
+        self._wake()
+
+    def _wake(self):
+        """Hands free slots to the waiters, in priority order."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_start(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._queued -= 1
+            self._take(priority)
+            future.set_result(None)
+
+    def retry_after(self) -> float:
+        """Seconds until a slot is likely free for a caller joining the queue now."""
+        return (self._queued / self.concurrency + 1) * self._service_seconds
+
+    @asynccontextmanager
+    async def slot(self, priority: int = BULK, shed: bool = True):
+        start = time.perf_counter()
+        waiting_ahead = self._waiters and self._waiters[0][0] <= priority
+        if not waiting_ahead and self._can_start(priority):
+            self._take(priority)
+        else:
+            if shed and self._queued >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.name, self.status_code, self.retry_after())
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._queued += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(priority)  # The slot was handed over just as we were cancelled
+                else:
+                    future.cancel()
+                    self._queued -= 1
+                raise
+
+        self.admitted += 1
+        started = time.perf_counter()
+        self.wait.add(started - start)
+        try:
+            yield
+        finally:
+            self._service_seconds += 0.1 * (time.perf_counter() - started - self._service_seconds)
+            self._release(priority)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "reserved_interactive": self.reserved,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait": self.wait.stats(),
+            "service_ms": round(self._service_seconds * 1000, 2),
+        }
+
+
+class QueueBacklog:
+    """
+    Admission check on the depth of a durable queue: new work is refused
+    with 503 once `limit` items are waiting. The depth is re-counted at most
+    every `refresh_seconds`, so the check costs no query on most requests.
+    """
+
+    def __init__(self, name: str, count: Callable[[], Awaitable[int]], limit: int,
+                 refresh_seconds: float = 1.0, retry_after: float = 30.0):
+        self.name = name
+        self._count = count
+        self.limit = limit
+        self.refresh_seconds = refresh_seconds
+        self.retry_after = retry_after
+        self._depth: Optional[int] = None
+        self._counted_at = 0.0
+        self.rejected = 0
+
+    async def depth(self) -> int:
+        if self._depth is None or time.monotonic() - self._counted_at > self.refresh_seconds:
+            self._depth = await self._count()
+            self._counted_at = time.monotonic()
+        return self._depth
+
+    async def check(self, incoming: int = 1):
+        depth = await self.depth()
+        if depth + incoming > self.limit:
+            self.rejected += 1
+            raise Overloaded(self.name, 503, self.retry_after)
+        self._depth = depth + incoming  # Count what we're about to add until the next recount
+
+    def stats(self) -> dict:
+        return {"depth": self._depth, "limit": self.limit, "rejected": self.rejected}
@@ -1,36 +1,43 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
-from sentence_transformers import SentenceTransformer, util
 from fastapi.middleware.cors import CORSMiddleware
-from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import List
-from datetime import datetime
-from fuzzywuzzy import fuzz, process
-from dateutil import parser
+from typing import List, Optional
+from datetime import datetime, timezone
 from collections import Counter
 from pydantic import BaseModel
-import nltk
-from nltk.corpus import stopwords
-import spacy
-import pymongo
 import os
-import requests
 from bson import ObjectId
 from dotenv import load_dotenv
-from io import BytesIO
-from pdfminer.high_level import extract_text
-from docx import Document
+from extraction import EXTRACTOR_VERSION, ExtractionPool, ExtractionTimeout
+from extraction_cache import ExtractionCache
+from warm_start import load_taxonomy
+from fuzzy_matching import FuzzySkillIndex
+from skill_dictionary import SkillDictionary
+from repository import create_repository
+from task_queue import TaskError, TaskWorker
+from admission import BULK, INTERACTIVE, AdmissionStage, QueueBacklog
+from nlp_models import PRELOAD_ENGINES, loaded_engines, preload
+from embedding_server import EmbeddingClient
+from embedding_store import CachedEmbedder
+from embeddings import EmbeddingError
+from semantic_matching import create_semantic_index
+from resume_retrieval import create_resume_index
+from leaderboard import MAX_PAGE_SIZE, Leaderboard, decode_cursor, encode_cursor, score_version
+from skill_bitsets import bitset_width, ids_from_bitset, overlap, stack_bitsets, to_bitset, to_bytes
+from resume_sections import extract_education, extract_skills, extract_work_experience, segment_sections
 import logging
 import re
-import torch
+import asyncio
+import hashlib
+import zipfile
 import json
 import string
 import numpy as np
-import pandas as pd
 
 
 
 # ✅ Load environment variables
 load_dotenv()
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongodb")
 MONGODB_URI = os.getenv("MONGODB_URI")
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 
@@ -51,190 +58,99 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# ✅ Load NLP model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("✅ NLP model loaded successfully!")
-except Exception as e:
-    logger.error(f"❌ Failed to load NLP model: {e}")
-    raise HTTPException(status_code=500, detail="Failed to load NLP model")
-nltk.download("stopwords")
-common_words = set(stopwords.words("english"))
-
-
-# ✅ MongoDB setup
-try:
-    client = pymongo.MongoClient(MONGODB_URI)
-    db = client["resume_screening"]
-    resumes_collection = db["resumes"]
-    jobs_collection = db["jobs"]
-    logger.info("✅ Connected to MongoDB successfully!")
-except Exception as e:
-    logger.error(f"❌ MongoDB Connection Failed: {e}")
-    raise HTTPException(status_code=500, detail="Failed to connect to database")
-
-# ✅ Helper: Extract Text from Resume
-def extract_text_from_resume(file_bytes: bytes, filename: str):
-    try:
-        file_stream = BytesIO(file_bytes)
-        if filename.endswith(".pdf"):
-            # For PDF files, use pdfminer to extract text
-            return extract_text(file_stream)
-        elif filename.endswith(".docx"):
-            # For DOCX files, use python-docx to extract text
-            doc = Document(file_stream)
-            return "\n".join([para.text for para in doc.paragraphs])
-        return None  # Return None if the file format is unsupported
-    except Exception as e:
-        logger.error(f"❌ Error extracting text: {e}")
-        return None
-
-
-def extract_work_experience(text):
-    """Extracts total years of work experience from resume text."""
-    try:
-        # Regex pattern to capture date ranges, handling different dash styles
-        date_range_pattern = r"(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[ ]\d{4})\s*[-–]\s*(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[ ]\d{4})"
-        date_matches = re.findall(date_range_pattern, text)
-
-        total_months = 0
-
-        for start_date, end_date in date_matches:
-            try:
-                start = parser.parse(start_date, fuzzy=True)
-                end = parser.parse(end_date, fuzzy=True)
+# ✅ Optional NLP engines (spaCy, sentence-transformers, NLTK stopwords) are loaded on
+# first use, never at import, and never downloaded at startup: see nlp_models.py
 
-                # Ensure start date is before end date
-                if start > end:
-                    continue  
 
-                # Calculate duration in months
-                months = (end.year - start.year) * 12 + (end.month - start.month) + 1  # +1 to count the last month
-                total_months += max(0, months)  # Ensure non-negative values
-            except Exception as e:
-                print(f"⚠️ Error parsing dates: {e}")
+@app.on_event("startup")
+async def preload_engines():
+    # No-op for engines serve.py already loaded before forking this worker
+    if PRELOAD_ENGINES:
+        await asyncio.to_thread(preload, PRELOAD_ENGINES)
 
-        # Convert months to years
-        total_years = round(total_months / 12, 1)  # One decimal precision
 
-        return total_years
+# ✅ Embeddings come from the shared embedding server (embedding_server.py), never a model in this process
+embedding_client = EmbeddingClient()
 
-    except Exception as e:
-        print(f"❌ Error extracting work experience: {e}")
+# ✅ ... and each distinct text is embedded once per model, then read back int8 from the shared store
+embedder = CachedEmbedder(embedding_client)
 
-    return 0  # Default to 0 if extraction fails
 
+# ✅ Optional JD → resume retrieval over every stored resume (RESUME_RETRIEVAL)
+resume_index = create_resume_index(embedder)
 
-# ✅ Helper: Extract Education
-# ✅ Helper: Extract Education Section Properly
-def extract_education(text):
-    try:
-        education_keywords = ["Education", "Academic Background", "Degrees", "Certifications"]
-        stop_keywords = ["Experience", "Work", "Projects", "Technical Skills", "Summary"]
 
-        education_text = []
-        capture = False
-        lines = text.split("\n")
+@app.on_event("shutdown")
+async def close_embedding_client():
+    if resume_index is not None:
+        resume_index.close()
+    await embedder.close()
+    await embedding_client.close()
 
-        for line in lines:
-            if any(keyword.lower() in line.lower() for keyword in education_keywords):
-                capture = True
-                continue  # Skip the header itself
-            elif any(keyword.lower() in line.lower() for keyword in stop_keywords) and capture:
-                break  # Stop capturing when another section starts
-            if capture:
-                education_text.append(line.strip())
 
-        # ✅ Ensure valid extraction
-        if not education_text:
-            logger.warning("⚠ No education section found.")
-            return "Education section not found in resume."
+# ✅ Storage: MongoDB or embedded SQLite behind the same async repositories (see repository.py)
+try:
+    repository = create_repository(STORAGE_BACKEND, MONGODB_URI)
+except Exception as e:
+    logger.error(f"❌ Storage setup failed: {e}")
+    raise HTTPException(status_code=500, detail="Failed to connect to database")
 
-        return "\n".join(education_text).strip()
+# ✅ Per-job ranking kept sorted in storage (scores are stored on the resumes)
+leaderboard = Leaderboard(repository.resumes, repository.jobs)
 
-    except Exception as e:
-        logger.error(f"❌ Error extracting education: {e}")
-        return "Error extracting education."
+# ✅ Resume parsing runs in a dedicated process pool, never on the event loop
+extraction_pool = ExtractionPool()
 
-# ✅ Helper: Extract Skills
-logger = logging.getLogger(__name__)
 
-# ✅ Extract Skills from Resumes 
-def extract_skills(text):
-    try:
-        logger.info("Extracting only 'Technical Skills' section...")
+@app.on_event("startup")
+async def start_extraction_pool():
+    extraction_pool.start()
 
-        skills_section = []
-        capture = False
-        lines = text.split("\n")
 
-        for line in lines:
-            line = line.strip()
+@app.on_event("startup")
+async def create_indexes():
+    await repository.ensure_indexes()
 
-            # ✅ Start capturing when 'Technical Skills' or similar sections are found
-            if re.search(r"\b(technical skills|skills|technologies|expertise|proficiencies)\b", line, re.IGNORECASE):
-                capture = True
-                skills_section = []  # ✅ Reset to ensure previous summary is not included
-                continue  
-            elif capture:
-                # ✅ Stop capturing when reaching another section
-                if re.search(r"\b(work experience|education|projects|certifications|summary|professional experience|employment history)\b", line, re.IGNORECASE):
-                    break  
-                skills_section.append(line)
 
-        if not skills_section:
-            logger.warning("No skills section found.")
-            return ["No skills found"]
+@app.on_event("shutdown")
+async def stop_extraction_pool():
+    extraction_pool.shutdown()
 
-        # ✅ Extract individual skills, remove unwanted headers
-        extracted_skills = re.split(r",|\s-\s|\n|•", " ".join(skills_section))
-        extracted_skills = [skill.strip() for skill in extracted_skills if skill.strip() and not re.search(r"\b(technical skills|skills|technologies|proficiencies|expertise)\b", skill, re.IGNORECASE)]
 
-        # ✅ Trim the first two unwanted lines if necessary
-        if len(extracted_skills) > 2:
-            extracted_skills = extracted_skills[2:]
+@app.on_event("shutdown")
+async def close_repository():
+    await repository.close()
 
-        return extracted_skills if extracted_skills else ["No skills found"]
 
-    except Exception as e:
-        logger.error(f"❌ Error extracting skills: {e}")
-        return ["Error extracting skills"]
+# ✅ Skill taxonomy: canonical skill IDs, aliases and role membership from RoleSkills.csv
+# (memory-mapped from the prebuilt warm-start artifact when there is a current one)
+skill_taxonomy = load_taxonomy("RoleSkills.csv")
 
+# ✅ Batched fuzzy matching of raw resume skills against the vocabulary
+fuzzy_skill_index = FuzzySkillIndex(skill_taxonomy.names)
 
-# Load the RoleSkills.csv file which contains the technical skills
-skills_df = pd.read_csv('RoleSkills.csv')
+# ✅ Optional semantic matching to the nearest vocabulary skills (SEMANTIC_SKILL_MATCHING)
+semantic_skill_index = create_semantic_index(skill_taxonomy.names, embedder)
 
-# Strip any leading/trailing spaces from column names
-skills_df.columns = skills_df.columns.str.strip()
+# ✅ Each distinct raw skill string is matched once per vocabulary version, then shared via storage
+skill_dictionary = SkillDictionary(repository.skill_dictionary, skill_taxonomy, fuzzy_skill_index, semantic_skill_index)
 
-# Use the correct column name 'Skills' for technical skills
-skills_list = skills_df['Skills'].dropna().tolist()
 
-# Split the skills by commas and clean up extra spaces, and ensure there are no empty strings
-skills_list = [skill.strip() for skills in skills_list for skill in skills.split(',') if skill.strip()]
+# Stored features depend on the extractors and on the skill dictionary version they were matched under: the
+# taxonomy's skill IDs and the fuzzy threshold, plus the embedding model and its settings with semantic matching
+def features_version(dictionary_version: str) -> str:
+    return f"{EXTRACTOR_VERSION}-{dictionary_version}"
 
-def extract_job_skills(description: str, skills: List[str]) -> List[str]:
-    """
-    Extract skills from the job description based on a list of predefined skills.
-    
-    Args:
-        description (str): Job description text.
-        skills (List[str]): List of technical skills to look for.
 
-    Returns:
-        List[str]: Extracted skills from the job description.
-    """
-    # Convert description to lowercase for case-insensitive matching
-    description_lower = description.lower()
+# Features matched without semantic matching (exact and fuzzy only). With semantic matching on, these are
+# usable for ranking but recomputed on the next read, and never reused for another upload
+FEATURES_FALLBACK_VERSION = features_version(skill_dictionary.base_version)
 
-    # Use regular expressions to match full skills (not partial matches)
-    extracted_skills = set()  # Use a set to avoid duplicates
-    for skill in skills:
-        if re.search(r'\b' + re.escape(skill.lower()) + r'\b', description_lower):
-            extracted_skills.add(skill)  # Add skill to set (ensures no duplicates)
-    
-    return list(extracted_skills)
+# Fixed width (uint64 blocks) of the per-resume skill bitsets
+SKILL_BITSET_WIDTH = bitset_width(len(skill_taxonomy))
 
+# ✅ Repeated uploads of the same file skip parsing entirely (entries are checked against the current features version)
+extraction_cache = ExtractionCache(version=FEATURES_FALLBACK_VERSION)
 
 # ✅ Helper: Extract Experience from Text
 def extract_experience(description: str) -> int:
@@ -254,28 +170,44 @@ def extract_experience(description: str) -> int:
     return 0  # Default if no experience found
 
 
-# ✅ Improved Skill Matching Function
-def compare_skills(job_skills, resume_skills):
+# ✅ Helper: Canonical skills a resume covers
+async def canonical_skill_ids_many(resumes_skills):
     """
-    Uses fuzzy matching to compare extracted job skills with resume skills.
+    Maps each resume's raw skill strings onto the taxonomy: every raw string
+    that resolves exactly, plus every vocabulary skill whose name fuzzy-matches
+    one of the raw strings above the threshold (and, with semantic matching
+    on, the nearest skills by embedding). Answers come from the shared
+    skill dictionary, so a string is only fuzzy-matched the first time it is
+    seen; the result is stored as a bitset, so ranking is pure set arithmetic.
+
+    Returns:
+        Tuple[List[List[int]], str]: Each resume's skill IDs, and the features
+        version they belong to (FEATURES_FALLBACK_VERSION if semantic matching
+        was unavailable).
     """
-    job_skills_set = set(job_skills)
-    resume_skills_set = set(resume_skills)
+    skill_ids_many, version = await skill_dictionary.canonical_ids_many(resumes_skills)
+    return skill_ids_many, features_version(version)
 
-    matched_skills = set()
-    missing_skills = set(job_skills_set)
 
-    for job_skill in job_skills_set:
-        best_match = process.extractOne(job_skill, resume_skills_set, scorer=fuzz.token_sort_ratio)
-        
-        if best_match and best_match[1] > 80:  # ✅ Adjusted fuzzy threshold for better matching
-            matched_skills.add(job_skill)
-            missing_skills.discard(job_skill)
+# ✅ Helper: The features version freshly computed features get
+async def current_features_version() -> Optional[str]:
+    """
+    With semantic matching on, the version names the model the embedder
+    serves, so the vocabulary is embedded first if it hasn't been (or the
+    model changed). None while semantic matching is unavailable: which model
+    is current can't be told then.
+    """
+    if semantic_skill_index is not None and not await semantic_skill_index.available():
+        return None
+    return features_version(skill_dictionary.version)
+
 
-    logger.info(f"✅ Matched Skills: {matched_skills}")
-    logger.info(f"❌ Missing Skills: {missing_skills}")
+def has_current_features(document: dict, current: Optional[str]) -> bool:
+    version = document.get("features_version")
+    if current is None:  # Semantic matching is down: anything matched under this taxonomy will do until it's back
+        return version == FEATURES_FALLBACK_VERSION or (version or "").startswith(FEATURES_FALLBACK_VERSION + "-")
+    return version == current
 
-    return list(missing_skills), list(matched_skills)
 
 # ✅ Compute Match Percentage
 def calculate_final_match_percentage(matched_skills, job_skills, candidate_experience, required_experience):
@@ -284,90 +216,92 @@ def calculate_final_match_percentage(matched_skills, job_skills, candidate_exper
     - Skill match percentage
     - Experience penalty (if below required)
     - Small experience bonus (if equal or above)
+
+    Works for one candidate (lists of skills) or for every candidate of a job
+    at once: pass an array of matched-skill counts and an array of candidate
+    experience, and an array of scores comes back.
     """
-    if len(job_skills) == 0:
-        return 0.0  # Prevent division by zero
+    vectorized = isinstance(matched_skills, np.ndarray)
+    matched_count = matched_skills if vectorized else len(matched_skills)
+    job_skill_count = job_skills if isinstance(job_skills, (int, np.integer)) else len(job_skills)
+
+    if job_skill_count == 0:
+        return np.zeros(len(matched_skills)) if vectorized else 0.0  # Prevent division by zero
 
-    skill_match_percentage = round((len(matched_skills) / len(job_skills)) * 100, 2)
+    skill_match_percentage = np.round(matched_count / job_skill_count * 100, 2)
+    candidate_experience = np.asarray(candidate_experience, dtype=float)
 
     # ✅ Experience-Based Adjustment
-    if candidate_experience < required_experience:
-        experience_penalty = (required_experience - candidate_experience) * 2  # -2% per missing year
-        final_score = max(skill_match_percentage - experience_penalty, 0)  # Prevent going below 0%
-    elif candidate_experience >= required_experience:
-        experience_bonus = min((candidate_experience - required_experience) * 1, 5)  # Max +5% bonus
-        final_score = min(skill_match_percentage + experience_bonus, 100)  # Prevent going above 100%
-    else:
-        final_score = skill_match_percentage  # No change if experience matches exactly
+    experience_penalty = (required_experience - candidate_experience) * 2  # -2% per missing year
+    experience_bonus = np.minimum((candidate_experience - required_experience) * 1, 5)  # Max +5% bonus
+    final_score = np.where(
+        candidate_experience < required_experience,
+        np.maximum(skill_match_percentage - experience_penalty, 0),  # Prevent going below 0%
+        np.minimum(skill_match_percentage + experience_bonus, 100)  # Prevent going above 100%
+    )
+
+    final_score = np.round(final_score, 2)
+    return final_score if vectorized else float(final_score)
+
+def score_candidates(job_skills, required_experience, resumes):
+    """
+    Scores resumes against a job using their stored features only; no resume
+    text is parsed here. `job_skills` are taxonomy IDs.
 
-    return round(final_score, 2)
+    All resumes are scored at once: their skill bitsets form an N×W matrix,
+    one AND + popcount gives every candidate's matched-skill count, and the
+    match percentages are computed on whole arrays.
 
-def process_resume(uploaded_file, filename):
-    """
-    Processes the uploaded resume and extracts text based on the file.
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Match percentages, matched-skill
+        bitsets and candidate experience, one row per resume.
     """
-    try:
-        # Read the resume file bytes
-        file_bytes = uploaded_file.read()
-
-        # Extract text from the resume using filename
-        extracted_text = extract_text_from_resume(file_bytes, filename)
-        
-        if not extracted_text:
-            logger.warning(f"❌ No text extracted from the resume: {filename}")
-            return []  # Return an empty list if text extraction fails
-
-        # Add the filename and extracted text to the resume data
-        logger.info(f"✅ Successfully processed resume: {filename}")
-        return [{
-            "filename": filename,
-            "text": extracted_text
-        }]
-    
-    except Exception as e:
-        logger.error(f"❌ Error processing resume {filename}: {e}")
-        return []
-
+    resume_bits = stack_bitsets([resume["skill_bits"] for resume in resumes], SKILL_BITSET_WIDTH)
+    job_bits = to_bitset(job_skills, SKILL_BITSET_WIDTH)
+    matched_bits, matched_counts = overlap(resume_bits, job_bits)
 
-def rank_candidates(job_description, resumes, skills_list):
-    try:
-        job_skills = extract_job_skills(job_description, skills_list)
-        required_experience = extract_experience(job_description) or 0
-        logger.info(f"Job Skills Extracted: {job_skills}, Required Experience: {required_experience}")
+    experiences = np.array([resume.get("work_experience") or 0 for resume in resumes], dtype=float)
+    match_percentages = calculate_final_match_percentage(matched_counts, len(job_skills), experiences, required_experience or 0)
+    return np.asarray(match_percentages, dtype=float), matched_bits, experiences
 
-        ranked_candidates = []
 
-        for resume in resumes:
-            resume_filename = resume.get("filename", "Unknown Filename")
-            logger.info(f"Processing resume: {resume_filename}")
+def rank_candidates(job_skills, required_experience, resumes, keep_order=False):
+    """
+    Ranks resumes against a job (see score_candidates) and builds the
+    per-candidate result, best match first. With keep_order, the resumes are
+    already in leaderboard order and are returned as given.
+    """
+    try:
+        required_experience = required_experience or 0
+        logger.info(f"Job Skills: {skill_taxonomy.names_for(job_skills)}, Required Experience: {required_experience}")
+        if not resumes:
+            return []
 
-            extracted_resume_skills = extract_skills(resume.get("text", ""))
-            candidate_experience = extract_work_experience(resume.get("text", "")) or 0
-            candidate_education = resume.get("education", "Education not provided")
+        match_percentages, matched_bits, experiences = score_candidates(job_skills, required_experience, resumes)
 
-            if not extracted_resume_skills:
-                logger.warning(f"❌ No skills found in resume {resume_filename}")
-                missing_skills = job_skills
-                matched_skills = []
-            else:
-                missing_skills, matched_skills = compare_skills(job_skills, extracted_resume_skills)
+        ranked_candidates = []
 
-            match_percentage = float(calculate_final_match_percentage(matched_skills, job_skills, candidate_experience, required_experience))
-            feedback = generate_feedback(missing_skills, matched_skills, candidate_experience, required_experience)
+        # Stable sort: equal scores keep upload order, as before
+        order = range(len(resumes)) if keep_order else np.argsort(-match_percentages, kind="stable")
+        for index in order:
+            resume = resumes[index]
+            candidate_experience = float(experiences[index])
+            matched_ids = set(ids_from_bitset(matched_bits[index]))
+            matched_skills = [skill_id for skill_id in job_skills if skill_id in matched_ids]
+            missing_skills = [skill_id for skill_id in job_skills if skill_id not in matched_ids]
 
             ranked_candidates.append({
-                "filename": resume_filename,
-                "skills": extracted_resume_skills,
-                "matched_skills": matched_skills,
-                "missing_skills": missing_skills,
+                "filename": resume.get("filename", "Unknown Filename"),
+                "skills": resume.get("skills") or [],
+                "matched_skills": skill_taxonomy.names_for(matched_skills),
+                "missing_skills": skill_taxonomy.names_for(missing_skills),
                 "candidate_experience": candidate_experience,
                 "required_experience": required_experience,
-                "education": candidate_education,
-                "match_percentage": match_percentage,
-                "feedback": feedback
+                "education": resume.get("education", "Education not provided"),
+                "match_percentage": float(match_percentages[index]),
+                "feedback": generate_feedback(missing_skills, matched_skills, candidate_experience, required_experience)
             })
 
-        ranked_candidates.sort(key=lambda x: float(x["match_percentage"]), reverse=True)
         return ranked_candidates
 
     except Exception as e:
@@ -378,14 +312,14 @@ def rank_candidates(job_description, resumes, skills_list):
 def generate_feedback(missing_skills, matched_skills, candidate_experience, required_experience):
     """
     Generates feedback based on:
-    - Missing skills
-    - Matched skills
+    - Missing skills (taxonomy IDs)
+    - Matched skills (taxonomy IDs)
     - Experience comparison
     """
     feedback = []
 
     if missing_skills:
-        feedback.append(f"Missing skills: {', '.join(missing_skills)}")
+        feedback.append(f"Missing skills: {', '.join(skill_taxonomy.names_for(missing_skills))}")
     else:
         feedback.append("All required skills are present.")
 
@@ -395,7 +329,7 @@ def generate_feedback(missing_skills, matched_skills, candidate_experience, requ
         feedback.append(f"Experience exceeds the required experience by {candidate_experience - required_experience} years.")
 
     if matched_skills:
-        feedback.append(f"Matched skills: {', '.join(matched_skills)}")
+        feedback.append(f"Matched skills: {', '.join(skill_taxonomy.names_for(matched_skills))}")
     else:
         feedback.append("No skills matched.")
 
@@ -414,8 +348,39 @@ class JobDescription(BaseModel):
     job_title: str
     job_description: str
 
-# In-memory storage for job descriptions and associated skills
-job_descriptions = {}
+# ✅ Ingestion settings: uploads are queued as tasks and parsed by background workers
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))  # Per process; 0 for API-only processes (see worker.py)
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", str(2 * extraction_pool.size)))
+INGEST_TASK = "ingest_resume"
+BULK_ENQUEUE_BATCH = 50
+MAX_RESUME_BYTES = 15 * 1024 * 1024  # Queued with its task, so it has to fit in one MongoDB document
+
+# ✅ Admission control: bounded stages in front of the expensive work, shedding load with 429/503 + Retry-After
+# Upload requests being read and queued (each holds its files in memory)
+upload_stage = AdmissionStage(
+    "uploads",
+    concurrency=int(os.getenv("UPLOAD_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("UPLOAD_QUEUE_LIMIT", "64")),
+    status_code=429
+)
+# CPU-bound work in this process: ranking requests (interactive lane, with reserved slots) and resume parsing (bulk)
+INTERACTIVE_RESERVED = int(os.getenv("INTERACTIVE_RESERVED", "1"))
+cpu_stage = AdmissionStage(
+    "cpu",
+    concurrency=int(os.getenv("CPU_CONCURRENCY", str(extraction_pool.size + INTERACTIVE_RESERVED))),
+    max_queue=int(os.getenv("CPU_QUEUE_LIMIT", "64")),
+    reserved=INTERACTIVE_RESERVED
+)
+# Resumes queued for ingestion but not yet claimed by a worker
+ingest_backlog = QueueBacklog(
+    "ingest backlog",
+    lambda: _queued_task_count(),
+    limit=int(os.getenv("INGEST_BACKLOG_LIMIT", "10000"))
+)
+
+
+async def _queued_task_count() -> int:
+    return (await repository.tasks.counts())["queued"]
 
 
 @app.post("/add_job/")
@@ -423,17 +388,14 @@ async def add_job(job: JobDescription):
     try:
         job_data = job.dict()
 
-        # ✅ Extract skills from job description
-        extracted_skills = extract_job_skills(job_data["job_description"], skills_list)
-        job_data["extracted_skills"] = extracted_skills  # Store extracted skills in MongoDB
-
-        # ✅ Extract experience from job description
-        experience_years = extract_experience(job_data["job_description"])
-        job_data["experience_years"] = experience_years  # Store experience in MongoDB
+        # ✅ Extract skills and experience from job description (stored for ranking)
+        job_data.update(await compute_job_features(job_data["job_description"]))
+        extracted_skills = job_data["extracted_skills"]
+        experience_years = job_data["experience_years"]
+        job_data["leaderboard_version"] = score_version(job_data)  # No resumes yet: nothing to rescore
 
         # ✅ Insert into MongoDB
-        inserted_job = jobs_collection.insert_one(job_data)  
-        job_id = inserted_job.inserted_id  
+        job_id = await repository.jobs.insert(job_data)
 
         # ✅ Log and Print Job Data
         logger.info(f"✅ Job inserted successfully! Job ID: {job_id}, Experience: {experience_years}")
@@ -450,127 +412,628 @@ async def add_job(job: JobDescription):
         logger.error(f"❌ Error adding job: {e}")
         raise HTTPException(status_code=500, detail=f"Error adding job: {str(e)}")
 
+# ✅ API: Update Job Description
+@app.put("/update_job/{job_id}")
+async def update_job(job_id: str, job: JobDescription):
+    """
+    Replaces a job's title and description. The job's skills are re-extracted
+    and its leaderboard is rescored in the background; rankings read in the
+    meantime come from the previous scores.
+    """
+    job_id = validate_objectid(job_id)
+    try:
+        job_data = job.dict()
+        job_data.update(await compute_job_features(job_data["job_description"]))
+
+        updated = await repository.jobs.update(job_id, job_data)
+        if not updated:
+            raise HTTPException(status_code=404, detail="Job not found.")
+
+        if not leaderboard.is_current(updated):
+            leaderboard.schedule_rescore(updated, score_resumes)
+
+        return {
+            "message": "Job updated successfully!",
+            "job_id": str(job_id),
+            "extracted_skills": updated["extracted_skills"],
+            "experience_years": updated["experience_years"],
+            "rescoring": leaderboard.is_rescoring(job_id)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error updating job: {e}")
+        raise HTTPException(status_code=500, detail=f"Error updating job: {str(e)}")
+
+# ✅ Helper: Compute the stored feature set of a resume
+def extract_resume_sections(texts):
+    features = []
+    for text in texts:
+        sections = segment_sections(text)  # One pass; every section extractor reuses it
+        features.append({
+            "sections": sections,
+            "skills": extract_skills(text, sections),  # Extract only the 'Skills' section
+            "work_experience": extract_work_experience(text, sections),  # Extract experience
+            "education": extract_education(text, sections)  # Extract education
+        })
+    return features
+
+
+async def compute_resume_features_many(texts):
+    """
+    Parses the sections ranking needs out of resume texts. The result is stored
+    with each resume and tagged with its features version, so ranking never
+    has to parse text unless the extractors or skill matching change. Parsing runs in a worker thread
+    and skill canonicalization runs as one batch for all the texts.
+    """
+    features = await asyncio.to_thread(extract_resume_sections, texts)
+    skill_ids_many, features_version = await canonical_skill_ids_many([f["skills"] for f in features])
+    for resume_features, skill_ids in zip(features, skill_ids_many):
+        resume_features["skill_ids"] = skill_ids
+        resume_features["features_version"] = features_version
+    return features
+
+
+async def compute_resume_features(text: str) -> dict:
+    return (await compute_resume_features_many([text]))[0]
+
+
+# ✅ Helper: Compute the stored feature set of a job
+async def compute_job_features(description: str) -> dict:
+    # Stamped with the resumes' features version, so new resume features make the job's scores stale too
+    skill_ids = skill_taxonomy.extract_ids(description)
+    return {
+        "skill_ids": skill_ids,
+        "extracted_skills": skill_taxonomy.names_for(skill_ids),
+        "experience_years": extract_experience(description),
+        "features_version": await current_features_version() or FEATURES_FALLBACK_VERSION
+    }
+
+
+# ✅ Helper: Load a job with up-to-date features
+async def load_job(job_id) -> Optional[dict]:
+    job = await repository.jobs.get(job_id)
+    if job and not has_current_features(job, await current_features_version()):
+        job_features = await compute_job_features(job["job_description"])
+        await repository.jobs.set_fields(job_id, job_features)
+        job.update(job_features)
+    return job
+
+
+# ✅ Helper: Bring stored resume features up to date
+async def refresh_resume_features(resumes, job=None):
+    """
+    Recomputes (as one batch) and persists the features of resumes stored
+    under an older features version (new extractors, taxonomy or embedding
+    model, or matched while semantic matching was unavailable), updating the
+    given documents in place. With the resumes' `job`, their stored
+    leaderboard scores are recomputed too.
+    Returns the resumes that have usable features.
+    """
+    current = await current_features_version()
+    stale_resumes = [r for r in resumes if not has_current_features(r, current)]
+    if not stale_resumes:
+        return resumes
+
+    texts = await repository.resumes.get_texts([r["_id"] for r in stale_resumes])
+    refreshable = [r for r in stale_resumes if texts.get(r["_id"])]
+    updates = []
+    for resume, features in zip(refreshable, await compute_resume_features_many([texts[r["_id"]] for r in refreshable])):
+        features["skill_bits"] = to_bytes(features["skill_ids"], SKILL_BITSET_WIDTH)
+        resume.update(features)
+        updates.append((resume["_id"], features))
+    if job is not None and refreshable:
+        match_percentages, _, _ = score_candidates(job["skill_ids"], job["experience_years"], refreshable)
+        for resume, (_, features), score in zip(refreshable, updates, match_percentages):
+            features.update(score=float(score), score_version=score_version(job))
+            resume.update(score=features["score"], score_version=features["score_version"])
+    await repository.resumes.set_fields_many(updates)
+    logging.info(f"Recomputed features for {len(updates)} resumes")
+    refreshed = {id(r) for r in refreshable}
+    return [r for r in resumes if id(r) in refreshed or has_current_features(r, current)]
+
+
+# ✅ Helper: Leaderboard scores for a batch of resumes of a job
+async def score_resumes(job, resumes):
+    """
+    Match percentages of `resumes` for `job`, as stored in the leaderboard.
+    Resumes whose features can't be brought up to date score 0.
+    """
+    usable = {id(r) for r in await refresh_resume_features(resumes)}
+    scores = np.zeros(len(resumes))
+    indices = [i for i, r in enumerate(resumes) if id(r) in usable]
+    if indices:
+        match_percentages, _, _ = score_candidates(job["skill_ids"], job["experience_years"], [resumes[i] for i in indices])
+        scores[indices] = match_percentages
+    return scores
+
+
+# ✅ Helper: Reject files we can't parse before queueing them
+def validate_upload(file_bytes: bytes, filename: str):
+    if not file_bytes:
+        raise HTTPException(status_code=400, detail="Empty or unsupported file format")
+    if not filename.endswith(('.pdf', '.docx')):
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    if len(file_bytes) > MAX_RESUME_BYTES:
+        raise HTTPException(status_code=413, detail="Resume file is too large")
+
+
+# ✅ Helper: Parse an uploaded resume
+async def parse_resume(file_bytes: bytes, filename: str) -> dict:
+    """
+    Extracts the text and key sections of a resume file. Text extraction runs
+    in the extraction pool, and files we've parsed before come from the cache.
+
+    Raises:
+        HTTPException: If the file is empty, unsupported, or has no extractable text.
+    """
+    validate_upload(file_bytes, filename)
+
+    # ✅ Reuse earlier results for a file we've already parsed
+    current = await current_features_version()
+    content_hash = hashlib.sha256(file_bytes).hexdigest()
+    cache_key = extraction_cache.key_for_digest(content_hash)
+    cached = extraction_cache.get(cache_key)
+    if cached and has_current_features(cached, current):
+        return {**cached, "content_hash": content_hash}
+
+    # ✅ ...or that another worker already stored
+    stored = await repository.resumes.find_parsed(content_hash, current) if current else None
+    if stored:
+        extraction_cache.put(cache_key, stored)
+        return {**stored, "content_hash": content_hash}
+
+    # ✅ Extract text from resume (in the extraction pool)
+    try:
+        extracted_text = await extraction_pool.extract(file_bytes, filename)
+    except ExtractionTimeout:
+        raise HTTPException(status_code=400, detail="Timed out extracting text from the resume")
+    if not extracted_text:
+        raise HTTPException(status_code=400, detail="Could not extract text from the resume")
+
+    # ✅ Extract different sections
+    parsed = {"text": extracted_text, **(await compute_resume_features(extracted_text))}
+    if parsed["features_version"] == current:  # Fallback features are recomputed, not reused
+        extraction_cache.put(cache_key, parsed)
+    return {**parsed, "content_hash": content_hash}
+
+
+
+# ✅ Helper: Build the MongoDB document for a parsed resume
+def build_resume_document(job_id: str, filename: str, parsed: dict, resume_id: Optional[ObjectId] = None) -> dict:
+    return {
+        "_id": resume_id or ObjectId(),  # Assigned up front so the text document can share it
+        "job_id": str(job_id),
+        "filename": filename,
+        "content_hash": parsed["content_hash"],
+        "skills": parsed["skills"],
+        "work_experience": parsed["work_experience"],
+        "education": parsed["education"],
+        "sections": parsed["sections"],
+        "skill_ids": parsed["skill_ids"],
+        "skill_bits": to_bytes(parsed["skill_ids"], SKILL_BITSET_WIDTH),
+        "features_version": parsed["features_version"]
+    }
+
+
+# ✅ Helper: The resume_texts document that goes with a resume document
+def build_resume_text(document: dict, parsed: dict) -> dict:
+    return {"_id": document["_id"], "job_id": document["job_id"], "text": parsed["text"]}
+
+
+# ✅ Helper: Arguments of an ingestion task. The resume's _id is fixed when
+# it's queued, so a retried task can't store the same resume twice.
+def ingest_task_args(job_id, filename: str) -> dict:
+    return {"job_id": str(job_id), "filename": filename, "resume_id": str(ObjectId())}
+
+
+# ✅ Task handler: parse, score and store a batch of queued resumes
+async def ingest_resumes(tasks: List[dict]) -> List[object]:
+    async def parse(task):
+        try:
+            async with cpu_stage.slot(BULK, shed=False):
+                return await parse_resume(task["data"], task["args"]["filename"])
+        except HTTPException as e:
+            return TaskError(e.detail)  # Bad file: retrying won't help
+
+    outcomes = await asyncio.gather(*(parse(task) for task in tasks), return_exceptions=True)
+
+    # ✅ Resumes that parsed, already placed in their job's leaderboard
+    stored = [i for i, outcome in enumerate(outcomes) if not isinstance(outcome, Exception)]
+    documents = [
+        build_resume_document(tasks[i]["args"]["job_id"], os.path.basename(tasks[i]["args"]["filename"]),
+                              outcomes[i], ObjectId(tasks[i]["args"]["resume_id"]))
+        for i in stored
+    ]
+    stamped = {}
+    for job_id in {document["job_id"] for document in documents}:
+        job = await load_job(ObjectId(job_id))
+        if job:
+            job_documents = [document for document in documents if document["job_id"] == job_id]
+            stamped[job_id] = score_version(job)
+            Leaderboard.stamp(job_documents, await score_resumes(job, job_documents), stamped[job_id])
+
+    failed = await repository.resumes.insert_many(documents, [build_resume_text(document, outcomes[i])
+                                                              for i, document in zip(stored, documents)])
+
+    # ✅ A job edited while these were scored may already have been rescored without them: go again
+    for job_id, version in stamped.items():
+        job = await load_job(ObjectId(job_id))
+        if job and score_version(job) != version:
+            leaderboard.schedule_rescore(job, score_resumes)
+
+    if failed:
+        # A retried task whose resume an earlier attempt already stored counts as done
+        existing = {doc["_id"] for doc in await repository.resumes.fetch([documents[index]["_id"] for index in failed])}
+        failed = {index: error for index, error in failed.items() if documents[index]["_id"] not in existing}
+
+    # ✅ Stored resumes go into the retrieval index; any this misses are picked up by index_resumes.py
+    if resume_index is not None:
+        indexed = [{"_id": document["_id"], "text": outcomes[i]["text"], "sections": document["sections"]}
+                   for index, (i, document) in enumerate(zip(stored, documents)) if index not in failed]
+        try:
+            await resume_index.add(indexed)
+        except Exception as e:
+            logger.warning(f"⚠ Could not index {len(indexed)} resumes for retrieval: {e}")
+
+    for index, (i, document) in enumerate(zip(stored, documents)):
+        if index in failed:
+            outcomes[i] = RuntimeError(failed[index])
+        else:
+            outcomes[i] = {
+                "resume_id": str(document["_id"]),
+                "extracted_data": {
+                    "skills": document["skills"],
+                    "work_experience": document["work_experience"],
+                    "education": document["education"]
+                }
+            }
+    return outcomes
+
+
+# ✅ Background ingestion workers (any number of processes can drain the same queue)
+ingest_workers = [
+    TaskWorker(repository.tasks, {INGEST_TASK: ingest_resumes}, batch_size=INGEST_BATCH_SIZE)
+    for _ in range(INGEST_WORKERS)
+]
+
+
+@app.on_event("startup")
+async def start_ingest_workers():
+    for worker in ingest_workers:
+        worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_ingest_workers():
+    await asyncio.gather(*(worker.stop() for worker in ingest_workers))
+
+
 # ✅ API: Upload Resume
-@app.post("/upload_resume/{job_id}")
+@app.post("/upload_resume/{job_id}", status_code=202)
 async def upload_resume(job_id: str, file: UploadFile = File(...)):
     """
-    Endpoint to upload a resume, extract key sections, and store it in MongoDB.
+    Endpoint to queue a resume for parsing and storage. Returns right away
+    with a task ID; poll GET /tasks/{task_id} for the result.
     """
     try:
         # ✅ Validate job_id
         job_id = validate_objectid(job_id)
+        await ingest_backlog.check()
 
-        # ✅ Read and validate the file
-        file_bytes = await file.read()
-        if not file_bytes:
-            raise HTTPException(status_code=400, detail="Empty or unsupported file format")
-        if not file.filename.endswith(('.pdf', '.docx')):
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-
-        # ✅ Extract text from resume
-        extracted_text = extract_text_from_resume(file_bytes, file.filename)
-        if not extracted_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from the resume")
-
-        # ✅ Extract different sections
-        extracted_skills = extract_skills(extracted_text)  # Extract only the 'Skills' section
-        extracted_work_experience = extract_work_experience(extracted_text)  # Extract experience
-        extracted_education = extract_education(extracted_text)  # Extract education
-
-        # ✅ Store extracted details in MongoDB
-        resume_data = {
-            "job_id": str(job_id),
-            "filename": file.filename,
-            "text": extracted_text,
-            "skills": extracted_skills,
-            "work_experience": extracted_work_experience,
-            "education": extracted_education
-        }
-        resume_id = resumes_collection.insert_one(resume_data).inserted_id
+        # ✅ Read and validate the file, then hand it to the ingestion workers
+        async with upload_stage.slot():
+            file_bytes = await file.read()
+            validate_upload(file_bytes, file.filename)
+            [task_id] = await repository.tasks.enqueue_many(INGEST_TASK, [(ingest_task_args(job_id, file.filename), file_bytes)])
 
         return {
-            "message": "Resume uploaded successfully!",
-            "resume_id": str(resume_id),
-            "extracted_data": {
-                "skills": extracted_skills,
-                "work_experience": extracted_work_experience,
-                "education": extracted_education
-            }
+            "message": "Resume queued for processing",
+            "task_id": str(task_id),
+            "status_url": f"/tasks/{task_id}"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error uploading resume: {e}")
         raise HTTPException(status_code=500, detail=f"Error uploading resume: {str(e)}")
 
 
-@app.get("/get_ranked_candidates_with_feedback/{job_id}")
-async def get_ranked_candidates_with_feedback(job_id: str):
-    try:
-        job_id = ObjectId(job_id)
-        job = jobs_collection.find_one({"_id": job_id})
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found.")
+def iter_upload_sources(files: List[UploadFile]):
+    """
+    Yields (archive, filename, read) for every resume in a bulk upload. ZIP
+    archives are opened from the spooled upload file, so members are read one
+    at a time when `read()` is called instead of buffering the whole archive.
+    """
+    for upload in files:
+        if not upload.filename.lower().endswith(".zip"):
+            yield None, upload.filename, upload.read
+            continue
+
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile:
+            yield upload.filename, upload.filename, None
+            continue
+
+        with archive:
+            for member in archive.infolist():
+                if member.is_dir() or member.filename.startswith("__MACOSX/"):
+                    continue
+                if member.file_size > MAX_RESUME_BYTES:
+                    yield upload.filename, member.filename, None
+                    continue
+                yield upload.filename, member.filename, lambda member=member, archive=archive: archive.read(member)
+
+
+# ✅ API: Bulk Upload Resumes (multiple files and/or ZIP archives)
+@app.post("/upload_resumes/{job_id}", status_code=202)
+async def upload_resumes(job_id: str, files: List[UploadFile] = File(...)):
+    """
+    Endpoint to ingest many resumes in one request. Accepts several PDF/DOCX
+    files and/or ZIP archives of them and queues one task per resume; returns
+    a per-file manifest with the task IDs to poll.
+    """
+    job_id = validate_objectid(job_id)
+    await ingest_backlog.check(len(files))
+
+    results = []
+    pending = []  # (manifest entry, task args, file bytes) waiting for enqueue_many
+
+    async def flush_tasks():
+        if not pending:
+            return
+        task_ids = await repository.tasks.enqueue_many(INGEST_TASK, [(args, data) for _, args, data in pending])
+        for (entry, _, _), task_id in zip(pending, task_ids):
+            entry.update({"status": "queued", "task_id": str(task_id)})
+        pending.clear()
+
+    async with upload_stage.slot():
+        try:
+            for archive, filename, read in iter_upload_sources(files):
+                entry = {"filename": filename}
+                if archive:
+                    entry["archive"] = archive
+                results.append(entry)
+                if read is None:
+                    entry.update({"status": "error", "detail": "Unreadable archive or file too large"})
+                    continue
+                file_bytes = read()
+                if asyncio.iscoroutine(file_bytes):
+                    file_bytes = await file_bytes
+                try:
+                    validate_upload(file_bytes, filename)
+                except HTTPException as e:
+                    entry.update({"status": "error", "detail": e.detail})
+                    continue
+                pending.append((entry, ingest_task_args(job_id, filename), file_bytes))
+                if len(pending) >= BULK_ENQUEUE_BATCH:
+                    await flush_tasks()
+            await flush_tasks()
+
+        except Exception as e:
+            logger.error(f"❌ Error in bulk upload: {e}")
+            raise HTTPException(status_code=500, detail=f"Error uploading resumes: {str(e)}")
+
+    queued = sum(1 for entry in results if entry.get("status") == "queued")
+    logger.info(f"✅ Bulk upload for job {job_id}: {queued}/{len(results)} resumes queued")
+    return {
+        "message": "Bulk upload queued",
+        "job_id": str(job_id),
+        "total": len(results),
+        "queued": queued,
+        "rejected": len(results) - queued,
+        "results": results
+    }
+
+
+# ✅ API: Status of a queued task
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    task = await repository.tasks.get(validate_objectid(task_id))
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {
+        "task_id": str(task["_id"]),
+        "kind": task["kind"],
+        "status": task["status"],
+        "attempts": task["attempts"],
+        "created_at": datetime.fromtimestamp(task["created_at"], timezone.utc).isoformat(),
+        "updated_at": datetime.fromtimestamp(task["updated_at"], timezone.utc).isoformat(),
+        "result": task.get("result"),
+        "error": task.get("error") if task["status"] != "done" else None
+    }
+
+
+# ✅ API: Runtime counters
+@app.get("/metrics")
+async def metrics():
+    return {
+        "extraction_cache": extraction_cache.stats(),
+        "skill_dictionary": skill_dictionary.stats(),
+        "tasks": await repository.tasks.counts(),
+        "ingest_workers": [worker.stats() for worker in ingest_workers],
+        "nlp_engines_loaded": loaded_engines(),
+        "embedding_client": embedding_client.stats(),
+        "embedding_store": embedder.stats(),
+        "resume_index": resume_index.stats() if resume_index is not None else None,
+        "admission": {
+            "uploads": upload_stage.stats(),
+            "cpu": cpu_stage.stats(),
+            "ingest_backlog": ingest_backlog.stats()
+        }
+    }
+
+
+# ✅ Helper: One candidate as returned by the ranking APIs
+def candidate_response(candidate, required_experience):
+    return {
+        "resume": candidate["filename"],
+        "extracted_resume_skills": candidate["skills"],
+        "matched_skills": candidate["matched_skills"],
+        "missing_skills": candidate["missing_skills"],
+        "candidate_experience": candidate["candidate_experience"],
+        "candidate_education": candidate["education"],
+        "required_experience": required_experience,
+        "overall_match_percentage": candidate["match_percentage"],
+        "feedback": candidate["feedback"]
+    }
+
+
+# ✅ API: Ranked candidates, one page at a time
+@app.get("/ranked_candidates/{job_id}")
+async def ranked_candidates_page(job_id: str, page_size: int = 20, cursor: Optional[str] = None):
+    """
+    Pages through a job's leaderboard, best match first. Each response carries
+    an opaque `next_cursor` (the last score and resume id served); passing it
+    back continues right after that candidate, so no earlier page is ever
+    recomputed. A cursor from before the job's leaderboard changed is rejected
+    with 409 and the client should restart from the first page.
+    """
+    job_id = validate_objectid(job_id)
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    job = await load_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    after = None
+    if cursor:
+        try:
+            score, resume_id, version = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if version != job.get("leaderboard_version"):
+            raise HTTPException(status_code=409, detail="The ranking has changed; restart from the first page.")
+        after = (score, resume_id)
+
+    # ✅ Interactive lane: goes ahead of resume parsing for the CPU
+    async with cpu_stage.slot(INTERACTIVE):
+        try:
+            # ✅ Out-of-date scores are rebuilt in the background; pages keep coming from the index meanwhile
+            if not leaderboard.is_current(job) and not leaderboard.is_rescoring(job_id):
+                leaderboard.schedule_rescore(job, score_resumes)
+
+            resumes, has_more = await leaderboard.page(job_id, page_size, after)
+            # The cursor continues from where the index put the page, whatever refreshing features rescores
+            next_cursor = None
+            if has_more:
+                last = resumes[-1]
+                next_cursor = encode_cursor(last["score"], last["_id"], job.get("leaderboard_version"))
+
+            resume_data = await refresh_resume_features(resumes, job)
+            required_experience = job["experience_years"]
+            ranked_candidates = rank_candidates(job["skill_ids"], required_experience, resume_data, keep_order=True)
+
+            return {
+                "job_id": str(job_id),
+                "extracted_job_skills": job["extracted_skills"],
+                "ranked_candidates": [candidate_response(candidate, required_experience) for candidate in ranked_candidates],
+                "next_cursor": next_cursor,
+                "rescoring": leaderboard.is_rescoring(job_id)
+            }
 
-        resumes = list(resumes_collection.find({"job_id": str(job_id)}))
-        if not resumes:
-            return {"message": "No resumes uploaded for this job."}
-
-        extracted_job_skills = extract_job_skills(job["job_description"], skills_list)
-        required_experience = extract_experience(job["job_description"])
-
-        resume_data = []
-        for resume in resumes:
-            filename = resume.get("filename", "Unknown Filename")
-            if filename == "Unknown Filename":
-                logging.warning(f"❌ Missing filename for resume with job_id: {job_id}")
-            logging.info(f"Processing resume: {filename}")
-
-            extracted_text = resume.get("text", "")
-            if not extracted_text:
-                logging.warning(f"❌ Resume text is missing for resume with job_id: {job_id} and filename: {filename}")
-                continue
-
-            extracted_resume_skills = extract_skills(extracted_text)
-            candidate_experience = extract_work_experience(extracted_text)
-            candidate_education = extract_education(extracted_text)
-
-            resume_data.append({
-                "filename": filename,
-                "text": extracted_text,
-                "skills": extracted_resume_skills,
-                "experience": candidate_experience,
-                "education": candidate_education
-            })
+        except Exception as e:
+            logging.error(f"❌ Error paging ranked candidates: {type(e).__name__} - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error ranking candidates: {type(e).__name__} - {str(e)}")
 
-        logging.info(f"Resume Data Prepared: {len(resume_data)} resumes.")
-        for candidate in resume_data:
-            logging.info(f"Resume Data for Ranking: {candidate}")
-
-        ranked_candidates = rank_candidates(job["job_description"], resume_data, skills_list)
-
-        response = {
-            "extracted_job_skills": extracted_job_skills,
-            "ranked_candidates": [
-                {
-                    "resume": candidate["filename"],
-                    "extracted_resume_skills": candidate["skills"],
-                    "matched_skills": candidate["matched_skills"],
-                    "missing_skills": candidate["missing_skills"],
-                    "candidate_experience": candidate["candidate_experience"],
-                    "candidate_education": candidate["education"],
-                    "required_experience": required_experience,
-                    "overall_match_percentage": candidate["match_percentage"],
-                    "feedback": candidate["feedback"]
-                }
-                for candidate in ranked_candidates
-            ]
-        }
 
-        return response
+# ✅ API: Stored resumes closest to a job description, across every job
+@app.post("/retrieve_resumes/")
+async def retrieve_resumes(job: JobDescription, top_n: int = 20):
+    """
+    Finds the `top_n` stored resumes, from any job, whose embedding is
+    closest to the job description, best first. Answered from the resume
+    vector index without scoring resumes one by one, so it covers the whole
+    corpus; the job doesn't need to be stored. Needs RESUME_RETRIEVAL.
+    """
+    if resume_index is None:
+        raise HTTPException(status_code=503, detail="Resume retrieval is not enabled (RESUME_RETRIEVAL=off)")
+    if not 1 <= top_n <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"top_n must be between 1 and {MAX_PAGE_SIZE}")
+
+    # ✅ Interactive lane: goes ahead of resume parsing for the CPU
+    async with cpu_stage.slot(INTERACTIVE):
+        try:
+            matches = await resume_index.search(f"{job.job_title}\n{job.job_description}", top_n)
+        except EmbeddingError as e:
+            raise HTTPException(status_code=503, detail=f"Embeddings unavailable: {e}")
+
+    similarities = dict(matches)
+    resumes = await repository.resumes.fetch([resume_id for resume_id, _ in matches])
+    return {
+        "indexed_resumes": len(resume_index),
+        "resumes": [
+            {
+                "resume_id": str(resume["_id"]),
+                "job_id": resume["job_id"],
+                "resume": resume["filename"],
+                "similarity": round(similarities[resume["_id"]], 4),
+                "extracted_resume_skills": resume["skills"],
+                "candidate_experience": resume["work_experience"],
+                "candidate_education": resume["education"]
+            }
+            for resume in resumes
+        ]
+    }
+
 
-    except Exception as e:
-        logging.error(f"❌ Error ranking candidates: {type(e).__name__} - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error ranking candidates: {type(e).__name__} - {str(e)}")
+@app.get("/get_ranked_candidates_with_feedback/{job_id}")
+async def get_ranked_candidates_with_feedback(job_id: str, limit: Optional[int] = None, min_score: Optional[float] = None):
+    """
+    Ranks a job's candidates, best first. `limit` caps how many are returned
+    and `min_score` drops candidates below that match percentage; only the
+    returned candidates are ever held in memory.
+    """
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    # ✅ Interactive lane: goes ahead of resume parsing for the CPU
+    async with cpu_stage.slot(INTERACTIVE):
+        try:
+            job_id = ObjectId(job_id)
+            job = await load_job(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found.")
+
+            if leaderboard.is_current(job):
+                # ✅ Read the leaderboard in order: only the top `limit` resumes are loaded (ranking fields only)
+                resumes = await leaderboard.top(job_id, limit, min_score)
+            else:
+                # ✅ Stored scores predate the job's current skills: the index is rebuilt in the background,
+                # and meanwhile the job's resumes are streamed through a bounded top-K heap
+                if not leaderboard.is_rescoring(job_id):
+                    leaderboard.schedule_rescore(job, score_resumes)
+                winners = await leaderboard.stream_top(job_id, lambda batch: score_resumes(job, batch), limit, min_score)
+                resumes = await leaderboard.fetch([resume_id for _, resume_id in winners])
+
+            if not resumes and min_score is None:
+                return {"message": "No resumes uploaded for this job."}
+            extracted_job_skills = job["extracted_skills"]
+            required_experience = job["experience_years"]
+
+            for resume in resumes:
+                if resume.get("filename", "Unknown Filename") == "Unknown Filename":
+                    logging.warning(f"❌ Missing filename for resume with job_id: {job_id}")
+            resume_data = await refresh_resume_features(resumes, job)
+
+            logging.info(f"Resume Data Prepared: {len(resume_data)} resumes.")
+
+            ranked_candidates = rank_candidates(job["skill_ids"], required_experience, resume_data)
+
+            response = {
+                "extracted_job_skills": extracted_job_skills,
+                "ranked_candidates": [candidate_response(candidate, required_experience) for candidate in ranked_candidates]
+            }
+
+            return response
+
+        except Exception as e:
+            logging.error(f"❌ Error ranking candidates: {type(e).__name__} - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error ranking candidates: {type(e).__name__} - {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn
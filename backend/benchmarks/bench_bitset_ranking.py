@@ -0,0 +1,61 @@
+"""
+Skill-overlap scoring for every candidate of a job: per-resume Python sets
+vs. one AND + popcount over the N×W bitset matrix.
+
+Usage (from backend/):
+    python benchmarks/bench_bitset_ranking.py --resumes 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from skill_bitsets import bitset_width, overlap, stack_bitsets, to_bitset, to_bytes  # noqa: E402
+from skill_taxonomy import SkillTaxonomy  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--skills-per-resume", type=int, default=25)
+    parser.add_argument("--job-skills", type=int, default=15)
+    args = parser.parse_args()
+
+    taxonomy = SkillTaxonomy.from_csv(os.path.join(os.path.dirname(__file__), "..", "RoleSkills.csv"))
+    width = bitset_width(len(taxonomy))
+    rng = random.Random(0)
+    skill_ids = range(len(taxonomy))
+    resumes = [sorted(rng.sample(skill_ids, args.skills_per_resume)) for _ in range(args.resumes)]
+    job_skills = rng.sample(skill_ids, args.job_skills)
+    stored_bits = [to_bytes(ids, width) for ids in resumes]
+    experience = np.array([rng.uniform(0, 10) for _ in resumes])
+
+    print(f"{args.resumes} resumes, {len(taxonomy)} skills ({width} uint64 blocks), {args.job_skills} job skills")
+
+    start = time.perf_counter()
+    job_set = set(job_skills)
+    set_counts = [len(job_set & set(ids)) for ids in resumes]
+    set_time = time.perf_counter() - start
+    print(f"  python sets      {set_time * 1000:10.1f} ms")
+
+    start = time.perf_counter()
+    matrix = stack_bitsets(stored_bits, width)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    _, counts = overlap(matrix, to_bitset(job_skills, width))
+    scores = np.round(counts / len(job_skills) * 100, 2) + np.minimum(experience, 5)
+    np.argsort(-scores, kind="stable")
+    bitset_time = time.perf_counter() - start
+    print(f"  bitset matrix    {bitset_time * 1000:10.1f} ms  (+{load_time * 1000:.1f} ms to stack stored bytes)")
+
+    assert counts.tolist() == set_counts, "bitset and set overlap counts differ"
+    print(f"  speedup          {set_time / bitset_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Embedding store: cache hit rate over repeated scoring passes, and what
+int8 storage costs in ranking quality.
+
+A synthetic corpus of resume sections (built from RoleSkills.csv skills) is
+scored against job descriptions `--passes` times, with `--churn` of the
+sections replaced by new ones between passes, the way re-scoring a job's
+candidates re-embeds mostly the same text. Every pass looks the sections up
+in the store and encodes only the misses.
+
+Quality: top-k by the store's int8 scores vs. top-k by exact float32 dot
+products, as recall@k, plus the mean absolute score error, storage size and
+scoring time of both.
+
+Usage (from backend/):
+    python benchmarks/bench_embedding_store.py --encoder hashing --corpus 5000 --k 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_store import EmbeddingStore  # noqa: E402
+from embeddings import ENCODERS, create_encoder  # noqa: E402
+from skill_taxonomy import SkillTaxonomy  # noqa: E402
+
+SKILLS_CSV = os.path.join(os.path.dirname(__file__), "..", "RoleSkills.csv")
+
+TEMPLATES = [
+    "Experienced with {0}, {1} and {2}; built production services using {3}.",
+    "Skills: {0}, {1}, {2}, {3}, {4}",
+    "Led a team delivering {0} and {1} projects, automated {2} workflows with {3}.",
+    "Seeking a role using {0} and {1}; coursework in {2} and {3}.",
+]
+
+
+def synthetic_texts(skills, n, rng):
+    return [rng.choice(TEMPLATES).format(*rng.sample(skills, 5)) + f" (#{rng.randrange(10 ** 9)})"
+            for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--encoder", default="hashing", choices=list(ENCODERS))
+    parser.add_argument("--corpus", type=int, default=5000, help="Resume sections per pass")
+    parser.add_argument("--queries", type=int, default=50, help="Job descriptions scored against them")
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--churn", type=float, default=0.1, help="Share of sections replaced between passes")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = SkillTaxonomy.from_csv(SKILLS_CSV).names
+    encoder = create_encoder(args.encoder)
+    corpus = synthetic_texts(skills, args.corpus, rng)
+    queries = encoder.encode(synthetic_texts(skills, args.queries, rng))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = EmbeddingStore(encoder.model_id, encoder.dim, directory)
+
+        # ✅ Hit rate over repeated passes
+        print(f"{'pass':>4} {'hit rate':>9} {'encoded':>8} {'seconds':>8}")
+        encoded_total = 0
+        for n in range(args.passes):
+            if n:
+                for i in rng.sample(range(len(corpus)), int(args.churn * len(corpus))):
+                    corpus[i] = synthetic_texts(skills, 1, rng)[0]
+            hits_before, misses_before = store.hits, store.misses
+            started = time.perf_counter()
+            rows = store.rows(corpus)
+            missing = [text for text, row in zip(corpus, rows) if row < 0]
+            if missing:
+                store.put(missing, encoder.encode(missing))
+            seconds = time.perf_counter() - started
+            hits, misses = store.hits - hits_before, store.misses - misses_before
+            encoded_total += len(missing)
+            print(f"{n + 1:>4} {hits / (hits + misses):>9.1%} {len(missing):>8} {seconds:>8.3f}")
+        print(f"Overall hit rate {store.stats()['hit_rate']:.1%}: encoded {encoded_total} sections "
+              f"instead of {args.passes * len(corpus)}")
+
+        # ✅ Quality and cost of int8 scoring, on the last pass's corpus
+        rows = store.rows(corpus)
+        exact_vectors = encoder.encode(corpus)
+        started = time.perf_counter()
+        exact = exact_vectors @ queries.T
+        exact_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        quantized = store.scores(queries, rows)
+        quantized_seconds = time.perf_counter() - started
+
+        k = min(args.k, len(corpus))
+        exact_top = np.argsort(-exact, axis=0)[:k]
+        quantized_top = np.argsort(-quantized, axis=0)[:k]
+        recall = np.mean([len(set(exact_top[:, q]) & set(quantized_top[:, q])) / k for q in range(len(queries))])
+
+        float_bytes = exact_vectors.nbytes
+        int8_bytes = len(corpus) * store.record.itemsize
+        print(f"\nrecall@{k} of int8 vs float32 ranking: {recall:.4f}")
+        print(f"mean |score error|: {np.abs(quantized - exact).mean():.5f} (max {np.abs(quantized - exact).max():.5f})")
+        print(f"storage: float32 {float_bytes / 1024:.0f} KB, int8 + scale + key {int8_bytes / 1024:.0f} KB "
+              f"({float_bytes / int8_bytes:.1f}x smaller)")
+        print(f"scoring {len(corpus)} x {len(queries)}: float32 {exact_seconds * 1000:.1f} ms, "
+              f"int8 store {quantized_seconds * 1000:.1f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
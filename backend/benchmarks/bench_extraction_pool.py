@@ -0,0 +1,81 @@
+"""
+Upload throughput vs. extraction pool size.
+
+Fires N concurrent extractions of the same resume at the pool, the same way
+concurrent /upload_resume requests would, and reports requests/sec and
+per-request latency for each pool size. "inline" is the old behaviour of
+parsing directly on the event loop.
+
+Usage (from backend/):
+    python benchmarks/bench_extraction_pool.py --requests 64 --sizes 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from extraction import ExtractionPool, extract_text_from_resume  # noqa: E402
+
+DEFAULT_RESUME = os.path.join(os.path.dirname(__file__), "..", "uploads", "Samhitha_Medulla_Resume.pdf")
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run_inline(file_bytes, filename, n):
+    async def one():
+        # What upload_resume used to do: parse on the event loop
+        extract_text_from_resume(file_bytes, filename)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(one()) for _ in range(n)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_pool(file_bytes, filename, n, size):
+    pool = ExtractionPool(size=size)
+    pool.start()
+    # Warm-up so process start-up isn't counted
+    await asyncio.gather(*(pool.extract(file_bytes, filename) for _ in range(size)))
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(pool.extract(file_bytes, filename)) for _ in range(n)))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed, latencies
+
+
+def report(label, n, elapsed, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:>8} | {n / elapsed:8.1f} req/s | p50 {statistics.median(latencies) * 1000:8.1f} ms | p99 {p99 * 1000:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", default=DEFAULT_RESUME)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4])
+    args = parser.parse_args()
+
+    with open(args.resume, "rb") as f:
+        file_bytes = f.read()
+    filename = os.path.basename(args.resume)
+
+    print(f"{args.requests} concurrent extractions of {filename} ({len(file_bytes)} bytes)")
+    elapsed, latencies = await run_inline(file_bytes, filename, args.requests)
+    report("inline", args.requests, elapsed, latencies)
+    for size in args.sizes:
+        elapsed, latencies = await run_pool(file_bytes, filename, args.requests, size)
+        report(f"pool={size}", args.requests, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Fuzzy skill canonicalization: one fuzzywuzzy extractOne per vocabulary skill
+per resume vs. FuzzySkillIndex scoring a whole batch of resumes at once.
+
+Both sides use token_sort_ratio > 80; the benchmark fails if any resume ends
+up with a different set of matched skills. fuzzywuzzy is the reference, so
+install python-Levenshtein for it (its pure-difflib fallback scores slightly
+differently).
+
+Usage (from backend/):
+    python benchmarks/bench_fuzzy_matching.py --resumes 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from fuzzywuzzy import fuzz, process
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fuzzy_matching import FUZZY_THRESHOLD, FuzzySkillIndex  # noqa: E402
+from skill_taxonomy import SkillTaxonomy  # noqa: E402
+
+NOISE = ["Team leadership", "Communication", "Agile/Scrum", "MS Office", "Problem solving", "Jira", "Confluence"]
+
+
+def synthetic_skills(taxonomy, rng, per_resume):
+    # Resume-style spellings: exact names, case/punctuation variants, typos, plus unrelated entries
+    skills = []
+    for name in rng.sample(taxonomy.names, per_resume):
+        variant = rng.random()
+        if variant < 0.3:
+            name = name.lower()
+        elif variant < 0.5:
+            name = name.replace(".", "").replace("-", " ")
+        elif variant < 0.7 and len(name) > 4:
+            i = rng.randrange(len(name))
+            name = name[:i] + name[i + 1:]
+        skills.append(name)
+    return skills + rng.sample(NOISE, 2)
+
+
+def legacy_canonical_ids(taxonomy, resume_skills):
+    ids = set()
+    for skill_id, name in enumerate(taxonomy.names):
+        best = process.extractOne(name, resume_skills, scorer=fuzz.token_sort_ratio)
+        if best and best[1] > FUZZY_THRESHOLD:
+            ids.add(skill_id)
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--skills-per-resume", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import Levenshtein  # noqa: F401
+        backend = "python-Levenshtein"
+    except ImportError:
+        backend = "difflib (results may differ slightly)"
+
+    taxonomy = SkillTaxonomy.from_csv(os.path.join(os.path.dirname(__file__), "..", "RoleSkills.csv"))
+    rng = random.Random(0)
+    resumes = [synthetic_skills(taxonomy, rng, args.skills_per_resume) for _ in range(args.resumes)]
+    print(f"{args.resumes} resumes × {len(resumes[0])} raw skills, "
+          f"{len(taxonomy)} vocabulary skills; fuzzywuzzy backend: {backend}")
+
+    start = time.perf_counter()
+    legacy = [legacy_canonical_ids(taxonomy, skills) for skills in resumes]
+    legacy_time = time.perf_counter() - start
+    print(f"  extractOne loop  {legacy_time * 1000:10.1f} ms")
+
+    start = time.perf_counter()
+    index = FuzzySkillIndex(taxonomy.names)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = index.match_batches(resumes)
+    batched_time = time.perf_counter() - start
+    print(f"  batched cdist    {batched_time * 1000:10.1f} ms  (+{build_time * 1000:.1f} ms to build the index)")
+
+    mismatches = sum(a != b for a, b in zip(legacy, batched))
+    print(f"  speedup          {legacy_time / batched_time:10.1f}x")
+    print(f"  mismatched resumes: {mismatches}")
+    assert mismatches == 0, "batched matching differs from fuzzywuzzy"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Skill vocabulary matching: per-skill regex loop vs. the Aho-Corasick matcher.
+
+Times the old extract_job_skills loop (one re.search per vocabulary entry)
+against SkillMatcher on a job description and on a full-length resume, and
+lists the skills on which the two disagree (the regex loop misses tokens
+that end in punctuation, like "C++" and "C#").
+
+Usage (from backend/):
+    python benchmarks/bench_skill_matcher.py [--resume-text resume.txt] [--repeat 50]
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from skill_matcher import SkillMatcher  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+JOB_DESCRIPTION = """
+Primary responsibilities include developing monitoring solutions, troubleshooting/debugging and
+implementing the fix for internally developed code (Perl, C/C++, JAVA). Performing SQL queries,
+improving our systems that gather metrics on our features. Preferred coding skills: Perl, C/C++
+and/or Java. Other desired technical skills include Mason, Perl CGI, Oracle SQL, HTML, UNIX/LINUX,
+C#, .NET, Node.js, React.js, Docker and Kubernetes. 2-5 years of relevant experience is required.
+"""
+
+
+def load_skills():
+    with open(os.path.join(BACKEND_DIR, "RoleSkills.csv"), encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [skill.strip() for row in rows for skill in row["Skills"].split(",") if skill.strip()]
+
+
+def legacy_extract_job_skills(description, skills):
+    description_lower = description.lower()
+    extracted_skills = set()
+    for skill in skills:
+        if re.search(r'\b' + re.escape(skill.lower()) + r'\b', description_lower):
+            extracted_skills.add(skill)
+    return list(extracted_skills)
+
+
+def synthetic_resume(skills):
+    # ~12 KB of resume-like prose that mentions a slice of the vocabulary
+    lines = []
+    for i in range(0, min(len(skills), 120), 6):
+        lines.append(f"Built and operated services with {', '.join(skills[i:i + 6])} for a team of {i % 9 + 2}.")
+    return "\n".join(lines * 4)
+
+
+def bench(label, fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(text)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<14} {elapsed * 1000:9.3f} ms/call")
+    return elapsed, set(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume-text", help="Plain-text resume to scan (default: synthetic)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    skills = load_skills()
+    start = time.perf_counter()
+    matcher = SkillMatcher(skills)
+    print(f"Vocabulary: {len(skills)} entries, {len(matcher.skills)} distinct; "
+          f"automaton {matcher.n_states} states, built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.resume_text:
+        with open(args.resume_text, encoding="utf-8") as f:
+            resume = f.read()
+    else:
+        resume = synthetic_resume(matcher.skills)
+
+    for name, text in (("job description", JOB_DESCRIPTION), ("resume", resume)):
+        print(f"\n{name} ({len(text)} chars)")
+        legacy_time, legacy_found = bench("regex loop", lambda t: legacy_extract_job_skills(t, skills), text, args.repeat)
+        matcher_time, matcher_found = bench("aho-corasick", matcher.extract, text, args.repeat)
+        print(f"  speedup        {legacy_time / matcher_time:9.1f}x")
+        print(f"  only regex:    {sorted(legacy_found - matcher_found)}")
+        print(f"  only matcher:  {sorted(matcher_found - legacy_found)}")
+
+
+if __name__ == "__main__":
+    main()
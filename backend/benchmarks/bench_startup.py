@@ -0,0 +1,137 @@
+"""
+Startup cost per component: import (and load) time and resident memory,
+each measured in a fresh interpreter so nothing is shared between them.
+
+The `app` row is what every uvicorn worker pays before serving. The
+benchmark fails (exit 1) if that import
+  - takes longer than --max-seconds or grows RSS by more than --max-rss-mb,
+  - pulls in any optional engine (torch, spaCy, NLTK, ...), or
+  - opens a network connection.
+Optional engines are listed too, loaded the way nlp_models loads them, so
+their cost when first used is visible; those not installed are skipped.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py --repeat 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Defaults for the regression check on `import app`
+MAX_APP_IMPORT_SECONDS = 3.0
+MAX_APP_RSS_MB = 250
+
+# Modules that must not be imported by `import app`
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers", "sklearn", "spacy", "nltk", "pandas"]
+
+COMPONENTS = [
+    ("python", "pass"),
+    ("numpy", "import numpy"),
+    ("fastapi", "import fastapi"),
+    ("pymongo", "import pymongo"),
+    ("extraction (pdfminer, docx)", "import extraction"),
+    ("fuzzy matching (rapidfuzz)", "import fuzzy_matching"),
+    ("skill taxonomy", "from skill_taxonomy import SkillTaxonomy; SkillTaxonomy.from_csv('RoleSkills.csv')"),
+    ("skill taxonomy (warm start)", "import warm_start; warm_start.WarmStart(warm_start.WARM_START_PATH).taxonomy()"),
+    ("app", "import app"),
+    # Optional engines, loaded on first use
+    ("torch", "import torch"),
+    ("sklearn", "import sklearn.feature_extraction.text"),
+    ("spacy model", "import nlp_models; nlp_models.get_nlp()"),
+    ("sentence model", "import nlp_models; nlp_models.get_sentence_model()"),
+    ("nltk stopwords", "import nlp_models; nlp_models.get_stopwords()"),
+]
+
+# Runs in the child: blocks outbound connections (recording them), then times the statement
+PROBE = r"""
+import json, socket, sys, time
+connections = []
+_connect = socket.socket.connect
+def connect(self, address):
+    if self.family != socket.AF_UNIX:
+        connections.append(str(address))
+        raise OSError("network access blocked during startup benchmark")
+    return _connect(self, address)
+socket.socket.connect = connect
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+before_rss = rss_mb()
+before_modules = set(sys.modules)
+start = time.perf_counter()
+error = None
+try:
+    exec(compile(sys.argv[1], "<component>", "exec"))
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+seconds = time.perf_counter() - start
+print(json.dumps({
+    "seconds": seconds,
+    "rss_mb": rss_mb() - before_rss,
+    "error": error,
+    "connections": connections,
+    "modules": sorted({name.split(".")[0] for name in set(sys.modules) - before_modules}),
+}))
+"""
+
+
+def measure(statement):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, statement], cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        return {"seconds": 0.0, "rss_mb": 0.0, "error": result.stderr.strip().splitlines()[-1:], "connections": [],
+                "modules": []}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per component (best time is reported)")
+    parser.add_argument("--max-seconds", type=float, default=MAX_APP_IMPORT_SECONDS)
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_APP_RSS_MB)
+    args = parser.parse_args()
+
+    print(f"{'component':<30} {'import s':>9} {'RSS MB':>8}")
+    failures = []
+    for name, statement in COMPONENTS:
+        runs = [measure(statement) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["seconds"])
+        if best["error"]:
+            print(f"{name:<30} {'skipped':>9}          ({best['error']})")
+            if name == "app":
+                failures.append(f"app failed to import: {best['error']}")
+            continue
+        print(f"{name:<30} {best['seconds']:>9.3f} {best['rss_mb']:>8.1f}")
+
+        if name != "app":
+            continue
+        if best["seconds"] > args.max_seconds:
+            failures.append(f"app import took {best['seconds']:.2f}s (budget {args.max_seconds}s)")
+        if best["rss_mb"] > args.max_rss_mb:
+            failures.append(f"app import grew RSS by {best['rss_mb']:.0f} MB (budget {args.max_rss_mb} MB)")
+        heavy = sorted(set(best["modules"]) & set(HEAVY_MODULES))
+        if heavy:
+            failures.append(f"app imports optional engines at startup: {', '.join(heavy)}")
+        if best["connections"]:
+            failures.append(f"app opens network connections at startup: {', '.join(best['connections'])}")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nStartup within budget: no optional engines, no network")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Vector index: search latency and recall of JD → resume retrieval at corpus
+scale.
+
+`--vectors` synthetic embeddings (unit vectors around `--topics` random
+directions, the way resume embeddings cluster by field) are added to an
+IVFIndex in batches, as ingestion would. The exact top-k of every query is
+kept alongside (float32, brute force), without holding the corpus in
+memory. Then, for each `--probes` setting, the queries are searched and
+latency (p50/p99) and recall@k against the exact top-k are reported, plus
+add throughput, training time, and the time to reopen the index from disk.
+
+Usage (from backend/):
+    python benchmarks/bench_vector_index.py --vectors 1000000 --dim 384 --probes 8 16 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embeddings import normalize_rows  # noqa: E402
+from vector_index import VECTOR_INDEX_LISTS, IVFIndex  # noqa: E402
+
+
+def sample(centers, n, noise, rng):
+    vectors = centers[rng.integers(len(centers), size=n)]
+    return normalize_rows(vectors + noise * rng.standard_normal(vectors.shape).astype(np.float32))
+
+
+def merge_top(top_scores, top_rows, scores, offset, k):
+    """Keeps the k best (score, row) per query across chunks of the corpus."""
+    rows = np.broadcast_to(np.arange(offset, offset + scores.shape[1]), scores.shape)
+    all_scores = np.concatenate([top_scores, scores], axis=1)
+    all_rows = np.concatenate([top_rows, rows], axis=1)
+    best = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_scores, best, axis=1), np.take_along_axis(all_rows, best, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=4000)
+    parser.add_argument("--noise", type=float, default=0.05, help="Per-dimension spread around a topic")
+    parser.add_argument("--lists", type=int, default=VECTOR_INDEX_LISTS)
+    parser.add_argument("--probes", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=10_000, help="Vectors added per call")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = normalize_rows(rng.standard_normal((args.topics, args.dim)).astype(np.float32))
+    queries = sample(centers, args.queries, args.noise, rng)
+    top_scores = np.full((args.queries, 0), -np.inf, dtype=np.float32)
+    top_rows = np.zeros((args.queries, 0), dtype=np.int64)
+    keys = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = IVFIndex("bench", args.dim, directory, lists=args.lists, probes=max(args.probes))
+
+        # ✅ Incremental adds (the first one past lists x TRAIN_PER_LIST vectors trains the lists)
+        add_seconds, slowest = 0.0, (0.0, 0)
+        for start in range(0, args.vectors, args.batch):
+            vectors = sample(centers, min(args.batch, args.vectors - start), args.noise, rng)
+            batch_keys = [ObjectId().binary for _ in range(len(vectors))]
+            started = time.perf_counter()
+            index.add(batch_keys, vectors)
+            seconds = time.perf_counter() - started
+            add_seconds += seconds
+            slowest = max(slowest, (seconds, start))
+            keys.extend(batch_keys)
+            top_scores, top_rows = merge_top(top_scores, top_rows, queries @ vectors.T, start, args.k)
+        print(f"added {len(index)} vectors of dimension {args.dim} in {add_seconds:.1f}s "
+              f"({len(index) / add_seconds:,.0f}/s); slowest add {slowest[0]:.1f}s at {slowest[1]:,} "
+              f"(training {args.lists} lists)")
+        print(f"index file: {index.stats()['bytes'] / 2 ** 20:.0f} MB")
+
+        started = time.perf_counter()
+        reopened = IVFIndex("bench", args.dim, directory, lists=args.lists)
+        reopened.contains(keys[:1])
+        print(f"reopened from disk in {time.perf_counter() - started:.2f}s")
+        reopened.close()
+
+        # ✅ Latency and recall per probes setting
+        exact = [{keys[row] for row in rows} for rows in top_rows]
+        print(f"\n{'probes':>6} {'p50 ms':>8} {'p99 ms':>8} {'recall@' + str(args.k):>10}")
+        for probes in args.probes:
+            index.probes = probes
+            latencies, recall = [], []
+            for query, expected in zip(queries, exact):
+                started = time.perf_counter()
+                found, _ = index.search(query, args.k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recall.append(len(expected & set(found)) / args.k)
+            print(f"{probes:>6} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f} "
+                  f"{np.mean(recall):>10.4f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Per-worker memory with `uvicorn app:app --workers N` (every worker spawned
+fresh, importing and loading everything itself) vs. `serve.py` (loaded once
+in the parent, workers forked from it and sharing those pages).
+
+Starts each server on a scratch SQLite database, waits for it to come up,
+and reads /proc/<pid>/smaps_rollup of every worker, once idle and once more
+after a burst of job submissions (which run the skill matcher and
+taxonomy). USS (private pages, freed if the worker exits) is what each
+extra worker really costs; PSS splits shared pages between their users.
+PRELOAD_ENGINES (or --preload-engines) is passed to both servers, so with
+"all" the NLP models are loaded by every worker in one case and once in
+the other.
+
+Usage (from backend/, Linux only):
+    python benchmarks/bench_workers.py --workers 4 --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+JOB = {
+    "job_title": "Backend Engineer",
+    "job_description": "5+ years of Python, FastAPI and MongoDB. Docker, Kubernetes and AWS are a plus; "
+                       "experience with React, SQL and CI/CD pipelines preferred.",
+}
+
+
+def commands(workers, port):
+    return {
+        "uvicorn --workers": [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers)],
+        "serve.py (preload, fork)": [sys.executable, "serve.py", "--port", str(port), "--workers", str(workers)],
+    }
+
+
+def memory_kb(pid):
+    """Rss, Pss and USS (Private_Clean + Private_Dirty) of a process, in kB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields["Rss"], "pss": fields["Pss"], "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def worker_pids(parent_pid):
+    """The server's worker processes: its direct children, minus multiprocessing helpers."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent_pid and b"resource_tracker" not in cmdline:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def request(port, method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return response.status
+
+
+def wait_until_up(port, process, workers, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if request(port, "GET", "/metrics") == 200 and len(worker_pids(process.pid)) >= workers:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not up after {timeout}s")
+
+
+def summarize(label, samples):
+    uss = [sample["uss"] for sample in samples]
+    pss = [sample["pss"] for sample in samples]
+    rss = [sample["rss"] for sample in samples]
+    print(f"  {label:<22} USS {statistics.mean(uss) / 1024:>7.1f} MB   PSS {statistics.mean(pss) / 1024:>7.1f} MB   "
+          f"RSS {statistics.mean(rss) / 1024:>7.1f} MB   (per worker; USS total {sum(uss) / 1024:.1f} MB)")
+    return statistics.mean(uss)
+
+
+def run(name, command, args, env):
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.port, process, args.workers, args.timeout)
+        time.sleep(args.settle)
+        pids = worker_pids(process.pid)
+        print(f"{name}: {len(pids)} workers")
+        idle = summarize("idle", [memory_kb(pid) for pid in pids])
+        for _ in range(args.requests):
+            request(args.port, "POST", "/add_job/", JOB)
+            request(args.port, "GET", "/metrics")
+        time.sleep(args.settle)
+        loaded = summarize(f"after {args.requests} jobs", [memory_kb(pid) for pid in pids])
+        launcher = memory_kb(process.pid)
+        print(f"  {'launcher':<22} USS {launcher['uss'] / 1024:>7.1f} MB")
+        return idle, loaded
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Jobs submitted before the second measurement")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--preload-engines", default=os.getenv("PRELOAD_ENGINES", ""))
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait before each measurement")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for a server to come up")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for name, command in commands(args.workers, args.port).items():
+            env = {**os.environ, "STORAGE_BACKEND": "sqlite", "SQLITE_PATH": os.path.join(scratch, f"{len(results)}.db"),
+                   "EXTRACTION_POOL_SIZE": "1", "PRELOAD_ENGINES": args.preload_engines}
+            results[name] = run(name, command, args, env)
+
+    (base_idle, base_loaded), (fork_idle, fork_loaded) = results.values()
+    print(f"\nUSS per worker, serve.py vs uvicorn: idle {fork_idle / base_idle:.0%}, "
+          f"after requests {fork_loaded / base_loaded:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Embedding server: one local process owns the embedding model, and every API
+worker on the box sends it texts over a Unix socket instead of loading its
+own copy (a transformer per worker multiplies memory, and their thread pools
+fight over the same cores).
+
+    python embedding_server.py                        (from backend/)
+    python embedding_server.py --encoder hashing      (no model needed)
+
+Requests from all connections are micro-batched: the first waiting request
+opens a batch, requests arriving within EMBEDDING_MAX_WAIT_MS (or while the
+previous batch is encoding) join it, up to EMBEDDING_MAX_BATCH texts, and the
+encoder runs once per batch. Identical texts in a batch are encoded once.
+
+Protocol: each message is a little-endian uint32 length plus that many bytes.
+A request is one JSON message ({"op": "encode", "texts": [...]}, or "info",
+or "stats"). The reply is a JSON header ({"model_id", "dim", "count"} or
+{"error"}), followed for "encode" by one message of count x dim float32s.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import struct
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from admission import LatencyWindow
+from embeddings import EMBEDDING_ENCODER, ENCODERS, EmbeddingError, Encoder, create_encoder
+
+logger = logging.getLogger(__name__)
+
+# ✅ Server settings (overridable per deployment)
+EMBEDDING_SOCKET = os.getenv("EMBEDDING_SOCKET", "embedding_server.sock")
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "2"))
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "30"))
+
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+_LENGTH = struct.Struct("<I")
+
+
+class EmbeddingUnavailable(EmbeddingError):
+    """The embedding server can't be reached (not running, timed out, connection lost)."""
+
+
+async def read_message(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length > MAX_MESSAGE_BYTES:
+        raise EmbeddingError(f"Message of {length} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return await reader.readexactly(length)
+
+
+def write_message(writer: asyncio.StreamWriter, data: bytes):
+    writer.write(_LENGTH.pack(len(data)) + data)
+
+
+class MicroBatcher:
+    """Collects encode requests from concurrent callers into batches for one encoder."""
+
+    def __init__(self, encoder: Encoder, max_batch: int = EMBEDDING_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_MAX_WAIT_MS):
+        self.encoder = encoder
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending = deque()  # (texts, future, enqueued_at)
+        self._pending_texts = 0
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.texts = 0
+        self.unique_texts = 0
+        self.batches = 0
+        self.queue_wait = LatencyWindow()
+        self.encode_time = LatencyWindow()
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.encoder.dim), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((texts, future, time.monotonic()))
+        self._pending_texts += len(texts)
+        self._wakeup.set()
+        return await future
+
+    def _take_batch(self) -> List[Tuple[List[str], asyncio.Future, float]]:
+        # At least one request, then whole requests while they fit
+        batch, size = [], 0
+        while self._pending and (not batch or size + len(self._pending[0][0]) <= self.max_batch):
+            texts, future, enqueued_at = self._pending.popleft()
+            self._pending_texts -= len(texts)
+            size += len(texts)
+            if not future.done():  # Skip callers that gave up
+                batch.append((texts, future, enqueued_at))
+        return batch
+
+    async def run(self):
+        while True:
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if self._pending_texts < self.max_batch and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)  # Give concurrent callers a moment to join
+            batch = self._take_batch()
+            if batch:
+                await self._encode_batch(batch)
+
+    async def _encode_batch(self, batch):
+        started = time.monotonic()
+        for _, _, enqueued_at in batch:
+            self.queue_wait.add(started - enqueued_at)
+        unique = list(dict.fromkeys(text for texts, _, _ in batch for text in texts))
+        try:
+            vectors = await asyncio.to_thread(self.encoder.encode, unique)
+        except Exception as e:
+            logger.error(f"❌ Encoding a batch of {len(unique)} texts failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(EmbeddingError(str(e)))
+            return
+        self.encode_time.add(time.monotonic() - started)
+        self.requests += len(batch)
+        self.texts += sum(len(texts) for texts, _, _ in batch)
+        self.unique_texts += len(unique)
+        self.batches += 1
+
+        row = {text: i for i, text in enumerate(unique)}
+        for texts, future, _ in batch:
+            if not future.done():
+                future.set_result(vectors[[row[text] for text in texts]])
+
+    def start(self):
+        self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {
+            "model_id": self.encoder.model_id,
+            "requests": self.requests,
+            "texts": self.texts,
+            "unique_texts": self.unique_texts,
+            "batches": self.batches,
+            "mean_batch_texts": round(self.unique_texts / self.batches, 2) if self.batches else 0.0,
+            "queue_wait": self.queue_wait.stats(),
+            "encode_time": self.encode_time.stats(),
+        }
+
+
+class EmbeddingServer:
+    """Serves one encoder on a Unix socket, micro-batching across all connections."""
+
+    def __init__(self, encoder: Encoder, socket_path: str = EMBEDDING_SOCKET,
+                 max_batch: int = EMBEDDING_MAX_BATCH, max_wait_ms: float = EMBEDDING_MAX_WAIT_MS):
+        self.encoder = encoder
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(encoder, max_batch, max_wait_ms)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _info(self, count: int = 0) -> dict:
+        return {"model_id": self.encoder.model_id, "dim": self.encoder.dim, "count": count}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = json.loads(await read_message(reader))
+                op = request.get("op")
+                if op == "encode":
+                    try:
+                        vectors = await self.batcher.encode([str(text) for text in request["texts"]])
+                    except EmbeddingError as e:
+                        write_message(writer, json.dumps({"error": str(e)}).encode("utf-8"))
+                    else:
+                        write_message(writer, json.dumps(self._info(len(vectors))).encode("utf-8"))
+                        write_message(writer, np.ascontiguousarray(vectors, dtype="<f4").tobytes())
+                elif op == "info":
+                    write_message(writer, json.dumps(self._info()).encode("utf-8"))
+                elif op == "stats":
+                    write_message(writer, json.dumps(self.batcher.stats()).encode("utf-8"))
+                else:
+                    write_message(writer, json.dumps({"error": f"Unknown op {op!r}"}).encode("utf-8"))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away
+        except (EmbeddingError, ValueError, KeyError) as e:
+            logger.warning(f"⚠ Dropping a connection after a bad request: {e}")
+        finally:
+            writer.close()
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Left behind by a server that didn't shut down cleanly
+        self.batcher.start()
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"✅ Embedding server ({self.encoder.model_id}, dim {self.encoder.dim}) "
+                    f"listening on {self.socket_path}")
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class EmbeddingClient:
+    """
+    An API worker's connection to the embedding server. Connections are
+    opened on first use and kept for reuse, one per concurrent request.
+    """
+
+    def __init__(self, socket_path: str = EMBEDDING_SOCKET, timeout: float = EMBEDDING_TIMEOUT,
+                 max_idle: int = 8):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.model_id: Optional[str] = None  # As of the last reply
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencyWindow()
+
+    async def _connection(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._idle.clear()  # Bound to a loop that is gone
+            self._loop = loop
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await asyncio.open_unix_connection(self.socket_path)
+        except OSError as e:
+            raise EmbeddingUnavailable(f"Embedding server not reachable at {self.socket_path}: {e}")
+
+    async def _exchange(self, request: dict, with_vectors: bool) -> Tuple[dict, Optional[bytes]]:
+        reader, writer = await self._connection()
+        try:
+            write_message(writer, json.dumps(request).encode("utf-8"))
+            await writer.drain()
+            header = json.loads(await read_message(reader))
+            payload = await read_message(reader) if with_vectors and "error" not in header else None
+        except BaseException:
+            writer.close()  # Mid-exchange: the stream can't be reused
+            raise
+        if len(self._idle) < self.max_idle:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return header, payload
+
+    async def _request(self, request: dict, with_vectors: bool = False) -> Tuple[dict, Optional[bytes]]:
+        started = time.monotonic()
+        self.requests += 1
+        try:
+            header, payload = await asyncio.wait_for(self._exchange(request, with_vectors), self.timeout)
+        except asyncio.TimeoutError:
+            self.errors += 1
+            raise EmbeddingUnavailable(f"Embedding server did not answer within {self.timeout}s")
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.errors += 1
+            raise EmbeddingUnavailable(f"Lost the connection to the embedding server: {e}")
+        except EmbeddingError:
+            self.errors += 1
+            raise
+        if "error" in header:
+            self.errors += 1
+            raise EmbeddingError(header["error"])
+        self.model_id = header.get("model_id", self.model_id)
+        self.latency.add(time.monotonic() - started)
+        return header, payload
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """One L2-normalized float32 row per text."""
+        header, payload = await self._request({"op": "encode", "texts": list(texts)}, with_vectors=True)
+        return np.frombuffer(payload, dtype="<f4").reshape(header["count"], header["dim"])
+
+    async def info(self) -> dict:
+        """The server's model_id and dim."""
+        header, _ = await self._request({"op": "info"})
+        return {"model_id": header["model_id"], "dim": header["dim"]}
+
+    async def server_stats(self) -> dict:
+        header, _ = await self._request({"op": "stats"})
+        return header
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+    def stats(self) -> dict:
+        return {"socket": self.socket_path, "requests": self.requests, "errors": self.errors,
+                "latency": self.latency.stats()}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Serve embeddings to the API workers over a Unix socket")
+    parser.add_argument("--socket", default=EMBEDDING_SOCKET)
+    parser.add_argument("--encoder", default=EMBEDDING_ENCODER, choices=list(ENCODERS))
+    parser.add_argument("--max-batch", type=int, default=EMBEDDING_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    server = EmbeddingServer(create_encoder(args.encoder), args.socket, args.max_batch, args.max_wait_ms)
+    await server.start()
+    try:
+        await stopping.wait()
+    finally:
+        await server.close()
+        logger.info(f"✅ Embedding server stopped: {server.batcher.stats()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_server import EmbeddingClient, EmbeddingError
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, fine for a single dev server
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ✅ Store settings (overridable per deployment)
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "embedding_store")
+
+MAGIC = b"RSEMB\0\0\0"
+FORMAT_VERSION = 1
+HEADER_SIZE = 256
+KEY_BYTES = 16
+
+LOCK_SH, LOCK_EX = (fcntl.LOCK_SH, fcntl.LOCK_EX) if fcntl else (0, 0)
+
+# Rows dequantized to float32 at a time while scoring (bounds the temporary copy)
+SCORE_CHUNK = 8192
+
+
+def normalize_text(text: str) -> str:
+    """The form a text is keyed by: NFKC, whitespace runs collapsed, ends stripped."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()[:KEY_BYTES]
+
+
+@contextmanager
+def flock(fd: int, operation: int):
+    """Holds a shared or exclusive flock on the file (no-op where fcntl is missing)."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, operation)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def open_record_file(path: str, header: bytes) -> int:
+    """Opens (creating it, with `header`, if needed) an append-only file of records, checking its header."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with flock(fd, LOCK_EX):
+            if os.fstat(fd).st_size == 0:
+                os.pwrite(fd, header, 0)
+            elif os.pread(fd, len(header), 0) != header:
+                raise ValueError(f"{path} holds another model, dimension or format")
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization: vector ≈ codes * scale, |codes| <= 127."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0, dtype=np.float32)
+    safe = np.where(scales > 0, scales, 1.0)
+    codes = np.clip(np.rint(vectors / safe[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class EmbeddingStore:
+    """
+    Persistent embeddings of one model, keyed by the SHA-256 of the
+    normalized text, so a text is encoded once per model, ever.
+
+    Vectors are stored int8-quantized with a float32 scale each (4x smaller
+    than float32) in an append-only file of fixed-size records that is
+    memory-mapped read-only; scores are computed straight from the int8 rows
+    with numpy, never through per-vector Python objects. All workers on the
+    box share the file: appends take an exclusive flock, and a worker that
+    misses picks up rows other workers added since it last looked.
+    """
+
+    def __init__(self, model_id: str, dim: int, directory: str = EMBEDDING_STORE_DIR):
+        self.model_id = model_id
+        self.dim = dim
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)[:64]
+        self.path = os.path.join(directory, f"{slug}-{hashlib.sha1(model_id.encode('utf-8')).hexdigest()[:8]}.emb")
+        self.record = np.dtype([("key", f"V{KEY_BYTES}"), ("scale", "<f4"), ("vector", "i1", (dim,))])
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None  # Opened on first use (after any fork)
+        self._map: Optional[mmap.mmap] = None
+        self._records = np.zeros(0, dtype=self.record)
+        self._index = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ✅ File
+    def _header(self) -> bytes:
+        meta = json.dumps({"model_id": self.model_id, "dim": self.dim}).encode("utf-8")
+        header = MAGIC + struct.pack("<II", FORMAT_VERSION, len(meta)) + meta
+        if len(header) > HEADER_SIZE:
+            raise ValueError(f"Model id too long: {self.model_id}")
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _file(self) -> int:
+        if self._fd is None:
+            self._fd = open_record_file(self.path, self._header())
+        return self._fd
+
+    def _refresh(self):
+        """Maps and indexes rows appended since the last look (caller holds the flock)."""
+        count = (os.fstat(self._fd).st_size - HEADER_SIZE) // self.record.itemsize
+        if count <= len(self._records):
+            return
+        # Earlier maps stay alive while arrays handed out still point into them
+        self._map = mmap.mmap(self._fd, HEADER_SIZE + count * self.record.itemsize, access=mmap.ACCESS_READ)
+        records = np.frombuffer(self._map, dtype=self.record, count=count, offset=HEADER_SIZE)
+        start = len(self._records)
+        keys = records["key"][start:].tobytes()
+        self._index.update((keys[i * KEY_BYTES:(i + 1) * KEY_BYTES], start + i) for i in range(count - start))
+        self._records = records
+
+    # ✅ Lookups
+    def rows(self, texts: Sequence[str]) -> np.ndarray:
+        """The row of each text's vector, -1 where there is none yet."""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            fd = self._file()
+            rows = np.array([self._index.get(key, -1) for key in keys], dtype=np.int64)
+            if (rows < 0).any():
+                with flock(fd, LOCK_SH):
+                    self._refresh()
+                rows = np.array([self._index.get(key, -1) for key in keys], dtype=np.int64)
+        misses = int((rows < 0).sum())
+        self.hits += len(rows) - misses
+        self.misses += misses
+        return rows
+
+    def put(self, texts: Sequence[str], vectors: np.ndarray) -> np.ndarray:
+        """Stores vectors (one per text, same model) and returns their rows."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(texts), self.dim):
+            raise ValueError(f"Expected {len(texts)} vectors of dimension {self.dim}, got {vectors.shape}")
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            fd = self._file()
+            with flock(fd, LOCK_EX):
+                self._refresh()
+                new = {}
+                for i, key in enumerate(keys):
+                    if key not in self._index and key not in new:
+                        new[key] = i
+                if new:
+                    codes, scales = quantize(vectors[list(new.values())])
+                    block = np.zeros(len(new), dtype=self.record)
+                    block["key"] = np.frombuffer(b"".join(new), dtype=f"V{KEY_BYTES}")
+                    block["scale"] = scales
+                    block["vector"] = codes
+                    # At the end of the last whole record, overwriting any torn write of a crashed worker
+                    os.pwrite(fd, block.tobytes(), HEADER_SIZE + len(self._records) * self.record.itemsize)
+                    self._refresh()
+            return np.array([self._index[key] for key in keys], dtype=np.int64)
+
+    # ✅ Scoring
+    def scores(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Dot products of float32 queries (dim,) or (m, dim) with the stored
+        vectors at `rows`: shape (len(rows),) or (len(rows), m). For
+        L2-normalized queries and vectors these are cosine similarities.
+        """
+        # Field views into the mapping: gathering only the int8 rows, not whole records
+        records = self._records
+        vectors, scales = records["vector"], records["scale"]
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.empty((len(rows),) + queries.shape[:-1], dtype=np.float32)
+        for start in range(0, len(rows), SCORE_CHUNK):
+            chunk = rows[start:start + SCORE_CHUNK]
+            out[start:start + len(chunk)] = (vectors[chunk].astype(np.float32) @ queries.T) \
+                * scales[chunk].reshape((-1,) + (1,) * (queries.ndim - 1))
+        return out
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Dequantized float32 vectors at `rows`."""
+        records = self._records
+        return records["vector"][rows].astype(np.float32) * records["scale"][rows][:, None]
+
+    def __len__(self):
+        return len(self._records)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model_id": self.model_id,
+            "entries": len(self._records),
+            "bytes": HEADER_SIZE + len(self._records) * self.record.itemsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CachedEmbedder:
+    """
+    Embeds texts through the embedding server, but only the ones the store
+    doesn't have yet; everything else comes from the store.
+    """
+
+    def __init__(self, client: EmbeddingClient, directory: str = EMBEDDING_STORE_DIR):
+        self.client = client
+        self.directory = directory
+        self._store: Optional[EmbeddingStore] = None
+
+    @property
+    def model_id(self) -> Optional[str]:
+        """The model the stored vectors come from; None until the first call."""
+        return self._store.model_id if self._store is not None else None
+
+    async def store(self) -> EmbeddingStore:
+        if self._store is None:
+            info = await self.client.info()
+            self._store = EmbeddingStore(info["model_id"], info["dim"], self.directory)
+        return self._store
+
+    async def rows(self, texts: List[str]) -> np.ndarray:
+        """Store rows of the texts' vectors, embedding (and storing) the missing ones first."""
+        store = await self.store()
+        rows = await asyncio.to_thread(store.rows, texts)
+        missing = list(dict.fromkeys(text for text, row in zip(texts, rows) if row < 0))
+        if missing:
+            vectors = await self.client.embed(missing)
+            if self.client.model_id != store.model_id:
+                self._store = None  # The server changed models; the next call uses the new model's store
+                raise EmbeddingError(f"Embedding model changed from {store.model_id} to {self.client.model_id}")
+            added = dict(zip(missing, await asyncio.to_thread(store.put, missing, vectors)))
+            rows = np.array([added[text] if row < 0 else row for text, row in zip(texts, rows)], dtype=np.int64)
+        return rows
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Vectors of the texts (dequantized from the store)."""
+        store = await self.store()
+        return store.vectors(await self.rows(texts))
+
+    async def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    def stats(self) -> dict:
+        return self._store.stats() if self._store is not None else {"model_id": None, "entries": 0}
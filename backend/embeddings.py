@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# ✅ Encoder the embedding server loads (overridable per deployment): a name from ENCODERS
+EMBEDDING_ENCODER = os.getenv("EMBEDDING_ENCODER", "sentence-transformers")
+HASHING_DIM = int(os.getenv("HASHING_DIM", "384"))
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+class EmbeddingError(Exception):
+    """Texts could not be embedded (encoder failure, or the embedding server failed a request)."""
+
+
+class Encoder(ABC):
+    """
+    Turns texts into L2-normalized float32 vectors, one row per text.
+    `model_id` names the model and its version: vectors from encoders with
+    different IDs are never compared (or cached) together.
+    """
+
+    model_id: str  # Set by each encoder, e.g. "hashing-v1-384"
+    dim: int  # Length of every vector it returns
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """A (len(texts), dim) array of L2-normalized float32 rows."""
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32, copy=False)
+
+
+class HashingEncoder(Encoder):
+    """
+    Deterministic bag-of-words encoder: words and word bigrams are hashed
+    (with a fixed hash, not Python's per-process one) into `dim` signed
+    buckets. No model, no download, same vectors in every process, so tests
+    and offline runs can exercise the whole embedding path. Texts that share
+    words get similar vectors; synonyms don't.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.model_id = f"hashing-v1-{dim}"
+
+    def _bucket(self, feature: str):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self.dim, 1.0 if digest >> 63 else -1.0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = [word.rstrip(".") for word in _TOKEN.findall(text.lower())]
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket, sign = self._bucket(feature)
+                vectors[row, bucket] += sign
+        return normalize_rows(vectors)
+
+
+class SentenceTransformerEncoder(Encoder):
+    """SENTENCE_MODEL from the local model cache (see nlp_models.get_sentence_model)."""
+
+    def __init__(self, batch_size: int = 64):
+        from nlp_models import SENTENCE_MODEL, get_sentence_model
+        self.model = get_sentence_model()
+        self.batch_size = batch_size
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.model_id = f"sentence-transformers/{SENTENCE_MODEL}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return vectors.astype(np.float32, copy=False)
+
+
+# Every encoder by name (EMBEDDING_ENCODER, `embedding_server.py --encoder`)
+ENCODERS: Dict[str, Callable[[], Encoder]] = {
+    "hashing": HashingEncoder,
+    "sentence-transformers": SentenceTransformerEncoder,
+}
+
+
+def create_encoder(name: str = EMBEDDING_ENCODER) -> Encoder:
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown encoder {name!r}; expected one of {list(ENCODERS)}")
+    return ENCODERS[name]()
+
+
+class LocalEmbedder:
+    """
+    An encoder run in this process, behind the same async `embed` as
+    CachedEmbedder. Meant for offline and single-process use; the named
+    encoder is created on first use, not at import.
+    """
+
+    def __init__(self, encoder: Optional[Encoder] = None, name: str = EMBEDDING_ENCODER):
+        self.encoder = encoder
+        self.name = name
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return self.encoder.model_id if self.encoder is not None else None
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        try:
+            if self.encoder is None:
+                self.encoder = await asyncio.to_thread(create_encoder, self.name)
+            return await asyncio.to_thread(self.encoder.encode, list(texts))
+        except Exception as e:
+            raise EmbeddingError(f"{self.name} encoder failed: {type(e).__name__}: {e}") from e
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from multiprocessing import get_context, shared_memory
+from typing import Optional
+
+from pdfminer.high_level import extract_text
+from docx import Document
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever text extraction or section parsing changes output, so cached
+# and stored results from older extractors are recomputed.
+EXTRACTOR_VERSION = "5"
+
+# ✅ Extraction pool settings (overridable per deployment)
+EXTRACTION_POOL_SIZE = int(os.getenv("EXTRACTION_POOL_SIZE", str(os.cpu_count() or 2)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+
+# Extra time the API process waits past the worker-side alarm before it
+# declares the worker wedged and recycles the pool.
+EXTRACTION_TIMEOUT_GRACE = 5.0
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a resume takes longer than EXTRACTION_TIMEOUT to parse."""
+
+
+class ExtractionCrashed(Exception):
+    """
+    Raised when the pool broke under a resume twice (a worker died or was
+    recycled). Possibly not this file's fault, so callers should retry.
+    """
+
+
+# ✅ Helper: Extract Text from Resume
+def extract_text_from_resume(file_bytes: bytes, filename: str):
+    try:
+        file_stream = BytesIO(file_bytes)
+        if filename.endswith(".pdf"):
+            # For PDF files, use pdfminer to extract text
+            return extract_text(file_stream)
+        elif filename.endswith(".docx"):
+            # For DOCX files, use python-docx to extract text
+            doc = Document(file_stream)
+            return "\n".join([para.text for para in doc.paragraphs])
+        return None  # Return None if the file format is unsupported
+    except ExtractionTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error extracting text: {e}")
+        return None
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _init_worker():
+    """
+    Runs once in every pool process. The parsers are imported at module level,
+    so by the time this runs pdfminer/python-docx are loaded and stay warm for
+    the lifetime of the process.
+    """
+    # Ctrl+C is handled by the API process, which shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _extract_from_shared_memory(shm_name: str, size: int, filename: str, timeout: float):
+    """
+    Worker entry point: reads the file bytes out of the shared memory block
+    created by the API process, so only the block name crosses the pipe.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        file_bytes = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text_from_resume(file_bytes, filename)
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ExtractionPool:
+    """
+    Long-lived process pool that runs resume text extraction off the event loop.
+
+    File bytes are handed to workers through shared memory instead of being
+    pickled, and every file gets at most `timeout` seconds of parsing.
+    """
+
+    def __init__(self, size: int = EXTRACTION_POOL_SIZE, timeout: float = EXTRACTION_TIMEOUT):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        if self._executor is None:
+            # spawn: the API process already runs an event loop and driver threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info(f"✅ Extraction pool started with {self.size} workers")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """
+        Kills the workers of `executor` (one is stuck in C code, or died) and
+        starts fresh ones, unless another caller already replaced it. Files
+        still in it fail with BrokenProcessPool, not cancellation.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = None
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False)
+        self.start()
+
+    async def extract(self, file_bytes: bytes, filename: str) -> Optional[str]:
+        """
+        Extracts text from a resume in a worker process. If the pool breaks
+        while the file is in it (its own worker died, or another file's
+        worker did), the file is resubmitted once to a fresh pool.
+
+        Raises:
+            ExtractionTimeout: If parsing takes longer than the pool timeout.
+            ExtractionCrashed: If the pool broke on both attempts.
+        """
+        self.start()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(file_bytes)))
+        try:
+            shm.buf[:len(file_bytes)] = file_bytes
+            for _ in range(2):
+                executor = self._executor
+                try:
+                    future = executor.submit(
+                        _extract_from_shared_memory, shm.name, len(file_bytes), filename, self.timeout
+                    )
+                    return await asyncio.wait_for(
+                        asyncio.wrap_future(future), self.timeout + EXTRACTION_TIMEOUT_GRACE
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"❌ Extraction worker stuck on {filename}, recycling pool")
+                    self._recycle(executor)
+                    raise ExtractionTimeout()
+                except BrokenProcessPool:
+                    logger.warning(f"⚠ Extraction pool broke while parsing {filename}, recycling pool")
+                    self._recycle(executor)
+            raise ExtractionCrashed(f"Extraction pool broke twice while parsing {filename}")
+        finally:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from extraction import EXTRACTOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+# ✅ Cache settings (overridable per deployment)
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "extraction_cache")
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "1024"))
+EXTRACTION_CACHE_DISK_ENTRIES = int(os.getenv("EXTRACTION_CACHE_DISK_ENTRIES", "50000"))
+EXTRACTION_CACHE_DISK_MB = int(os.getenv("EXTRACTION_CACHE_DISK_MB", "1024"))
+
+# A full disk tier is trimmed to this fraction of its caps, so it isn't swept again on the next write
+DISK_TRIM_RATIO = 0.9
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping with an eviction counter."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of extraction results.
+
+    Keys are the SHA-256 of the uploaded file plus the extractor version, so a
+    resume uploaded again (to any job) skips parsing, and bumping
+    EXTRACTOR_VERSION invalidates every entry. A bounded in-process LRU sits in
+    front of an on-disk tier that all uvicorn workers on the box share.
+
+    The disk tier is an LRU too, capped by entries and by bytes: an entry's
+    mtime is its last use (a disk hit touches it), so every worker sees the
+    same order, and a write that takes the tier over a cap deletes the least
+    recently used entries.
+    """
+
+    def __init__(self, directory: str = EXTRACTION_CACHE_DIR, max_entries: int = EXTRACTION_CACHE_SIZE,
+                 version: str = EXTRACTOR_VERSION, max_disk_entries: int = EXTRACTION_CACHE_DISK_ENTRIES,
+                 max_disk_bytes: int = EXTRACTION_CACHE_DISK_MB * 2 ** 20):
+        self.directory = directory
+        self.version = version
+        self._memory = LRUCache(max_entries)
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        # Running totals for the disk tier: counted on the first write, corrected by every trim
+        self._disk_entries = None
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self.disk_errors = 0
+
+    def key(self, file_bytes: bytes) -> str:
+        return self.key_for_digest(hashlib.sha256(file_bytes).hexdigest())
+
+    def key_for_digest(self, digest: str) -> str:
+        """Cache key for a file whose SHA-256 hex digest is already known."""
+        return f"{digest}-v{self.version}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self._memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠ Unreadable extraction cache entry {key}: {e}")
+            self.disk_errors += 1
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._memory.put(key, value)
+        try:
+            os.utime(path)  # Most recently used
+        except OSError:
+            pass  # Evicted meanwhile by another worker
+        return value
+
+    def put(self, key: str, value: dict):
+        self._memory.put(key, value)
+        path = self._path(key)
+        payload = json.dumps(value).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so other workers never read a half-written entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠ Could not persist extraction cache entry {key}: {e}")
+            self.disk_errors += 1
+            return
+        self._account(len(payload))
+
+    def _disk_tier(self):
+        """Every entry on disk, as (last used, bytes, path)."""
+        entries = []
+        try:
+            shards = [shard.path for shard in os.scandir(self.directory) if shard.is_dir()]
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            try:
+                for entry in os.scandir(shard):
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                continue  # Removed by another worker while scanning
+        return entries
+
+    def _account(self, size: int):
+        """Counts a new disk entry, trimming the tier if that takes it over a cap."""
+        with self._disk_lock:
+            if self._disk_entries is None:
+                entries = self._disk_tier()  # Includes the entry just written
+                self._disk_entries, self._disk_bytes = len(entries), sum(size for _, size, _ in entries)
+            else:
+                self._disk_entries += 1
+                self._disk_bytes += size
+            if self._disk_entries > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes:
+                self._trim()
+
+    def _trim(self):
+        # Rescanned rather than trusted: the other workers write here too
+        entries = sorted(self._disk_tier())
+        count, total = len(entries), sum(size for _, size, _ in entries)
+        max_entries = int(self.max_disk_entries * DISK_TRIM_RATIO)
+        max_bytes = int(self.max_disk_bytes * DISK_TRIM_RATIO)
+        evicted = 0
+        for _, size, path in entries:
+            if count <= max_entries and total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass  # Another worker trimmed it first
+            except OSError as e:
+                logger.warning(f"⚠ Could not evict extraction cache entry {path}: {e}")
+                self.disk_errors += 1
+                continue
+            count -= 1
+            total -= size
+        self._disk_entries, self._disk_bytes = count, total
+        self.disk_evictions += evicted
+        logger.info(f"✅ Evicted {evicted} extraction cache entries from disk ({count} left, {total / 2 ** 20:.1f} MB)")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "version": self.version,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self._memory.evictions,
+            "disk_entries": self._disk_entries,
+            "disk_evictions": self.disk_evictions,
+            "disk_errors": self.disk_errors,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
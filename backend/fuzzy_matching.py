@@ -0,0 +1,100 @@
+import re
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Indel
+
+# ✅ Same threshold resume skill matching has always used: token_sort_ratio > 80
+FUZZY_THRESHOLD = 80
+
+# fuzzywuzzy's force_ascii only strips code points 128-255
+_LATIN1_TABLE = dict.fromkeys(range(128, 256))
+_NON_WORD = re.compile(r"(?ui)\W")
+
+
+def fuzzy_key(text: str) -> str:
+    """
+    The string fuzzywuzzy's token_sort_ratio actually compares: Latin-1
+    stripped, non-word characters turned into spaces, lowercased, tokens
+    sorted. Computing it once per string lets both sides be reused.
+    """
+    processed = _NON_WORD.sub(" ", text.translate(_LATIN1_TABLE)).lower()
+    return " ".join(sorted(processed.split()))
+
+
+def fuzzy_score(key_a: str, key_b: str) -> int:
+    """
+    token_sort_ratio of two fuzzy keys, computed exactly like fuzzywuzzy
+    (Levenshtein backend): integer-rounded 100 * InDel ratio.
+    """
+    if not key_a or not key_b:
+        return 0
+    if key_a == key_b:
+        return 100
+    length_sum = len(key_a) + len(key_b)
+    return int(round(100 * ((length_sum - Indel.distance(key_a, key_b)) / length_sum)))
+
+
+class FuzzySkillIndex:
+    """
+    Batched fuzzy matching of raw skill strings against a fixed list of
+    skill names (the taxonomy vocabulary).
+
+    Replaces one process.extractOne per job skill per resume: all distinct
+    raw strings of a batch of resumes are scored against every name in a
+    single rapidfuzz cdist call with a score cutoff. Names whose fuzzy key
+    equals a string's key are matched by dictionary lookup, and only the
+    few pairs that clear the cutoff are re-scored with fuzzy_score, so the
+    result is the same as fuzzywuzzy's `score > threshold`, rounding included.
+    """
+
+    def __init__(self, names: Sequence[str], threshold: int = FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self._keys = [fuzzy_key(name) for name in names]
+        self._exact: Dict[str, List[int]] = {}
+        for index, key in enumerate(self._keys):
+            if key:
+                self._exact.setdefault(key, []).append(index)
+
+    def match_keys(self, keys: Sequence[str]) -> List[Set[int]]:
+        """For each fuzzy key, the indices of the names it matches."""
+        # Exact fast path: a key equal to a name's key is a 100 without scoring
+        results = [set(self._exact.get(key, ())) for key in keys]
+        pending = [i for i, key in enumerate(keys) if key]
+        if not pending:
+            return results
+
+        # One score matrix for every string × every name; anything below the
+        # cutoff comes back as 0 and is never looked at again.
+        scores = process.cdist(
+            [keys[i] for i in pending], self._keys,
+            scorer=fuzz.ratio, processor=None, score_cutoff=self.threshold,
+            dtype=np.float32, workers=-1,
+        )
+        for row, column in zip(*np.nonzero(scores)):
+            matched = results[pending[row]]
+            if column not in matched and fuzzy_score(keys[pending[row]], self._keys[column]) > self.threshold:
+                matched.add(int(column))
+        return results
+
+    def match(self, strings: Sequence[str]) -> List[Set[int]]:
+        """For each raw string, the indices of the names it fuzzy-matches."""
+        return self.match_keys([fuzzy_key(text) for text in strings])
+
+    def match_batches(self, batches: Sequence[Sequence[str]]) -> List[Set[int]]:
+        """
+        For each batch (e.g. one resume's raw skills), the union of the names
+        any of its strings matches. Strings shared between resumes are scored
+        once.
+        """
+        distinct_keys = {}
+        batch_keys = []
+        for batch in batches:
+            keys = [fuzzy_key(text) for text in batch]
+            batch_keys.append(keys)
+            for key in keys:
+                distinct_keys.setdefault(key, len(distinct_keys))
+
+        key_matches = self.match_keys(list(distinct_keys))
+        return [set().union(*(key_matches[distinct_keys[key]] for key in keys)) for keys in batch_keys]
@@ -0,0 +1,23 @@
+# Adds every stored resume that isn't in the retrieval index yet: after
+# turning RESUME_RETRIEVAL on, after an embedding model change, or to catch
+# up on resumes ingested while the embedding server was down:
+#   RESUME_RETRIEVAL=server python index_resumes.py      (from backend/)
+# Safe to re-run, and to run while the API is up.
+import asyncio
+import sys
+
+from app import app, logger, repository, resume_index
+
+
+async def main():
+    if resume_index is None:
+        logger.error("❌ Resume retrieval is off: set RESUME_RETRIEVAL to server or local")
+        return 1
+    async with app.router.lifespan_context(app):
+        added = await resume_index.backfill(repository.resumes)
+        logger.info(f"✅ Added {added} resumes; the index holds {len(resume_index)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
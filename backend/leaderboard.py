@@ -0,0 +1,207 @@
+import asyncio
+import base64
+import hashlib
+import heapq
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from repository import JobRepository, ResumeRepository
+
+logger = logging.getLogger(__name__)
+
+RESCORE_BATCH = 1000
+STREAM_BATCH = 1000
+MAX_PAGE_SIZE = 100
+
+
+def score_version(job: dict) -> str:
+    """
+    Identifies everything a stored score depends on: the job's skills,
+    required experience and feature version. Editing the description or a new
+    features version (new extractors, taxonomy or embedding model) changes it,
+    which makes every stored score stale.
+    """
+    key = repr((job.get("features_version"), list(job.get("skill_ids") or []), job.get("experience_years") or 0))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def _check_limit(limit: Optional[int]):
+    # None is "every resume"; anything else has to be a real count, on every ranking path alike
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+
+
+def _upload_order(resume_id) -> int:
+    # ObjectIds grow with insertion time; ties go to the earlier upload
+    binary = getattr(resume_id, "binary", None)
+    return int.from_bytes(binary, "big") if binary else 0
+
+
+def encode_cursor(score: float, resume_id, version: Optional[str]) -> str:
+    """Opaque page cursor: the position of the last resume served, and the leaderboard it came from."""
+    payload = json.dumps({"s": score, "id": str(resume_id), "v": version}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, ObjectId, Optional[str]]:
+    """
+    Raises:
+        ValueError: If the cursor wasn't produced by encode_cursor.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(payload["s"]), ObjectId(payload["id"]), payload["v"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class Leaderboard:
+    """
+    Materialized per-job ranking, kept on the resume documents themselves.
+
+    Every resume stores its match score for its job (`score`) and the
+    score_version it was computed under. The storage backend keeps each
+    job's resumes indexed in (job_id, score, _id) order, so reading the top k
+    is an index walk of k entries instead of loading and sorting every
+    applicant. New uploads are scored at ingest; when a job changes, its
+    resumes are rescored in bulk in the background and the job records the
+    version its leaderboard is complete for.
+
+    Score functions are coroutines taking a batch of resumes (the scoring
+    fields: skill_bits, work_experience, features_version); rescore's also
+    take the job first, since the job can change while it runs.
+    """
+
+    def __init__(self, resumes: ResumeRepository, jobs: JobRepository):
+        self.resumes = resumes
+        self.jobs = jobs
+        self._rescoring: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def stamp(documents: Sequence[dict], scores: np.ndarray, version: Optional[str]):
+        """Puts each resume's score on its document before it is inserted."""
+        for document, score in zip(documents, scores):
+            document["score"] = float(score)
+            document["score_version"] = version
+
+    def is_current(self, job: dict) -> bool:
+        return job.get("leaderboard_version") == score_version(job)
+
+    def is_rescoring(self, job_id: str) -> bool:
+        task = self._rescoring.get(str(job_id))
+        return task is not None and not task.done()
+
+    async def top(self, job_id: str, limit: Optional[int] = None, min_score: Optional[float] = None) -> List[dict]:
+        """
+        The job's resumes in leaderboard order (best first, then upload order),
+        at most `limit` of them (all of them for None).
+
+        Raises:
+            ValueError: If `limit` is below 1.
+        """
+        _check_limit(limit)
+        return await self.resumes.top(job_id, limit, min_score)
+
+    async def page(self, job_id: str, page_size: int,
+                   after: Optional[Tuple[float, ObjectId]] = None) -> Tuple[List[dict], bool]:
+        """
+        One page of the job's leaderboard, starting right after the (score, _id)
+        position `after`. It is a seek on the (job_id, score, _id) index, so
+        page N costs the same as page 1 whatever the number of applicants.
+
+        Returns:
+            Tuple[List[dict], bool]: The page's resumes and whether more follow.
+        """
+        return await self.resumes.page(job_id, page_size, after)
+
+    async def stream_top(self, job_id: str, score_fn: Callable[[List[dict]], Awaitable[np.ndarray]],
+                         limit: Optional[int] = None, min_score: Optional[float] = None,
+                         batch_size: int = STREAM_BATCH) -> List[Tuple[float, Any]]:
+        """
+        Ranks a job's resumes without relying on stored scores: the job's
+        resumes are read in batches, each batch is scored with `score_fn`, and
+        only the best `limit` (score, _id) pairs are kept in a min-heap, so
+        memory stays O(limit + batch_size) whatever the number of applicants.
+
+        Returns:
+            List[Tuple[float, Any]]: (score, resume _id), best first, ties in upload order.
+
+        Raises:
+            ValueError: If `limit` is below 1.
+        """
+        _check_limit(limit)
+        heap = []
+        async for batch in self.resumes.scoring_batches(job_id, batch_size):
+            for resume, score in zip(batch, await score_fn(batch)):
+                if min_score is not None and score < min_score:
+                    continue
+                entry = (float(score), -_upload_order(resume["_id"]), resume["_id"])
+                if limit is None or len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+        return [(score, resume_id) for score, _, resume_id in sorted(heap, reverse=True)]
+
+    async def fetch(self, resume_ids: Sequence[Any]) -> List[dict]:
+        """The given resumes, in the given order."""
+        return await self.resumes.fetch(resume_ids)
+
+    async def rescore(self, job: dict, score_fn: Callable[[dict, List[dict]], Awaitable[np.ndarray]],
+                      batch_size: int = RESCORE_BATCH) -> int:
+        """
+        Recomputes the stored score of every resume of `job` that was scored
+        under another version, batch by batch, then marks the leaderboard
+        current. If the job changed meanwhile, it goes again under the job's
+        new version instead. (Resumes that ingestion scored against an older
+        version and stored after this finished are its to catch: it checks
+        the job again once they are stored.)
+        """
+        job_id = str(job["_id"])
+        rescored = 0
+        while True:
+            version = score_version(job)
+            while True:
+                # Rescored resumes drop out of the query, so each pass picks up the next batch
+                batch = await self.resumes.unscored(job_id, version, batch_size)
+                if not batch:
+                    break
+                scores = await score_fn(job, batch)
+                await self.resumes.set_scores([(resume["_id"], score) for resume, score in zip(batch, scores)], version)
+                rescored += len(batch)
+
+            current = await self.jobs.get(job["_id"])
+            if current is None:
+                return rescored
+            if score_version(current) == version:
+                break
+            job.update(current)
+
+        await self.jobs.set_fields(job["_id"], {"leaderboard_version": version})
+        job["leaderboard_version"] = version
+        logger.info(f"✅ Rescored {rescored} resumes for job {job_id}")
+        return rescored
+
+    def schedule_rescore(self, job: dict, score_fn: Callable[[dict, List[dict]], Awaitable[np.ndarray]]) -> asyncio.Task:
+        """Runs rescore() as a background task; rescores of the same job run one after another."""
+        job_id = str(job["_id"])
+        previous = self._rescoring.get(job_id)
+
+        async def run():
+            if previous is not None and not previous.done():
+                await asyncio.gather(previous, return_exceptions=True)
+            try:
+                await self.rescore(job, score_fn)
+            except Exception as e:
+                logger.error(f"❌ Background rescore failed for job {job_id}: {e}")
+            finally:
+                if self._rescoring.get(job_id) is task:
+                    del self._rescoring[job_id]
+
+        task = asyncio.create_task(run())
+        self._rescoring[job_id] = task
+        return task
@@ -0,0 +1,48 @@
+import logging
+
+import pymongo
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# ✅ Every index the app relies on, per collection. Created at startup; a
+# query shape that isn't covered here shows up as a COLLSCAN in
+# tests/test_query_plans.py.
+INDEXES = {
+    "resumes": [
+        # Leaderboard order. Its job_id prefix also serves every plain "all
+        # resumes of a job" query, so there is no separate job_id index.
+        IndexModel([("job_id", pymongo.ASCENDING), ("score", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)],
+                   name="job_leaderboard"),
+        # Same file uploaded again (to any job): reuse its parsed features
+        IndexModel([("content_hash", pymongo.ASCENDING), ("features_version", pymongo.ASCENDING)],
+                   name="content_hash"),
+    ],
+    "tasks": [
+        # Next available task: queued ones in order, and running ones whose lease expired
+        IndexModel([("status", pymongo.ASCENDING), ("available_at", pymongo.ASCENDING)], name="claimable"),
+    ],
+    # jobs, resume_texts and skill_dictionary are only read by _id
+}
+
+# Fields ranking reads from a resume; the raw text lives in resume_texts
+CANDIDATE_PROJECTION = {
+    "job_id": 1, "filename": 1, "skills": 1, "work_experience": 1, "education": 1,
+    "skill_bits": 1, "features_version": 1, "score": 1,
+}
+
+# Fields scoring needs from a stored resume
+SCORING_PROJECTION = {"skill_bits": 1, "work_experience": 1, "features_version": 1}
+
+# Fields the ranking endpoints read from a job
+JOB_PROJECTION = {
+    "job_title": 1, "job_description": 1, "skill_ids": 1, "extracted_skills": 1,
+    "experience_years": 1, "features_version": 1, "leaderboard_version": 1,
+}
+
+
+async def ensure_indexes(db):
+    """Creates the declared indexes (on an async database); existing ones with the same spec are left alone."""
+    for collection, indexes in INDEXES.items():
+        names = await db[collection].create_indexes(indexes)
+        logger.info(f"✅ Indexes on {collection}: {', '.join(names)}")
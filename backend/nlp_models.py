@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List
+
+logger = logging.getLogger(__name__)
+
+# ✅ Optional NLP engines. Nothing on the request path needs them, so each is
+# imported and loaded on first use (a few hundred MB and seconds each) rather
+# than by every worker at startup. None of them downloads anything: models
+# and corpora have to be installed at build time.
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SENTENCE_MODEL = os.getenv("SENTENCE_MODEL", "all-MiniLM-L6-v2")
+
+# ✅ Engines to load at startup instead of on first use, comma-separated names from
+# ENGINES (or "all"). Under serve.py they are loaded once, before workers are forked.
+PRELOAD_ENGINES = os.getenv("PRELOAD_ENGINES", "")
+
+_load_lock = threading.Lock()
+
+
+def _loaded_once(fn: Callable) -> Callable:
+    """Caches a loader's result; concurrent first calls load it only once."""
+    cached = lru_cache(maxsize=None)(fn)
+
+    def load():
+        with _load_lock:
+            return cached()
+    load.cache_info = cached.cache_info
+    load.__name__ = fn.__name__
+    load.__doc__ = fn.__doc__
+    return load
+
+
+@_loaded_once
+def get_nlp():
+    """The spaCy pipeline (SPACY_MODEL); install it with `python -m spacy download en_core_web_sm`."""
+    import spacy
+    nlp = spacy.load(SPACY_MODEL)
+    logger.info(f"✅ spaCy model {SPACY_MODEL} loaded")
+    return nlp
+
+
+@_loaded_once
+def get_sentence_model():
+    """The sentence-transformers encoder (SENTENCE_MODEL), from the local model cache only."""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(SENTENCE_MODEL)
+    logger.info(f"✅ Sentence model {SENTENCE_MODEL} loaded")
+    return model
+
+
+@_loaded_once
+def get_stopwords() -> FrozenSet[str]:
+    """
+    English stopwords: from the warm-start artifact if it has them, else from
+    the installed NLTK corpus (`python -m nltk.downloader stopwords`).
+    """
+    import warm_start
+    artifact = warm_start.shared()
+    if artifact is not None and artifact.has("stopwords"):
+        return artifact.stopwords()
+
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words("english"))
+    except LookupError:
+        raise RuntimeError("NLTK stopwords are not installed: run `python -m nltk.downloader stopwords` at build time")
+
+
+# Every optional engine by name (for preloading and the startup benchmark)
+ENGINES: Dict[str, Callable] = {
+    "spacy": get_nlp,
+    "sentence_transformers": get_sentence_model,
+    "stopwords": get_stopwords,
+}
+
+
+def loaded_engines() -> Dict[str, bool]:
+    return {name: loader.cache_info().currsize > 0 for name, loader in ENGINES.items()}
+
+
+def preload(names: str = PRELOAD_ENGINES) -> List[str]:
+    """Loads the named engines now ("all" for every one); returns the names loaded."""
+    names = list(ENGINES) if names.strip() == "all" else [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown NLP engines {unknown}; expected some of {list(ENGINES)}")
+    for name in names:
+        ENGINES[name]()
+    return names
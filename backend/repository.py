@@ -0,0 +1,444 @@
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import pymongo
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
+
+from mongo_indexes import CANDIDATE_PROJECTION, JOB_PROJECTION, SCORING_PROJECTION, ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+# ✅ Storage settings (overridable per deployment)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongodb")  # "mongodb" or "sqlite"
+MONGODB_URI = os.getenv("MONGODB_URI")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "resume_screening")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+
+# Fields of a stored resume that make up a parse result (plus the text)
+PARSED_PROJECTION = {"sections": 1, "skills": 1, "work_experience": 1, "education": 1, "skill_ids": 1,
+                     "features_version": 1}
+
+TASK_STATUSES = ("queued", "running", "done", "failed")
+
+LEADERBOARD_ORDER = [("score", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)]
+
+
+class JobRepository(ABC):
+    """Jobs, by ObjectId."""
+
+    @abstractmethod
+    async def insert(self, job: dict) -> ObjectId:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: ObjectId) -> Optional[dict]:
+        """The job's ranking fields (JOB_PROJECTION), or None."""
+
+    @abstractmethod
+    async def set_fields(self, job_id: ObjectId, fields: dict):
+        ...
+
+    @abstractmethod
+    async def update(self, job_id: ObjectId, fields: dict) -> Optional[dict]:
+        """Sets `fields` and returns the updated job, or None if it doesn't exist."""
+
+
+class ResumeRepository(ABC):
+    """
+    Resumes: small feature documents (what ranking reads), their raw text
+    kept apart under the same _id, and the per-job leaderboard queries over
+    the (job_id, score, _id) order. Resumes returned by the leaderboard
+    queries carry the CANDIDATE_PROJECTION fields; scoring batches carry
+    SCORING_PROJECTION.
+    """
+
+    @abstractmethod
+    async def insert(self, document: dict, text_document: dict) -> ObjectId:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, documents: Sequence[dict], text_documents: Sequence[dict]) -> Dict[int, str]:
+        """
+        Inserts a batch of resumes (unordered) and the texts of those that
+        were stored.
+
+        Returns:
+            Dict[int, str]: Error message by index, for the documents that failed.
+        """
+
+    @abstractmethod
+    async def find_parsed(self, content_hash: str, features_version: str) -> Optional[dict]:
+        """Parse result of a stored resume with the same file contents, text included."""
+
+    @abstractmethod
+    async def get_texts(self, resume_ids: Sequence[ObjectId]) -> Dict[ObjectId, str]:
+        """Raw text of the given resumes, by _id (resumes without text are left out)."""
+
+    @abstractmethod
+    async def set_fields_many(self, updates: Sequence[Tuple[ObjectId, dict]]):
+        ...
+
+    @abstractmethod
+    def text_batches(self, batch_size: int) -> AsyncIterator[List[dict]]:
+        """Every stored resume text, as {_id, job_id, text} documents in _id order, in batches."""
+
+    @abstractmethod
+    async def top(self, job_id: str, limit: Optional[int] = None, min_score: Optional[float] = None) -> List[dict]:
+        """The job's resumes in leaderboard order (best first, then upload order)."""
+
+    @abstractmethod
+    async def page(self, job_id: str, page_size: int,
+                   after: Optional[Tuple[float, ObjectId]] = None) -> Tuple[List[dict], bool]:
+        """
+        Up to `page_size` scored resumes of the job in leaderboard order,
+        starting right after the (score, _id) position `after`.
+
+        Returns:
+            Tuple[List[dict], bool]: The page's resumes and whether more follow.
+        """
+
+    @abstractmethod
+    async def fetch(self, resume_ids: Sequence[ObjectId]) -> List[dict]:
+        """The given resumes, in the given order."""
+
+    @abstractmethod
+    def scoring_batches(self, job_id: str, batch_size: int) -> AsyncIterator[List[dict]]:
+        """Every resume of the job, in batches."""
+
+    @abstractmethod
+    async def unscored(self, job_id: str, version: str, limit: int) -> List[dict]:
+        """Up to `limit` resumes of the job whose score wasn't computed under `version`."""
+
+    @abstractmethod
+    async def set_scores(self, scores: Sequence[Tuple[ObjectId, float]], version: str):
+        ...
+
+
+class SkillDictionaryRepository(ABC):
+    """Raw skill string → canonical skill IDs, per vocabulary version."""
+
+    @abstractmethod
+    async def get_many(self, version: str, keys: Sequence[str]) -> Dict[str, List[int]]:
+        ...
+
+    @abstractmethod
+    async def put_many(self, version: str, entries: Dict[str, List[int]]):
+        """Stores entries that aren't there yet; existing entries win."""
+
+
+class TaskRepository(ABC):
+    """
+    Durable work queue. A task is "queued" until a worker claims it, which
+    makes it "running" under a lease (owner plus expiry, kept alive by
+    heartbeats); it ends "done" or "failed". A running task whose lease ran
+    out (its worker died) can be claimed again, so each task is processed at
+    least once. Times are Unix timestamps; `available_at` is when a queued
+    task may start, or when a running task's lease expires.
+    """
+
+    @abstractmethod
+    async def enqueue_many(self, kind: str, tasks: Sequence[Tuple[dict, Optional[bytes]]]) -> List[ObjectId]:
+        """Queues one task per (args, data) pair, in order, and returns their _ids."""
+
+    @abstractmethod
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[dict]:
+        """Leases up to `limit` available tasks to the worker, oldest first, counting an attempt on each."""
+
+    @abstractmethod
+    async def extend_leases(self, task_ids: Sequence[ObjectId], worker_id: str, lease_seconds: float) -> List[ObjectId]:
+        """Heartbeat: renews the worker's leases and returns the tasks it still holds."""
+
+    @abstractmethod
+    async def finish(self, task_id: ObjectId, worker_id: str, status: str,
+                     result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+        """
+        Marks a task the worker holds "done" or "failed" and drops its data.
+
+        Returns:
+            bool: False if the worker had lost the lease (the outcome is discarded).
+        """
+
+    @abstractmethod
+    async def retry(self, task_id: ObjectId, worker_id: str, error: str, delay_seconds: float) -> bool:
+        """Puts a task the worker holds back in the queue, available again after the delay."""
+
+    @abstractmethod
+    async def get(self, task_id: ObjectId) -> Optional[dict]:
+        """The task's status fields (without its data), or None."""
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Number of tasks by status."""
+
+
+class Repository(ABC):
+    """A storage backend: the repositories plus lifecycle hooks."""
+
+    jobs: JobRepository
+    resumes: ResumeRepository
+    skill_dictionary: SkillDictionaryRepository
+    tasks: TaskRepository
+
+    @abstractmethod
+    async def ensure_indexes(self):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+
+class MongoJobRepository(JobRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, job: dict) -> ObjectId:
+        return (await self.collection.insert_one(job)).inserted_id
+
+    async def get(self, job_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"_id": job_id}, JOB_PROJECTION)
+
+    async def set_fields(self, job_id: ObjectId, fields: dict):
+        await self.collection.update_one({"_id": job_id}, {"$set": fields})
+
+    async def update(self, job_id: ObjectId, fields: dict) -> Optional[dict]:
+        return await self.collection.find_one_and_update(
+            {"_id": job_id}, {"$set": fields}, projection=JOB_PROJECTION, return_document=pymongo.ReturnDocument.AFTER
+        )
+
+
+class MongoResumeRepository(ResumeRepository):
+    def __init__(self, collection, texts_collection):
+        self.collection = collection
+        self.texts = texts_collection
+
+    async def insert(self, document: dict, text_document: dict) -> ObjectId:
+        resume_id = (await self.collection.insert_one(document)).inserted_id
+        await self.texts.insert_one(text_document)
+        return resume_id
+
+    async def insert_many(self, documents: Sequence[dict], text_documents: Sequence[dict]) -> Dict[int, str]:
+        if not documents:
+            return {}  # pymongo rejects an empty insert_many
+        failed = {}
+        try:
+            await self.collection.insert_many(list(documents), ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Insert failed") for err in e.details.get("writeErrors", [])}
+        stored_texts = [text for index, text in enumerate(text_documents) if index not in failed]
+        if stored_texts:
+            await self.texts.insert_many(stored_texts, ordered=False)
+        return failed
+
+    async def find_parsed(self, content_hash: str, features_version: str) -> Optional[dict]:
+        stored = await self.collection.find_one(
+            {"content_hash": content_hash, "features_version": features_version}, PARSED_PROJECTION
+        )
+        if not stored:
+            return None
+        text = await self.texts.find_one({"_id": stored.pop("_id")})
+        return {"text": text["text"], **stored} if text else None
+
+    async def get_texts(self, resume_ids: Sequence[ObjectId]) -> Dict[ObjectId, str]:
+        texts = {doc["_id"]: doc["text"] async for doc in self.texts.find({"_id": {"$in": list(resume_ids)}})}
+        legacy_ids = [resume_id for resume_id in resume_ids if resume_id not in texts]
+        if legacy_ids:
+            # ✅ Resumes stored before the text moved out keep it inline: move it now
+            legacy = await self.collection.find(
+                {"_id": {"$in": legacy_ids}, "text": {"$exists": True}}, {"job_id": 1, "text": 1}
+            ).to_list(None)
+            if legacy:
+                await self.texts.bulk_write(
+                    [pymongo.ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in legacy], ordered=False
+                )
+                await self.collection.update_many({"_id": {"$in": [doc["_id"] for doc in legacy]}}, {"$unset": {"text": ""}})
+                texts.update((doc["_id"], doc["text"]) for doc in legacy)
+        return texts
+
+    async def set_fields_many(self, updates: Sequence[Tuple[ObjectId, dict]]):
+        if updates:
+            await self.collection.bulk_write(
+                [pymongo.UpdateOne({"_id": resume_id}, {"$set": fields}) for resume_id, fields in updates], ordered=False
+            )
+
+    async def text_batches(self, batch_size: int) -> AsyncIterator[List[dict]]:
+        last_id = None
+        while True:
+            # Keyset pagination on _id: no cursor held open between batches
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            batch = await self.texts.find(query).sort("_id", 1).limit(batch_size).to_list(None)
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            yield batch
+
+    async def top(self, job_id: str, limit: Optional[int] = None, min_score: Optional[float] = None) -> List[dict]:
+        query = {"job_id": str(job_id)}
+        if min_score is not None:
+            query["score"] = {"$gte": min_score}
+        cursor = self.collection.find(query, CANDIDATE_PROJECTION).sort(LEADERBOARD_ORDER)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(None)
+
+    async def page(self, job_id: str, page_size: int,
+                   after: Optional[Tuple[float, ObjectId]] = None) -> Tuple[List[dict], bool]:
+        query = {"job_id": str(job_id), "score": {"$type": "number"}}
+        if after is not None:
+            score, resume_id = after
+            query["$or"] = [{"score": {"$lt": score}}, {"score": score, "_id": {"$gt": resume_id}}]
+        resumes = await self.collection.find(query, CANDIDATE_PROJECTION).sort(LEADERBOARD_ORDER).limit(
+            page_size + 1).to_list(None)
+        return resumes[:page_size], len(resumes) > page_size
+
+    async def fetch(self, resume_ids: Sequence[ObjectId]) -> List[dict]:
+        found = {doc["_id"]: doc async for doc in self.collection.find({"_id": {"$in": list(resume_ids)}}, CANDIDATE_PROJECTION)}
+        return [found[resume_id] for resume_id in resume_ids if resume_id in found]
+
+    async def scoring_batches(self, job_id: str, batch_size: int) -> AsyncIterator[List[dict]]:
+        cursor = self.collection.find({"job_id": str(job_id)}, SCORING_PROJECTION, batch_size=batch_size)
+        while True:
+            batch = await cursor.to_list(batch_size)
+            if not batch:
+                break
+            yield batch
+
+    async def unscored(self, job_id: str, version: str, limit: int) -> List[dict]:
+        return await self.collection.find(
+            {"job_id": str(job_id), "score_version": {"$ne": version}}, SCORING_PROJECTION
+        ).limit(limit).to_list(None)
+
+    async def set_scores(self, scores: Sequence[Tuple[ObjectId, float]], version: str):
+        if scores:
+            await self.collection.bulk_write([
+                pymongo.UpdateOne({"_id": resume_id}, {"$set": {"score": float(score), "score_version": version}})
+                for resume_id, score in scores
+            ], ordered=False)
+
+
+class MongoSkillDictionaryRepository(SkillDictionaryRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def get_many(self, version: str, keys: Sequence[str]) -> Dict[str, List[int]]:
+        ids = [f"{version}:{key}" for key in keys]
+        return {doc["raw"]: doc["skill_ids"]
+                async for doc in self.collection.find({"_id": {"$in": ids}}, {"raw": 1, "skill_ids": 1})}
+
+    async def put_many(self, version: str, entries: Dict[str, List[int]]):
+        if entries:
+            # $setOnInsert: concurrent workers that matched the same string agree anyway
+            await self.collection.bulk_write([
+                pymongo.UpdateOne(
+                    {"_id": f"{version}:{key}"},
+                    {"$setOnInsert": {"version": version, "raw": key, "skill_ids": skill_ids}},
+                    upsert=True
+                )
+                for key, skill_ids in entries.items()
+            ], ordered=False)
+
+
+class MongoTaskRepository(TaskRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def enqueue_many(self, kind: str, tasks: Sequence[Tuple[dict, Optional[bytes]]]) -> List[ObjectId]:
+        if not tasks:
+            return []
+        now = time.time()
+        documents = [
+            {"kind": kind, "args": args, "data": data, "status": "queued", "attempts": 0,
+             "available_at": now, "lease_owner": None, "created_at": now, "updated_at": now}
+            for args, data in tasks
+        ]
+        return (await self.collection.insert_many(documents)).inserted_ids
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[dict]:
+        claimed = []
+        for _ in range(limit):
+            # One atomic find-and-modify per task: concurrent workers never get the same one
+            now = time.time()
+            task = await self.collection.find_one_and_update(
+                {"status": {"$in": ["queued", "running"]}, "available_at": {"$lte": now}},
+                {"$set": {"status": "running", "lease_owner": worker_id, "available_at": now + lease_seconds,
+                          "updated_at": now},
+                 "$inc": {"attempts": 1}},
+                sort=[("available_at", pymongo.ASCENDING)], return_document=pymongo.ReturnDocument.AFTER
+            )
+            if task is None:
+                break
+            claimed.append(task)
+        return claimed
+
+    async def extend_leases(self, task_ids: Sequence[ObjectId], worker_id: str, lease_seconds: float) -> List[ObjectId]:
+        now = time.time()
+        held = {"_id": {"$in": list(task_ids)}, "status": "running", "lease_owner": worker_id}
+        await self.collection.update_many(held, {"$set": {"available_at": now + lease_seconds, "updated_at": now}})
+        return [task["_id"] async for task in self.collection.find(held, {"_id": 1})]
+
+    async def finish(self, task_id: ObjectId, worker_id: str, status: str,
+                     result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+        updated = await self.collection.update_one(
+            {"_id": task_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"status": status, "result": result, "error": error, "data": None, "lease_owner": None,
+                      "updated_at": time.time()}}
+        )
+        return updated.modified_count == 1
+
+    async def retry(self, task_id: ObjectId, worker_id: str, error: str, delay_seconds: float) -> bool:
+        now = time.time()
+        updated = await self.collection.update_one(
+            {"_id": task_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"status": "queued", "error": error, "lease_owner": None, "available_at": now + delay_seconds,
+                      "updated_at": now}}
+        )
+        return updated.modified_count == 1
+
+    async def get(self, task_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"_id": task_id}, {"data": 0})
+
+    async def counts(self) -> Dict[str, int]:
+        return {status: await self.collection.count_documents({"status": status}) for status in TASK_STATUSES}
+
+
+class MongoRepository(Repository):
+    """
+    MongoDB backend: one async client and its connection pool, shared by the
+    repositories. The client connects lazily, on the first operation, so
+    constructing it does no I/O.
+    """
+
+    def __init__(self, uri: Optional[str] = MONGODB_URI, database: str = MONGODB_DATABASE,
+                 max_pool_size: int = MONGODB_MAX_POOL_SIZE, min_pool_size: int = MONGODB_MIN_POOL_SIZE,
+                 wait_queue_timeout_ms: int = MONGODB_WAIT_QUEUE_TIMEOUT_MS):
+        self.client = AsyncMongoClient(
+            uri, maxPoolSize=max_pool_size, minPoolSize=min_pool_size, waitQueueTimeoutMS=wait_queue_timeout_ms
+        )
+        self.db = self.client[database]
+        self.jobs = MongoJobRepository(self.db["jobs"])
+        self.resumes = MongoResumeRepository(self.db["resumes"], self.db["resume_texts"])
+        self.skill_dictionary = MongoSkillDictionaryRepository(self.db["skill_dictionary"])
+        self.tasks = MongoTaskRepository(self.db["tasks"])
+
+    async def ensure_indexes(self):
+        await ensure_indexes(self.db)
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_repository(backend: str = STORAGE_BACKEND, mongodb_uri: Optional[str] = MONGODB_URI) -> Repository:
+    """The configured storage backend (STORAGE_BACKEND). Neither backend does any I/O until first used."""
+    if backend == "mongodb":
+        return MongoRepository(mongodb_uri)
+    if backend == "sqlite":
+        from sqlite_repository import SQLiteRepository
+        return SQLiteRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from embeddings import EMBEDDING_ENCODER, LocalEmbedder, normalize_rows
+from repository import ResumeRepository
+from resume_sections import section_text, segment_sections
+from vector_index import VECTOR_INDEX_DIR, IVFIndex
+
+logger = logging.getLogger(__name__)
+
+# ✅ Resume retrieval (overridable per deployment): off by default; "server" embeds through the
+# shared embedding server and store, "local" runs EMBEDDING_ENCODER in process
+RESUME_RETRIEVAL = os.getenv("RESUME_RETRIEVAL", "off")
+
+# Words per embedded chunk: well under the encoder's limit (256 word pieces for all-MiniLM-L6-v2),
+# which would otherwise silently truncate long sections
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "150"))
+
+# Sections a resume is embedded from, and their weight in its pooled vector
+SECTION_WEIGHTS = {"skills": 1.0, "experience": 1.0, "education": 0.5}
+
+BACKFILL_BATCH_SIZE = 256
+
+# A document to embed: (weight, chunks) per section
+Document = List[Tuple[float, List[str]]]
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS) -> List[str]:
+    """Splits text into chunks of at most `max_words` words, breaking between lines where it can."""
+    chunks, current = [], []
+    for line in text.splitlines():
+        words = line.split()
+        if current and len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = []
+        while len(words) > max_words:  # A line longer than a chunk on its own
+            chunks.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        current.extend(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def resume_document(text: str, sections: Optional[dict] = None) -> Document:
+    """A resume's chunked, weighted sections; the whole text when none of them is found."""
+    sections = segment_sections(text) if sections is None else sections
+    document = []
+    for name, weight in SECTION_WEIGHTS.items():
+        chunks = chunk_text(section_text(text, sections, name))
+        if chunks:
+            document.append((weight, chunks))
+    if not document:
+        chunks = chunk_text(text)
+        if chunks:
+            document.append((1.0, chunks))
+    return document
+
+
+def pool(vectors: np.ndarray, documents: Sequence[Document]) -> np.ndarray:
+    """
+    One L2-normalized vector per document from its chunks' vectors (in
+    order): each section's chunks are averaged, then the sections weighted.
+    """
+    pooled = np.zeros((len(documents), vectors.shape[1]), dtype=np.float32)
+    row = 0
+    for i, document in enumerate(documents):
+        for weight, chunks in document:
+            pooled[i] += weight * vectors[row:row + len(chunks)].mean(axis=0)
+            row += len(chunks)
+    return normalize_rows(pooled)
+
+
+class ResumeIndex:
+    """
+    Every stored resume, from any job, as one pooled embedding in a vector
+    index, so a job description can be matched against the whole corpus.
+
+    Resumes are embedded per section (skills, experience, education), in
+    chunks the encoder takes whole; the chunks are embedded in one batch per
+    call through the embedder (so repeated text comes from the embedding
+    store) and pooled into one vector per resume. There is one IVFIndex per
+    embedding model, opened once the model is known.
+    """
+
+    def __init__(self, embedder, directory: str = VECTOR_INDEX_DIR):
+        self.embedder = embedder
+        self.directory = directory
+        self._index: Optional[IVFIndex] = None
+        self.indexed = 0
+
+    def _index_for(self, dim: int) -> IVFIndex:
+        model_id = self.embedder.model_id
+        if self._index is None or self._index.model_id != model_id:
+            if self._index is not None:
+                logger.warning(f"⚠ Embedding model changed to {model_id}; resumes must be indexed again "
+                               f"(python index_resumes.py)")
+                self._index.close()
+            self._index = IVFIndex(model_id, dim, self.directory)
+        return self._index
+
+    async def _embed(self, documents: Sequence[Document]) -> np.ndarray:
+        chunks = [chunk for document in documents for _, section in document for chunk in section]
+        return pool(np.asarray(await self.embedder.embed(chunks), dtype=np.float32), documents)
+
+    async def add(self, resumes: Sequence[dict]) -> int:
+        """
+        Indexes resumes ({_id, text} documents, plus their `sections` when
+        known) that aren't in the index yet. A resume's text never changes,
+        so indexed ones are skipped. Returns how many were added.
+
+        Raises:
+            EmbeddingError: If the embedder fails.
+        """
+        documents = [(resume["_id"], resume_document(resume["text"], resume.get("sections"))) for resume in resumes]
+        documents = [(resume_id, document) for resume_id, document in documents if document]
+        if not documents:
+            return 0
+        vectors = await self._embed([document for _, document in documents])
+        index = self._index_for(vectors.shape[1])
+        ids = [resume_id.binary for resume_id, _ in documents]
+        new = ~await asyncio.to_thread(index.contains, ids)
+        if new.any():
+            await asyncio.to_thread(index.add, [key for key, is_new in zip(ids, new) if is_new], vectors[new])
+        self.indexed += int(new.sum())
+        return int(new.sum())
+
+    async def search(self, text: str, top_n: int) -> List[Tuple[ObjectId, float]]:
+        """
+        The `top_n` indexed resumes nearest to a text (a job description), best first, with cosine similarity.
+
+        Raises:
+            EmbeddingError: If the embedder fails.
+        """
+        chunks = chunk_text(text)
+        if not chunks:
+            return []
+        query = (await self._embed([[(1.0, chunks)]]))[0]
+        ids, scores = await asyncio.to_thread(self._index_for(len(query)).search, query, top_n)
+        return [(ObjectId(key), float(score)) for key, score in zip(ids, scores)]
+
+    async def backfill(self, resumes: ResumeRepository, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+        """Indexes every stored resume not indexed yet (after turning retrieval on, or a model change)."""
+        added = 0
+        async for batch in resumes.text_batches(batch_size):
+            if self._index is not None:
+                held = await asyncio.to_thread(self._index.contains, [resume["_id"].binary for resume in batch])
+                batch = [resume for resume, is_held in zip(batch, held) if not is_held]
+            if batch:
+                added += await self.add(batch)
+                logger.info(f"✅ Indexed {added} resumes for retrieval")
+        return added
+
+    def __len__(self):
+        return len(self._index) if self._index is not None else 0
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+
+    def stats(self) -> dict:
+        return {"indexed": self.indexed, **(self._index.stats() if self._index is not None else {"vectors": 0})}
+
+
+def create_resume_index(embedder, mode: str = RESUME_RETRIEVAL,
+                        encoder: str = EMBEDDING_ENCODER) -> Optional[ResumeIndex]:
+    """The index RESUME_RETRIEVAL asks for: None ("off"), over `embedder` ("server"), or in process ("local")."""
+    if mode == "off":
+        return None
+    if mode == "server":
+        return ResumeIndex(embedder)
+    if mode == "local":
+        return ResumeIndex(LocalEmbedder(name=encoder))
+    raise ValueError(f"RESUME_RETRIEVAL must be off, server or local, not {mode!r}")
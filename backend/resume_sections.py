@@ -0,0 +1,156 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+from dateutil import parser
+
+logger = logging.getLogger(__name__)
+
+# ✅ Section headers we recognise, longest phrase first within each section
+SECTION_HEADERS = {
+    "skills": ["technical skills", "core competencies", "skills", "technologies", "expertise", "proficiencies"],
+    "education": ["academic background", "education", "degrees", "qualifications"],
+    "experience": ["professional experience", "employment history", "career history", "work experience",
+                   "work history", "experience"],
+    "projects": ["academic projects", "personal projects", "projects"],
+    "summary": ["professional summary", "summary", "profile", "objective"],
+    "certifications": ["certifications", "certificates", "licenses"],
+}
+
+
+def _compile_header_pattern():
+    """
+    One alternation over every header phrase, each section in its own named
+    group. A header is a line that starts with a phrase and either ends soon
+    after it ("Technical Skills", "Skills & Tools") or continues after a colon
+    ("Skills: Python, Java"), in which case the inline part belongs to the body.
+    """
+    groups = "|".join(
+        f"(?P<{name}>" + "|".join(re.escape(phrase).replace(r"\ ", r"\s+") for phrase in phrases) + ")"
+        for name, phrases in SECTION_HEADERS.items()
+    )
+    return re.compile(
+        rf"^[^\S\n]*[•*\-]?[^\S\n]*(?:{groups})\b(?:[^\S\n]*:|[^:\n]{{0,30}}$)",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+HEADER_PATTERN = _compile_header_pattern()
+
+
+def segment_sections(text: str) -> Dict[str, List[List[int]]]:
+    """
+    Splits resume text into sections in a single scan.
+
+    Returns:
+        Dict[str, List[List[int]]]: For each section found, the [start, end)
+        character offsets of its body (header excluded). A section that
+        appears more than once has one span per occurrence. The structure is
+        plain JSON, so it can be stored alongside the resume and reused.
+    """
+    sections = {}
+    current, body_start = None, 0
+    for match in HEADER_PATTERN.finditer(text):
+        if current is not None:
+            sections.setdefault(current, []).append([body_start, match.start()])
+        current, body_start = match.lastgroup, match.end()
+    if current is not None:
+        sections.setdefault(current, []).append([body_start, len(text)])
+    return sections
+
+
+def section_text(text: str, sections: Dict[str, List[List[int]]], name: str) -> str:
+    """Returns the body of a section (all occurrences joined), or "" if absent."""
+    return "\n".join(text[start:end] for start, end in sections.get(name, []))
+
+
+DATE_RANGE_PATTERN = re.compile(
+    r"(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[ ]\d{4})\s*[-–]\s*(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[ ]\d{4})"
+)
+
+
+def extract_work_experience(text, sections: Optional[dict] = None):
+    """Extracts total years of work experience from resume text."""
+    try:
+        sections = segment_sections(text) if sections is None else sections
+        # Only count date ranges under the experience section when there is one
+        experience_text = section_text(text, sections, "experience") or text
+        date_matches = DATE_RANGE_PATTERN.findall(experience_text)
+
+        total_months = 0
+
+        for start_date, end_date in date_matches:
+            try:
+                start = parser.parse(start_date, fuzzy=True)
+                end = parser.parse(end_date, fuzzy=True)
+
+                # Ensure start date is before end date
+                if start > end:
+                    continue
+
+                # Calculate duration in months
+                months = (end.year - start.year) * 12 + (end.month - start.month) + 1  # +1 to count the last month
+                total_months += max(0, months)  # Ensure non-negative values
+            except Exception as e:
+                print(f"⚠️ Error parsing dates: {e}")
+
+        # Convert months to years
+        total_years = round(total_months / 12, 1)  # One decimal precision
+
+        return total_years
+
+    except Exception as e:
+        print(f"❌ Error extracting work experience: {e}")
+
+    return 0  # Default to 0 if extraction fails
+
+
+# ✅ Helper: Extract Education Section Properly
+def extract_education(text, sections: Optional[dict] = None):
+    try:
+        sections = segment_sections(text) if sections is None else sections
+        education_text = section_text(text, sections, "education")
+        education_text = "\n".join(line.strip() for line in education_text.split("\n")).strip()
+
+        # ✅ Ensure valid extraction
+        if not education_text:
+            logger.warning("⚠ No education section found.")
+            return "Education section not found in resume."
+
+        return education_text
+
+    except Exception as e:
+        logger.error(f"❌ Error extracting education: {e}")
+        return "Error extracting education."
+
+
+SKILL_SEPARATOR_PATTERN = re.compile(r",|;|\||\s-\s|\n|•")
+PARENTHESIZED_PATTERN = re.compile(r"\([^()\n]*\)")
+SKILL_HEADER_PATTERN = re.compile(r"\b(technical skills|skills|technologies|proficiencies|expertise)\b", re.IGNORECASE)
+
+
+# ✅ Extract Skills from Resumes
+def extract_skills(text, sections: Optional[dict] = None):
+    try:
+        logger.info("Extracting only 'Technical Skills' section...")
+        sections = segment_sections(text) if sections is None else sections
+        skills_text = section_text(text, sections, "skills")
+
+        if not skills_text.strip():
+            logger.warning("No skills section found.")
+            return ["No skills found"]
+
+        # ✅ Keep "AWS (EC2, S3)" together: hide commas inside parentheses while splitting
+        skills_text = PARENTHESIZED_PATTERN.sub(lambda m: m.group(0).replace(",", "\0"), skills_text)
+        extracted_skills = []
+        for skill in SKILL_SEPARATOR_PATTERN.split(skills_text):
+            # ✅ Drop sub-headers ("Programming languages: Python") and collapse whitespace
+            skill = " ".join(skill.rsplit(":", 1)[-1].replace("\0", ",").split())
+            if skill and not SKILL_HEADER_PATTERN.search(skill):
+                extracted_skills.append(skill)
+
+        return extracted_skills if extracted_skills else ["No skills found"]
+
+    except Exception as e:
+        logger.error(f"❌ Error extracting skills: {e}")
+        return ["Error extracting skills"]
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional, Sequence, Set
+
+import numpy as np
+
+from embeddings import EMBEDDING_ENCODER, EmbeddingError, LocalEmbedder, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# ✅ Semantic skill matching (overridable per deployment): off by default; "server" embeds
+# through the shared embedding server and store, "local" runs EMBEDDING_ENCODER in process
+SEMANTIC_SKILL_MATCHING = os.getenv("SEMANTIC_SKILL_MATCHING", "off")
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.75"))
+SEMANTIC_TOP_K = int(os.getenv("SEMANTIC_TOP_K", "3"))
+
+# After the embedder fails, matching goes on without it for this long before trying again
+SEMANTIC_RETRY_SECONDS = 30
+
+
+class SemanticSkillIndex:
+    """
+    Nearest-skill matching by meaning rather than spelling: "Postgres DBA"
+    or "container orchestration" can land on PostgreSQL or Kubernetes, which
+    fuzzy matching never will.
+
+    The vocabulary (the taxonomy's skill names, whose positions are their
+    skill IDs) is embedded once into a dense, L2-normalized matrix. A batch
+    of raw skills is then matched with one matrix multiply: each string maps
+    to its `top_k` nearest skills with cosine similarity >= `threshold`.
+
+    The embedder is pluggable: anything with an async `embed(texts)` that
+    returns normalized float32 rows and a `model_id` (CachedEmbedder for the
+    embedding server, LocalEmbedder around an in-process encoder).
+    """
+
+    def __init__(self, names: Sequence[str], embedder, threshold: float = SEMANTIC_THRESHOLD,
+                 top_k: int = SEMANTIC_TOP_K):
+        self.names = list(names)
+        self.embedder = embedder
+        self.threshold = threshold
+        self.top_k = top_k
+        self._matrix: Optional[np.ndarray] = None
+        self._model_id: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._retry_at = 0.0
+        self.batches = 0
+        self.strings = 0
+        self.matched = 0
+        self.failures = 0
+
+    @property
+    def version(self) -> Optional[str]:
+        """Identifies the answers this index gives; None until the vocabulary is embedded."""
+        if self._model_id is None:
+            return None
+        return f"sem-{self._model_id}-{self.threshold}-k{self.top_k}"
+
+    async def load(self):
+        """Embeds the vocabulary (once; concurrent callers wait for the same load)."""
+        if self._matrix is not None:
+            return
+        async with self._lock:
+            if self._matrix is None:
+                started = time.perf_counter()
+                matrix = await self.embedder.embed(self.names)
+                self._matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+                self._model_id = self.embedder.model_id
+                logger.info(f"✅ Embedded {len(self.names)} vocabulary skills with {self._model_id} "
+                            f"in {time.perf_counter() - started:.2f}s")
+
+    async def available(self) -> bool:
+        """Loads the vocabulary if needed; False (and a pause before retrying) if the embedder is down."""
+        if self._matrix is not None:
+            if self.embedder.model_id == self._model_id:
+                return True
+            self._matrix, self._model_id = None, None  # The embedder serves another model now: re-embed the vocabulary
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            await self.load()
+            return True
+        except EmbeddingError as e:
+            self._failed(e)
+            return False
+
+    def _failed(self, error: Exception):
+        self.failures += 1
+        self._retry_at = time.monotonic() + SEMANTIC_RETRY_SECONDS
+        logger.warning(f"⚠ Semantic skill matching unavailable for {SEMANTIC_RETRY_SECONDS}s: {error}")
+
+    def _nearest(self, vectors: np.ndarray) -> List[Set[int]]:
+        scores = vectors @ self._matrix.T
+        k = min(self.top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        return [set(row[row_scores >= self.threshold].tolist()) for row, row_scores in zip(top, top_scores)]
+
+    async def match(self, strings: Sequence[str]) -> List[Set[int]]:
+        """For each string, the IDs of its nearest vocabulary skills (raises EmbeddingError if the embedder fails)."""
+        if not strings:
+            return []
+        try:
+            await self.load()
+            vectors = np.asarray(await self.embedder.embed(list(strings)), dtype=np.float32)
+            if self.embedder.model_id != self._model_id:
+                self._matrix, self._model_id = None, None  # Re-embed the vocabulary with the new model
+                raise EmbeddingError("Embedding model changed; re-embedding the vocabulary")
+        except EmbeddingError as e:
+            self._failed(e)
+            raise
+        matches = await asyncio.to_thread(self._nearest, vectors)
+        self.batches += 1
+        self.strings += len(strings)
+        self.matched += sum(1 for skill_ids in matches if skill_ids)
+        return matches
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "vocabulary": len(self.names),
+            "batches": self.batches,
+            "strings": self.strings,
+            "matched": self.matched,
+            "failures": self.failures,
+        }
+
+
+def create_semantic_index(names: Sequence[str], embedder, mode: str = SEMANTIC_SKILL_MATCHING,
+                          encoder: str = EMBEDDING_ENCODER) -> Optional[SemanticSkillIndex]:
+    """The index SEMANTIC_SKILL_MATCHING asks for: None ("off"), over `embedder` ("server"), or in process ("local")."""
+    if mode == "off":
+        return None
+    if mode == "server":
+        return SemanticSkillIndex(names, embedder)
+    if mode == "local":
+        return SemanticSkillIndex(names, LocalEmbedder(name=encoder))
+    raise ValueError(f"SEMANTIC_SKILL_MATCHING must be off, server or local, not {mode!r}")
@@ -0,0 +1,126 @@
+# Preload-then-fork launcher: an alternative to `uvicorn app:app --workers N`
+# that shares read-only state between the workers.
+#
+#   PRELOAD_ENGINES=all python serve.py --workers 4 --port 8000    (from backend/)
+#
+# The parent imports the app once (skill taxonomy and matcher, fuzzy index,
+# warm-start mapping) plus the PRELOAD_ENGINES models, freezes everything it
+# allocated out of the garbage collector, and only then forks the workers.
+# The workers share those pages copy-on-write instead of each building its
+# own copy, as uvicorn's spawned workers do. Storage clients, the extraction
+# pool and the ingestion workers are started per worker by the app's startup
+# hooks, after the fork.
+# Measure the difference with `python benchmarks/bench_workers.py`.
+import gc
+
+# Collections in the parent would leave freed holes in the pages the workers share
+gc.disable()
+
+import argparse
+import os
+import signal
+import threading
+import time
+
+import uvicorn
+
+from app import app, logger
+from nlp_models import PRELOAD_ENGINES, preload
+
+# A worker that exits sooner than this after being forked is failing to start, not crashing
+MIN_WORKER_UPTIME = 10.0
+STARTUP_FAILURE = 3
+
+
+def watch_parent(parent_pid: int):
+    """Stops this worker if the launcher dies without stopping it."""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os.kill(os.getpid(), signal.SIGTERM)
+    threading.Thread(target=watch, name="parent-watch", daemon=True).start()
+
+
+def run_worker(config: uvicorn.Config, sock, parent_pid: int) -> int:
+    """Serves in a forked worker until it is stopped; returns its exit code."""
+    # Own process group: a Ctrl+C in the terminal reaches the launcher only, which
+    # stops the workers with one SIGTERM (a second signal would skip uvicorn's shutdown)
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    gc.enable()
+    watch_parent(parent_pid)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the app from workers forked after preloading it")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload-engines", default=PRELOAD_ENGINES,
+                        help='NLP engines to load before forking, comma-separated or "all"')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    loaded = preload(args.preload_engines)
+    # Everything allocated so far is shared, read-only state: never scan it again
+    gc.collect()
+    gc.freeze()
+    logger.info(f"✅ Preloaded the app{' and ' + ', '.join(loaded) if loaded else ''} in "
+                f"{time.perf_counter() - started:.1f}s ({gc.get_freeze_count()} objects frozen)")
+
+    config = uvicorn.Config(app, host=args.host, port=args.port)
+    sock = config.bind_socket()
+    parent_pid = os.getpid()
+    workers = {}  # pid -> fork time
+
+    def fork_worker():
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(config, sock, parent_pid)
+            except Exception as e:
+                logger.error(f"❌ Worker {os.getpid()} failed: {e}", exc_info=True)
+            finally:
+                os._exit(code)
+        workers[pid] = time.monotonic()
+
+    stopping = False
+
+    def stop(sig, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(args.workers):
+        fork_worker()
+    logger.info(f"✅ Serving on http://{args.host}:{args.port} with {args.workers} forked workers (Ctrl+C to stop)")
+
+    # ✅ Supervise: replace workers that die, stop everything if one can't start
+    while workers:
+        pid, status = os.wait()
+        forked_at = workers.pop(pid, None)
+        if forked_at is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - forked_at < MIN_WORKER_UPTIME:
+            logger.error(f"❌ Worker {pid} exited with {code} during startup; stopping")
+            stop(signal.SIGTERM, None)
+            continue
+        logger.warning(f"⚠ Worker {pid} exited with {code}; starting a new one")
+        fork_worker()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Skill ID k lives in block k // 64, bit k % 64. Blocks are little-endian so
+# the byte layout is the same on every machine (it's stored in MongoDB).
+BLOCK_DTYPE = np.dtype("<u8")
+BLOCK_BITS = 64
+
+
+def bitset_width(n_skills: int) -> int:
+    """Number of uint64 blocks needed for a vocabulary of n_skills."""
+    return max(1, (n_skills + BLOCK_BITS - 1) // BLOCK_BITS)
+
+
+def to_bitset(skill_ids: Iterable[int], width: int) -> np.ndarray:
+    bits = np.zeros(width * BLOCK_BITS, dtype=np.uint8)
+    ids = np.fromiter(skill_ids, dtype=np.int64)
+    bits[ids] = 1
+    return np.packbits(bits, bitorder="little").view(BLOCK_DTYPE)
+
+
+def to_bytes(skill_ids: Iterable[int], width: int) -> bytes:
+    """Serialized bitset, as stored on a resume document."""
+    return to_bitset(skill_ids, width).tobytes()
+
+
+def stack_bitsets(rows: Sequence[bytes], width: int) -> np.ndarray:
+    """Builds the N×W matrix of bitsets for N resumes from their stored bytes."""
+    if not rows:
+        return np.zeros((0, width), dtype=BLOCK_DTYPE)
+    return np.frombuffer(b"".join(rows), dtype=BLOCK_DTYPE).reshape(len(rows), width)
+
+
+if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+    def popcount(matrix: np.ndarray) -> np.ndarray:
+        """Number of set bits in each row."""
+        return np.bitwise_count(matrix).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(matrix: np.ndarray) -> np.ndarray:
+        """Number of set bits in each row."""
+        as_bytes = matrix.view(np.uint8).reshape(*matrix.shape[:-1], -1)
+        return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def overlap(matrix: np.ndarray, job_bits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intersects every resume's skills with the job's skills at once.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The N×W matched-skill bitsets and the
+        number of matched skills per resume.
+    """
+    matched = np.bitwise_and(matrix, job_bits)
+    return matched, popcount(matched)
+
+
+def ids_from_bitset(row: np.ndarray) -> List[int]:
+    """Skill IDs set in one bitset row, in ascending order."""
+    bits = np.unpackbits(np.ascontiguousarray(row, dtype=BLOCK_DTYPE).view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).tolist()
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from extraction_cache import LRUCache
+from embeddings import EmbeddingError
+from fuzzy_matching import FuzzySkillIndex
+from repository import SkillDictionaryRepository
+from semantic_matching import SemanticSkillIndex
+from skill_taxonomy import SkillTaxonomy
+
+logger = logging.getLogger(__name__)
+
+# ✅ Entries kept in process; the stored dictionary behind it is unbounded
+SKILL_DICTIONARY_CACHE_SIZE = int(os.getenv("SKILL_DICTIONARY_CACHE_SIZE", "100000"))
+
+# Longer "skills" are sentence fragments, not worth a shared entry
+MAX_PERSISTED_KEY_LENGTH = 256
+
+
+class SkillDictionary:
+    """
+    Global raw skill string → canonical skill IDs dictionary.
+
+    Resumes keep repeating the same raw spellings ("Python 3", "ReactJS",
+    "AWS (EC2, S3)"), so each distinct normalized string is matched once
+    (exact taxonomy resolve plus fuzzy match) and the answer is shared by
+    every resume, job and worker: a bounded in-process LRU sits in front of a
+    stored dictionary (see SkillDictionaryRepository) that fills lazily.
+    Entries are keyed by the vocabulary version, so a taxonomy change starts a
+    fresh dictionary.
+
+    With a semantic index, never-seen strings also get their nearest skills
+    by embedding (one batch per lookup), and entries are keyed by the
+    semantic model too. While the embedder is unavailable, lookups fall back
+    to exact plus fuzzy matching under the plain version.
+
+    Matching never-seen strings runs in a worker thread so it doesn't hold up
+    the event loop.
+    """
+
+    def __init__(self, store: SkillDictionaryRepository, taxonomy: SkillTaxonomy, fuzzy_index: FuzzySkillIndex,
+                 semantic_index: Optional[SemanticSkillIndex] = None, max_entries: int = SKILL_DICTIONARY_CACHE_SIZE):
+        self.store = store
+        self.taxonomy = taxonomy
+        self.fuzzy_index = fuzzy_index
+        self.semantic_index = semantic_index
+        self.base_version = f"{taxonomy.version}-t{fuzzy_index.threshold}"
+        self._memory = LRUCache(max_entries)  # (version, key) -> skill IDs
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.db_errors = 0
+
+    @property
+    def version(self) -> str:
+        semantic_version = self.semantic_index.version if self.semantic_index is not None else None
+        return f"{self.base_version}-{semantic_version}" if semantic_version else self.base_version
+
+    @staticmethod
+    def key(raw_skill: str) -> str:
+        return " ".join(raw_skill.lower().split())
+
+    def _match(self, keys: Sequence[str], semantic_ids: Optional[List[Set[int]]] = None) -> Dict[str, List[int]]:
+        """Matches never-seen strings against the vocabulary, all in one batch."""
+        matches = {}
+        for i, (key, skill_ids) in enumerate(zip(keys, self.fuzzy_index.match(keys))):
+            skill_id = self.taxonomy.resolve(key)
+            if skill_id is not None:
+                skill_ids.add(skill_id)
+            if semantic_ids is not None:
+                skill_ids |= semantic_ids[i]
+            matches[key] = sorted(skill_ids)
+        return matches
+
+    def match(self, raw_skills: Iterable[str]) -> List[int]:
+        """Skill IDs for one set of raw skills, matched directly (exact and fuzzy only; nothing shared or stored)."""
+        keys = list(dict.fromkeys(self.key(raw_skill) for raw_skill in raw_skills))
+        return sorted(set().union(*self._match(keys).values()))
+
+    async def lookup_many(self, raw_skills: Iterable[str]) -> Tuple[Dict[str, List[int]], str]:
+        """
+        Canonical skill IDs for every distinct normalized raw skill string,
+        and the dictionary version they were matched under: `base_version`
+        when semantic matching was unavailable for the lookup.
+        """
+        semantic = self.semantic_index
+        if semantic is not None and not await semantic.available():
+            semantic = None
+        version = self.version if semantic is not None else self.base_version
+
+        results = {}
+        missing = []
+        for key in dict.fromkeys(self.key(raw_skill) for raw_skill in raw_skills):
+            skill_ids = self._memory.get((version, key))
+            if skill_ids is None:
+                missing.append(key)
+            else:
+                results[key] = skill_ids
+                self.memory_hits += 1
+        if not missing:
+            return results, version
+
+        persisted = [key for key in missing if len(key) <= MAX_PERSISTED_KEY_LENGTH]
+        try:
+            for key, skill_ids in (await self.store.get_many(version, persisted)).items():
+                results[key] = skill_ids
+                self._memory.put((version, key), skill_ids)
+                self.db_hits += 1
+        except Exception as e:
+            logger.warning(f"⚠ Skill dictionary lookup failed, matching locally: {e}")
+            self.db_errors += 1
+
+        unseen = [key for key in missing if key not in results]
+        if not unseen:
+            return results, version
+        self.misses += len(unseen)
+        semantic_ids = None
+        if semantic is not None:
+            try:
+                semantic_ids = await semantic.match(unseen)
+            except EmbeddingError:
+                version = self.base_version  # Plain answers for these: cache them as such
+        matches = await asyncio.to_thread(self._match, unseen, semantic_ids)
+        for key, skill_ids in matches.items():
+            results[key] = skill_ids
+            self._memory.put((version, key), skill_ids)
+
+        writes = {key: skill_ids for key, skill_ids in matches.items() if len(key) <= MAX_PERSISTED_KEY_LENGTH}
+        if writes:
+            try:
+                await self.store.put_many(version, writes)
+            except Exception as e:
+                logger.warning(f"⚠ Could not persist {len(writes)} skill dictionary entries: {e}")
+                self.db_errors += 1
+        return results, version
+
+    async def canonical_ids_many(self, resumes_skills: Sequence[Sequence[str]]) -> Tuple[List[List[int]], str]:
+        """For each resume's raw skills, the sorted union of the skill IDs they map to; plus the version used."""
+        lookup, version = await self.lookup_many(
+            raw_skill for resume_skills in resumes_skills for raw_skill in resume_skills)
+        return [
+            sorted(set().union(*(lookup[self.key(raw_skill)] for raw_skill in resume_skills)))
+            for resume_skills in resumes_skills
+        ], version
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "version": self.version,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self._memory.evictions,
+            "db_errors": self.db_errors,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            "semantic": self.semantic_index.stats() if self.semantic_index is not None else None,
+        }
@@ -0,0 +1,190 @@
+from array import array
+from collections import deque, namedtuple
+from functools import lru_cache
+from typing import Iterable, List
+
+# A skill occurrence in the scanned text: [start, end) offsets and the vocabulary spelling
+SkillMatch = namedtuple("SkillMatch", ["start", "end", "skill"])
+
+# Characters that continue a token after a word character: "C" must not match inside "C++" or "C#"
+_TOKEN_SUFFIX_CHARS = "+#"
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercases text without changing its length, so offsets map back 1:1."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. "İ") lowercase to two code points
+    return "".join(ch.lower()[:1] for ch in text)
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over a skill vocabulary.
+
+    Built once, it finds every vocabulary skill in a text in one linear pass,
+    instead of one regex search per skill. Matching is case-insensitive and
+    only whole tokens count: a match may not be preceded or followed by a word
+    character, so "Java" doesn't fire inside "JavaScript", "C" doesn't fire
+    inside "C++"/"C#", and ".NET", "C++", "Node.js" match even though they
+    start or end with punctuation (where a plain \\b regex fails).
+
+    The automaton is compiled to a dense transition table over the characters
+    that occur in the vocabulary, stored in flat arrays.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        # ✅ Deduplicate case-insensitively, keeping the first spelling
+        self.skills: List[str] = []
+        patterns = []
+        seen = set()
+        for skill in skills:
+            skill = skill.strip()
+            pattern = _lower_same_length(skill)
+            if skill and pattern not in seen:
+                seen.add(pattern)
+                self.skills.append(skill)
+                patterns.append(pattern)
+
+        # Character classes: 0 is "any character not in the vocabulary"
+        self._classes = {}
+        for pattern in patterns:
+            for ch in pattern:
+                if ch not in self._classes:
+                    self._classes[ch] = len(self._classes) + 1
+        self._n_classes = len(self._classes) + 1
+
+        self._pattern_lengths = array("i", (len(pattern) for pattern in patterns))
+        self._build(patterns)
+
+    def _build(self, patterns):
+        # ✅ Trie
+        goto = [{}]
+        outputs = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                cls = self._classes[ch]
+                if cls not in goto[state]:
+                    goto[state][cls] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = goto[state][cls]
+            outputs[state].append(pattern_id)
+
+        # ✅ Failure links (BFS), folded straight into a full DFA transition table
+        n_states, n_classes = len(goto), self._n_classes
+        delta = array("i", bytes(4 * n_states * n_classes))
+        fail = [0] * n_states
+        queue = deque()
+        for cls in range(n_classes):
+            child = goto[0].get(cls, 0)
+            delta[cls] = child
+            if child:
+                queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            row, fail_row = state * n_classes, fail[state] * n_classes
+            for cls in range(n_classes):
+                child = goto[state].get(cls)
+                if child is None:
+                    delta[row + cls] = delta[fail_row + cls]
+                else:
+                    fail[child] = delta[fail_row + cls]
+                    delta[row + cls] = child
+                    queue.append(child)
+
+        # ✅ Outputs in CSR form: ids for state s are out_ids[out_start[s]:out_start[s + 1]]
+        self._delta = delta
+        self._out_start = array("i", [0])
+        self._out_ids = array("i")
+        for state_outputs in outputs:
+            # Longest pattern first, so overlapping matches come out longest-first
+            self._out_ids.extend(sorted(state_outputs, key=lambda pid: -self._pattern_lengths[pid]))
+            self._out_start.append(len(self._out_ids))
+
+    def to_compiled(self) -> dict:
+        """The built automaton: the skill list, the character classes and its flat int32 arrays."""
+        return {
+            "skills": self.skills,
+            "classes": "".join(sorted(self._classes, key=self._classes.get)),
+            "pattern_lengths": self._pattern_lengths,
+            "delta": self._delta,
+            "out_start": self._out_start,
+            "out_ids": self._out_ids,
+        }
+
+    @classmethod
+    def from_compiled(cls, skills: List[str], classes: str, pattern_lengths, delta, out_start, out_ids) -> "SkillMatcher":
+        """
+        A matcher from a prebuilt automaton (see to_compiled), skipping the
+        build. The arrays can be any int32 sequences, e.g. memoryviews over a
+        memory-mapped file, and are used as they are.
+        """
+        matcher = cls.__new__(cls)
+        matcher.skills = list(skills)
+        matcher._classes = {ch: cls_id for cls_id, ch in enumerate(classes, 1)}
+        matcher._n_classes = len(classes) + 1
+        matcher._pattern_lengths = pattern_lengths
+        matcher._delta = delta
+        matcher._out_start = out_start
+        matcher._out_ids = out_ids
+        return matcher
+
+    @property
+    def n_states(self) -> int:
+        return len(self._out_start) - 1
+
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """
+        Returns every whole-token vocabulary match in `text`, in order of
+        where they end. Overlapping matches ("React" and "React Native") are
+        all reported.
+        """
+        lowered = _lower_same_length(text)
+        delta, classes, n_classes = self._delta, self._classes, self._n_classes
+        out_start, out_ids, lengths = self._out_start, self._out_ids, self._pattern_lengths
+        text_length = len(lowered)
+
+        matches = []
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            state = delta[state * n_classes + classes.get(ch, 0)]
+            first, last = out_start[state], out_start[state + 1]
+            if first == last:
+                continue
+
+            after = lowered[end] if end < text_length else ""
+            for k in range(first, last):
+                pattern_id = out_ids[k]
+                start = end - lengths[pattern_id]
+                if start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if after and (_is_word_char(after) or (after in _TOKEN_SUFFIX_CHARS and _is_word_char(ch))):
+                    continue
+                matches.append(SkillMatch(start, end, self.skills[pattern_id]))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Returns the distinct vocabulary skills found in `text`, in order of appearance."""
+        found = {}
+        for match in sorted(self.find_all(text)):
+            found.setdefault(match.skill, None)
+        return list(found)
+
+
+@lru_cache(maxsize=8)
+def _matcher_for(skills: tuple) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def get_skill_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Returns a (cached) matcher for a skill vocabulary, building it on first use."""
+    return _matcher_for(tuple(skills))
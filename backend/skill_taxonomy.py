@@ -0,0 +1,200 @@
+import csv
+import hashlib
+import re
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from skill_matcher import SkillMatcher
+
+# ✅ Alternative spellings → canonical skill (as spelled in RoleSkills.csv)
+SKILL_ALIASES = {
+    "JavaScript (Node.js)": "Node.js",
+    "Apache Kafka": "Kafka",
+    "Apache Hive": "Hive",
+    "Apache Spark": "Spark",
+    "Apache Hadoop": "Hadoop",
+    "Apache Flink": "Flink",
+    "Amazon Redshift": "Redshift",
+    "GitLab CI/CD": "GitLab CI",
+    "Amazon Web Services": "AWS",
+    "Google Cloud Platform": "GCP",
+    "Google Cloud": "GCP",
+    "Azure": "Microsoft Azure",
+    "SQL Server": "MS SQL Server",
+    "MSSQL": "MS SQL Server",
+    "Postgres": "PostgreSQL",
+    "K8s": "Kubernetes",
+    "Golang": "Go",
+    "Mongo": "MongoDB",
+    "sklearn": "Scikit-learn",
+    "Hugging Face": "Hugging Face Transformers",
+    "REST APIs": "RESTful APIs",
+    "REST API": "RESTful APIs",
+    "OOP": "Object-Oriented Programming",
+}
+
+_JS_SUFFIX = re.compile(r"(?<=[a-z0-9])\.?js$")
+_PARENTHETICAL = re.compile(r"^(?P<head>[^(]+?)\s*\((?P<items>[^)]*)\)$")
+
+
+def normalize_skill(name: str) -> str:
+    """Lookup key for a skill spelling: case/whitespace-insensitive, "React.js" == "ReactJS" == "React"."""
+    key = " ".join(name.lower().split())
+    return _JS_SUFFIX.sub("", key) if len(key) > 4 else key
+
+
+def split_skill_entries(cell: str) -> List[str]:
+    """Splits a RoleSkills.csv cell on commas that are not inside parentheses."""
+    entries, depth, current = [], 0, []
+    for ch in cell:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        if ch == "," and depth == 0:
+            entries.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    entries.append("".join(current).strip())
+    return [entry for entry in entries if entry]
+
+
+class SkillTaxonomy:
+    """
+    Canonical skill vocabulary built from RoleSkills.csv.
+
+    Every distinct skill gets a small integer ID (its index in `names`);
+    spellings, "X.js" variants and SKILL_ALIASES all resolve to that ID.
+    Role membership is kept as sorted arrays of IDs, and downstream code
+    (job skills, resume skills, matching, feedback) works on IDs and only
+    turns them back into names for display.
+    """
+
+    def __init__(self, roles: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self._alias_targets = {normalize_skill(alias): target for alias, target in aliases.items()}
+
+        self.names: List[str] = []  # canonical spelling, indexed by skill ID
+        self._ids: Dict[str, int] = {}  # normalized spelling -> skill ID
+        self.surface_forms: List[str] = []  # every spelling the matcher should find in text
+        self.roles: Dict[str, array] = {}
+
+        for role, entries in roles.items():
+            ids = set()
+            for entry in entries:
+                ids.update(self._add_entry(entry))
+            self.roles[sys.intern(role)] = array("H", sorted(ids))
+
+        for alias in aliases:
+            self._add_surface(alias, self._intern_skill(self._alias_targets[normalize_skill(alias)]))
+
+        digest = hashlib.sha1(repr((sorted(roles.items()), sorted(aliases.items()))).encode("utf-8"))
+        self.version = digest.hexdigest()[:8]
+        self.matcher = SkillMatcher(self.surface_forms)
+
+    @classmethod
+    def from_csv(cls, path: str = "RoleSkills.csv", aliases: Optional[Dict[str, str]] = None) -> "SkillTaxonomy":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = [column.strip() for column in next(reader)]
+            role_col, skills_col = header.index("Role"), header.index("Skills")
+            roles = {}
+            for row in reader:
+                if len(row) > skills_col and row[skills_col].strip():
+                    roles.setdefault(row[role_col].strip(), []).extend(split_skill_entries(row[skills_col]))
+        return cls(roles, aliases)
+
+    def _intern_skill(self, name: str) -> int:
+        """Returns the ID of a canonical skill, creating it on first sight."""
+        key = normalize_skill(name)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            skill_id = len(self.names)
+            self.names.append(sys.intern(name))
+            self._ids[key] = skill_id
+            self._add_surface(name, skill_id)
+        return skill_id
+
+    def _add_surface(self, spelling: str, skill_id: int):
+        key = normalize_skill(spelling)
+        self._ids.setdefault(key, skill_id)
+        self.surface_forms.append(sys.intern(spelling))
+        if spelling.lower().endswith(".js"):
+            self.surface_forms.append(sys.intern(spelling[:-3] + "JS"))  # "ReactJS"
+
+    def _add_entry(self, entry: str) -> List[int]:
+        """Adds one CSV entry; "Android (Kotlin, Java)" yields Android, Kotlin and Java."""
+        target = self._alias_targets.get(normalize_skill(entry))
+        if target:
+            skill_id = self._intern_skill(target)
+            self._add_surface(entry, skill_id)
+            return [skill_id]
+
+        match = _PARENTHETICAL.match(entry)
+        if not match:
+            return [self._intern_skill(entry)]
+        ids = [self._intern_skill(match.group("head"))]
+        for item in split_skill_entries(match.group("items")):
+            item = re.sub(r"^for\s+", "", item)  # "Rust (for Solana)"
+            ids.extend(self._add_entry(item))
+        return ids
+
+    def to_state(self) -> dict:
+        """Everything the taxonomy is made of except its matcher (JSON-serializable)."""
+        return {
+            "version": self.version,
+            "names": self.names,
+            "ids": self._ids,
+            "alias_targets": self._alias_targets,
+            "surface_forms": self.surface_forms,
+            "roles": {role: list(ids) for role, ids in self.roles.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, matcher: SkillMatcher) -> "SkillTaxonomy":
+        """A taxonomy from to_state() output and its prebuilt matcher, without re-parsing the CSV."""
+        taxonomy = cls.__new__(cls)
+        taxonomy.version = state["version"]
+        taxonomy.names = [sys.intern(name) for name in state["names"]]
+        taxonomy._ids = state["ids"]
+        taxonomy._alias_targets = state["alias_targets"]
+        taxonomy.surface_forms = [sys.intern(spelling) for spelling in state["surface_forms"]]
+        taxonomy.roles = {sys.intern(role): array("H", ids) for role, ids in state["roles"].items()}
+        taxonomy.matcher = matcher
+        return taxonomy
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, spelling: str) -> Optional[int]:
+        """Skill ID for an exact (normalized) spelling or alias, or None."""
+        key = normalize_skill(spelling)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            target = self._alias_targets.get(key)
+            skill_id = self._ids.get(normalize_skill(target)) if target else None
+        return skill_id
+
+    def resolve_all(self, spellings: Iterable[str]) -> List[int]:
+        """Distinct IDs of the spellings that resolve exactly, in first-seen order."""
+        ids = {}
+        for spelling in spellings:
+            skill_id = self.resolve(spelling)
+            if skill_id is not None:
+                ids.setdefault(skill_id, None)
+        return list(ids)
+
+    def name(self, skill_id: int) -> str:
+        return self.names[skill_id]
+
+    def names_for(self, skill_ids: Iterable[int]) -> List[str]:
+        return [self.names[skill_id] for skill_id in skill_ids]
+
+    def extract_ids(self, text: str) -> List[int]:
+        """Distinct IDs of every skill mentioned in free text (e.g. a job description)."""
+        return self.resolve_all(self.matcher.extract(text))
+
+    def role_skill_ids(self, role: str) -> array:
+        return self.roles.get(role, array("H"))
@@ -0,0 +1,511 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+from repository import (
+    PARSED_PROJECTION, TASK_STATUSES, JobRepository, Repository, ResumeRepository, SkillDictionaryRepository,
+    TaskRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+# ✅ Database file for the embedded backend (STORAGE_BACKEND=sqlite)
+SQLITE_PATH = os.getenv("SQLITE_PATH", "resume_screening.db")
+
+# SQLite's default limit on host parameters per statement is 999
+MAX_PARAMS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resumes (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    score REAL,
+    score_version TEXT,
+    content_hash TEXT,
+    features_version TEXT,
+    work_experience REAL,
+    skill_bits BLOB,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_leaderboard ON resumes (job_id, score DESC, id);
+CREATE INDEX IF NOT EXISTS resumes_job ON resumes (job_id, id);
+CREATE INDEX IF NOT EXISTS resumes_content_hash ON resumes (content_hash, features_version);
+CREATE TABLE IF NOT EXISTS resume_texts (
+    id TEXT PRIMARY KEY,
+    job_id TEXT,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skill_dictionary (
+    version TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    skill_ids TEXT NOT NULL,
+    PRIMARY KEY (version, raw)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    args TEXT NOT NULL,
+    data BLOB,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_claimable ON tasks (available_at) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+"""
+
+# Resume fields kept in their own columns (indexed, or read by scoring); the rest is JSON in `doc`
+RESUME_COLUMNS = ("job_id", "score", "score_version", "content_hash", "features_version", "work_experience", "skill_bits")
+RESUME_SELECT = "SELECT id, " + ", ".join(RESUME_COLUMNS) + ", doc FROM resumes"
+SCORING_SELECT = "SELECT id, skill_bits, work_experience, features_version FROM resumes"
+
+# ✅ Every hot query, by name (tests/test_query_plans.py checks each one is index-backed)
+SQL = {
+    "job": "SELECT id, doc FROM jobs WHERE id = ?",
+    "leaderboard top": RESUME_SELECT + " WHERE job_id = ? ORDER BY score DESC, id LIMIT ?",
+    "leaderboard top, min_score": RESUME_SELECT + " WHERE job_id = ? AND score >= ? ORDER BY score DESC, id LIMIT ?",
+    "leaderboard page, ties": RESUME_SELECT + " WHERE job_id = ? AND score = ? AND id > ? ORDER BY id LIMIT ?",
+    "leaderboard page, below": RESUME_SELECT + " WHERE job_id = ? AND score < ? ORDER BY score DESC, id LIMIT ?",
+    "leaderboard page, first": RESUME_SELECT + " WHERE job_id = ? AND score IS NOT NULL ORDER BY score DESC, id LIMIT ?",
+    "scoring batch": SCORING_SELECT + " WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+    "unscored": SCORING_SELECT + " WHERE job_id = ? AND score_version IS NOT ? LIMIT ?",
+    "same file uploaded": RESUME_SELECT + " WHERE content_hash = ? AND features_version = ? LIMIT 1",
+    "resume by id": RESUME_SELECT + " WHERE id = ?",
+    "resume text": "SELECT id, text FROM resume_texts WHERE id = ?",
+    "resume text batch": "SELECT id, job_id, text FROM resume_texts WHERE id > ? ORDER BY id LIMIT ?",
+    "skill dictionary": "SELECT raw, skill_ids FROM skill_dictionary WHERE version = ? AND raw = ?",
+    # The partial index holds only claimable tasks, already in claim order
+    "claimable tasks": "SELECT id FROM tasks INDEXED BY tasks_claimable WHERE status IN ('queued', 'running') AND available_at <= ? "
+                       "ORDER BY available_at LIMIT ?",
+    "task": "SELECT * FROM tasks WHERE id = ?",
+    "tasks by status": "SELECT COUNT(*) FROM tasks WHERE status = ?",
+}
+
+
+def _chunks(items: Sequence, size: int = MAX_PARAMS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+def _resume_row(document: dict) -> tuple:
+    fields = {k: v for k, v in document.items() if k != "_id" and k not in RESUME_COLUMNS}
+    columns = [document.get(column) for column in RESUME_COLUMNS]
+    columns[0] = str(columns[0])
+    return (str(document["_id"]), *columns, json.dumps(fields))
+
+
+def _resume_from_row(row: sqlite3.Row) -> dict:
+    document = json.loads(row["doc"])
+    document["_id"] = ObjectId(row["id"])
+    for column in RESUME_COLUMNS:
+        if row[column] is not None:
+            document[column] = row[column]
+    return document
+
+
+def _scoring_from_row(row: sqlite3.Row) -> dict:
+    return {"_id": ObjectId(row["id"]), "skill_bits": row["skill_bits"],
+            "work_experience": row["work_experience"], "features_version": row["features_version"]}
+
+
+class _Database:
+    """
+    One SQLite connection shared by the repositories. sqlite3 is blocking,
+    so statements run in a worker thread (one at a time, under a lock) and
+    the event loop never waits on disk.
+
+    The connection is opened on first use, not at construction: a connection
+    must not cross a fork(), and serve.py imports the app before forking.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _call(self, fn, *args):
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            return fn(self._connection, *args)
+
+    async def run(self, fn, *args):
+        """Runs fn(connection, *args) in a worker thread."""
+        return await asyncio.to_thread(self._call, fn, *args)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _transaction(fn):
+    """
+    Wraps a blocking fn(connection, ...) in BEGIN IMMEDIATE/COMMIT (ROLLBACK
+    on error). IMMEDIATE takes the write lock up front, so read-then-write
+    steps (task claims) are atomic across processes sharing the file.
+    """
+    def wrapped(connection, *args):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(connection, *args)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+    return wrapped
+
+
+class SQLiteJobRepository(JobRepository):
+    def __init__(self, database: _Database):
+        self.database = database
+
+    async def insert(self, job: dict) -> ObjectId:
+        job.setdefault("_id", ObjectId())
+        fields = {k: v for k, v in job.items() if k != "_id"}
+        await self.database.run(lambda c: c.execute("INSERT INTO jobs (id, doc) VALUES (?, ?)",
+                                                    (str(job["_id"]), json.dumps(fields))))
+        return job["_id"]
+
+    @staticmethod
+    def _get(connection, job_id: ObjectId) -> Optional[dict]:
+        row = connection.execute(SQL["job"], (str(job_id),)).fetchone()
+        if row is None:
+            return None
+        return {"_id": ObjectId(row["id"]), **json.loads(row["doc"])}
+
+    async def get(self, job_id: ObjectId) -> Optional[dict]:
+        return await self.database.run(self._get, job_id)
+
+    @staticmethod
+    @_transaction
+    def _update(connection, job_id: ObjectId, fields: dict) -> Optional[dict]:
+        job = SQLiteJobRepository._get(connection, job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        connection.execute("UPDATE jobs SET doc = ? WHERE id = ?",
+                           (json.dumps({k: v for k, v in job.items() if k != "_id"}), str(job_id)))
+        return job
+
+    async def set_fields(self, job_id: ObjectId, fields: dict):
+        await self.database.run(self._update, job_id, fields)
+
+    async def update(self, job_id: ObjectId, fields: dict) -> Optional[dict]:
+        return await self.database.run(self._update, job_id, fields)
+
+
+class SQLiteResumeRepository(ResumeRepository):
+    def __init__(self, database: _Database):
+        self.database = database
+
+    @staticmethod
+    def _insert_resume(connection, document: dict):
+        document.setdefault("_id", ObjectId())
+        connection.execute(
+            f"INSERT INTO resumes (id, {', '.join(RESUME_COLUMNS)}, doc) VALUES ({_placeholders(len(RESUME_COLUMNS) + 2)})",
+            _resume_row(document)
+        )
+
+    @staticmethod
+    def _insert_text(connection, text_document: dict):
+        connection.execute("INSERT OR REPLACE INTO resume_texts (id, job_id, text) VALUES (?, ?, ?)",
+                           (str(text_document["_id"]), text_document.get("job_id"), text_document["text"]))
+
+    async def insert(self, document: dict, text_document: dict) -> ObjectId:
+        @_transaction
+        def insert(connection):
+            self._insert_resume(connection, document)
+            self._insert_text(connection, text_document)
+        await self.database.run(insert)
+        return document["_id"]
+
+    async def insert_many(self, documents: Sequence[dict], text_documents: Sequence[dict]) -> Dict[int, str]:
+        if not documents:
+            return {}
+
+        @_transaction
+        def insert_many(connection):
+            failed = {}
+            for index, (document, text_document) in enumerate(zip(documents, text_documents)):
+                try:
+                    self._insert_resume(connection, document)
+                except sqlite3.IntegrityError as e:
+                    failed[index] = str(e)
+                    continue
+                self._insert_text(connection, text_document)
+            return failed
+        return await self.database.run(insert_many)
+
+    async def find_parsed(self, content_hash: str, features_version: str) -> Optional[dict]:
+        def find(connection):
+            row = connection.execute(SQL["same file uploaded"], (content_hash, features_version)).fetchone()
+            if row is None:
+                return None
+            text = connection.execute(SQL["resume text"], (row["id"],)).fetchone()
+            if text is None:
+                return None
+            stored = _resume_from_row(row)
+            parsed = {field: stored.get(field) for field in PARSED_PROJECTION}
+            return {"text": text["text"], **parsed}
+        return await self.database.run(find)
+
+    async def get_texts(self, resume_ids: Sequence[ObjectId]) -> Dict[ObjectId, str]:
+        def get_texts(connection):
+            texts = {}
+            for chunk in _chunks([str(resume_id) for resume_id in resume_ids]):
+                rows = connection.execute(
+                    f"SELECT id, text FROM resume_texts WHERE id IN ({_placeholders(len(chunk))})", chunk)
+                texts.update((ObjectId(row["id"]), row["text"]) for row in rows)
+            return texts
+        return await self.database.run(get_texts)
+
+    async def set_fields_many(self, updates: Sequence[Tuple[ObjectId, dict]]):
+        if not updates:
+            return
+
+        @_transaction
+        def set_fields_many(connection):
+            for resume_id, fields in updates:
+                row = connection.execute(SQL["resume by id"], (str(resume_id),)).fetchone()
+                if row is not None:
+                    document = _resume_from_row(row)
+                    document.update(fields)
+                    connection.execute(
+                        f"REPLACE INTO resumes (id, {', '.join(RESUME_COLUMNS)}, doc) "
+                        f"VALUES ({_placeholders(len(RESUME_COLUMNS) + 2)})",
+                        _resume_row(document)
+                    )
+        await self.database.run(set_fields_many)
+
+    async def text_batches(self, batch_size: int) -> AsyncIterator[List[dict]]:
+        last_id = ""
+        while True:
+            rows = await self.database.run(
+                lambda c, last_id=last_id: c.execute(SQL["resume text batch"], (last_id, batch_size)).fetchall()
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            yield [{"_id": ObjectId(row["id"]), "job_id": row["job_id"], "text": row["text"]} for row in rows]
+
+    async def top(self, job_id: str, limit: Optional[int] = None, min_score: Optional[float] = None) -> List[dict]:
+        limit = -1 if limit is None else limit  # LIMIT -1: no limit
+        if min_score is None:
+            query, params = SQL["leaderboard top"], (str(job_id), limit)
+        else:
+            query, params = SQL["leaderboard top, min_score"], (str(job_id), min_score, limit)
+        rows = await self.database.run(lambda c: c.execute(query, params).fetchall())
+        return [_resume_from_row(row) for row in rows]
+
+    async def page(self, job_id: str, page_size: int,
+                   after: Optional[Tuple[float, ObjectId]] = None) -> Tuple[List[dict], bool]:
+        def page(connection):
+            wanted = page_size + 1
+            if after is None:
+                return connection.execute(SQL["leaderboard page, first"], (str(job_id), wanted)).fetchall()
+            # Two index seeks instead of one OR: the rest of the tied score, then everything below it
+            score, resume_id = after
+            rows = connection.execute(SQL["leaderboard page, ties"], (str(job_id), score, str(resume_id), wanted)).fetchall()
+            if len(rows) < wanted:
+                rows += connection.execute(SQL["leaderboard page, below"], (str(job_id), score, wanted - len(rows))).fetchall()
+            return rows
+        rows = await self.database.run(page)
+        return [_resume_from_row(row) for row in rows[:page_size]], len(rows) > page_size
+
+    async def fetch(self, resume_ids: Sequence[ObjectId]) -> List[dict]:
+        def fetch(connection):
+            found = {}
+            for chunk in _chunks([str(resume_id) for resume_id in resume_ids]):
+                rows = connection.execute(f"{RESUME_SELECT} WHERE id IN ({_placeholders(len(chunk))})", chunk)
+                found.update((row["id"], _resume_from_row(row)) for row in rows)
+            return found
+        found = await self.database.run(fetch)
+        return [found[str(resume_id)] for resume_id in resume_ids if str(resume_id) in found]
+
+    async def scoring_batches(self, job_id: str, batch_size: int) -> AsyncIterator[List[dict]]:
+        last_id = ""
+        while True:
+            # Keyset pagination on the (job_id, id) index: no cursor held open between batches
+            rows = await self.database.run(
+                lambda c, last_id=last_id: c.execute(SQL["scoring batch"], (str(job_id), last_id, batch_size)).fetchall()
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            yield [_scoring_from_row(row) for row in rows]
+
+    async def unscored(self, job_id: str, version: str, limit: int) -> List[dict]:
+        rows = await self.database.run(lambda c: c.execute(SQL["unscored"], (str(job_id), version, limit)).fetchall())
+        return [_scoring_from_row(row) for row in rows]
+
+    async def set_scores(self, scores: Sequence[Tuple[ObjectId, float]], version: str):
+        if scores:
+            rows = [(float(score), version, str(resume_id)) for resume_id, score in scores]
+            await self.database.run(_transaction(
+                lambda c: c.executemany("UPDATE resumes SET score = ?, score_version = ? WHERE id = ?", rows)
+            ))
+
+
+class SQLiteSkillDictionaryRepository(SkillDictionaryRepository):
+    def __init__(self, database: _Database):
+        self.database = database
+
+    async def get_many(self, version: str, keys: Sequence[str]) -> Dict[str, List[int]]:
+        def get_many(connection):
+            found = {}
+            for chunk in _chunks(list(keys)):
+                rows = connection.execute(
+                    f"SELECT raw, skill_ids FROM skill_dictionary WHERE version = ? AND raw IN ({_placeholders(len(chunk))})",
+                    (version, *chunk)
+                )
+                found.update((row["raw"], json.loads(row["skill_ids"])) for row in rows)
+            return found
+        return await self.database.run(get_many)
+
+    async def put_many(self, version: str, entries: Dict[str, List[int]]):
+        if entries:
+            rows = [(version, key, json.dumps(skill_ids)) for key, skill_ids in entries.items()]
+            await self.database.run(_transaction(
+                lambda c: c.executemany("INSERT OR IGNORE INTO skill_dictionary (version, raw, skill_ids) VALUES (?, ?, ?)", rows)
+            ))
+
+
+def _task_from_row(row: sqlite3.Row) -> dict:
+    task = {key: row[key] for key in row.keys() if key not in ("id", "args", "result")}
+    task["_id"] = ObjectId(row["id"])
+    task["args"] = json.loads(row["args"])
+    task["result"] = json.loads(row["result"]) if row["result"] is not None else None
+    return task
+
+
+class SQLiteTaskRepository(TaskRepository):
+    def __init__(self, database: _Database):
+        self.database = database
+
+    async def enqueue_many(self, kind: str, tasks: Sequence[Tuple[dict, Optional[bytes]]]) -> List[ObjectId]:
+        now = time.time()
+        task_ids = [ObjectId() for _ in tasks]
+        rows = [(str(task_id), kind, "queued", 0, now, None, now, now, json.dumps(args), data)
+                for task_id, (args, data) in zip(task_ids, tasks)]
+        if rows:
+            await self.database.run(_transaction(lambda c: c.executemany(
+                "INSERT INTO tasks (id, kind, status, attempts, available_at, lease_owner, created_at, updated_at, "
+                "args, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )))
+        return task_ids
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[dict]:
+        @_transaction
+        def claim(connection):
+            now = time.time()
+            ids = [row["id"] for row in connection.execute(SQL["claimable tasks"], (now, limit))]
+            if not ids:
+                return []
+            connection.execute(
+                f"UPDATE tasks SET status = 'running', lease_owner = ?, available_at = ?, updated_at = ?, "
+                f"attempts = attempts + 1 WHERE id IN ({_placeholders(len(ids))})",
+                (worker_id, now + lease_seconds, now, *ids)
+            )
+            return [connection.execute(SQL["task"], (task_id,)).fetchone() for task_id in ids]
+        return [_task_from_row(row) for row in await self.database.run(claim)]
+
+    async def extend_leases(self, task_ids: Sequence[ObjectId], worker_id: str, lease_seconds: float) -> List[ObjectId]:
+        @_transaction
+        def extend_leases(connection):
+            held = []
+            now = time.time()
+            for task_id in task_ids:
+                updated = connection.execute(
+                    "UPDATE tasks SET available_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                    (now + lease_seconds, now, str(task_id), worker_id)
+                )
+                if updated.rowcount:
+                    held.append(task_id)
+            return held
+        return await self.database.run(extend_leases)
+
+    async def finish(self, task_id: ObjectId, worker_id: str, status: str,
+                     result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+        updated = await self.database.run(lambda c: c.execute(
+            "UPDATE tasks SET status = ?, result = ?, error = ?, data = NULL, lease_owner = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), str(task_id), worker_id)
+        ).rowcount)
+        return updated == 1
+
+    async def retry(self, task_id: ObjectId, worker_id: str, error: str, delay_seconds: float) -> bool:
+        now = time.time()
+        updated = await self.database.run(lambda c: c.execute(
+            "UPDATE tasks SET status = 'queued', error = ?, lease_owner = NULL, available_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (error, now + delay_seconds, now, str(task_id), worker_id)
+        ).rowcount)
+        return updated == 1
+
+    async def get(self, task_id: ObjectId) -> Optional[dict]:
+        row = await self.database.run(lambda c: c.execute(SQL["task"], (str(task_id),)).fetchone())
+        if row is None:
+            return None
+        task = _task_from_row(row)
+        task.pop("data")
+        return task
+
+    async def counts(self) -> Dict[str, int]:
+        def counts(connection):
+            return {status: connection.execute(SQL["tasks by status"], (status,)).fetchone()[0]
+                    for status in TASK_STATUSES}
+        return await self.database.run(counts)
+
+
+class SQLiteRepository(Repository):
+    """
+    Embedded backend: jobs, resumes, resume texts, the skill dictionary and
+    the task queue in one SQLite file, with the same indexed leaderboard queries as MongoDB.
+    Meant for single-box deployments and offline benchmark runs; several
+    uvicorn workers can share the file (WAL mode), but not several machines.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.database = _Database(path)
+        self.jobs = SQLiteJobRepository(self.database)
+        self.resumes = SQLiteResumeRepository(self.database)
+        self.skill_dictionary = SQLiteSkillDictionaryRepository(self.database)
+        self.tasks = SQLiteTaskRepository(self.database)
+
+    async def ensure_indexes(self):
+        await self.database.run(lambda c: c.executescript(SCHEMA))
+        logger.info(f"✅ SQLite storage ready at {self.database.path}")
+
+    async def close(self):
+        self.database.close()
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from admission import LatencyWindow
+from repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# ✅ Worker settings (overridable per deployment)
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "60"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "1"))
+
+# Longest wait before a failed task is tried again
+MAX_RETRY_DELAY = 300
+
+# A handler gets a batch of claimed tasks of its kind and returns one outcome
+# per task, in order: a result dict, or the exception the task failed with.
+TaskHandler = Callable[[List[dict]], Awaitable[List[Union[dict, Exception]]]]
+
+
+class TaskError(Exception):
+    """A task that can never succeed (bad input, unknown kind): failed right away, not retried."""
+
+
+class TaskWorker:
+    """
+    Drains a TaskRepository: claims a batch of tasks under a lease, runs the
+    handler for their kind, and records each outcome. While a batch runs, a
+    heartbeat renews the leases every third of the lease time, so a task is
+    only picked up by another worker if this one dies or hangs.
+
+    Any number of workers (in this process, other processes or other nodes)
+    can drain the same queue. Tasks that raise are retried with exponential
+    backoff up to TASK_MAX_ATTEMPTS; TaskError fails them at once.
+    """
+
+    def __init__(self, tasks: TaskRepository, handlers: Dict[str, TaskHandler], batch_size: int = 1,
+                 lease_seconds: float = TASK_LEASE_SECONDS, max_attempts: int = TASK_MAX_ATTEMPTS,
+                 poll_interval: float = TASK_POLL_INTERVAL, worker_id: Optional[str] = None):
+        self.tasks = tasks
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._worker_id = worker_id
+        self._generated_for_pid: Optional[int] = None
+        self._stopping = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self.done = 0
+        self.failed = 0
+        self.retried = 0
+        self.lost_leases = 0
+        self.queue_wait = LatencyWindow()  # enqueue to claim, retry backoff included
+
+    @property
+    def worker_id(self) -> str:
+        # Generated per process, so workers forked from one parent (serve.py) don't share leases
+        if self._worker_id is None or self._generated_for_pid not in (None, os.getpid()):
+            self._generated_for_pid = os.getpid()
+            self._worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        return self._worker_id
+
+    async def run_once(self) -> int:
+        """Claims and processes one batch; returns how many tasks it claimed."""
+        claimed = await self.tasks.claim(self.worker_id, self.batch_size, self.lease_seconds)
+        if not claimed:
+            return 0
+        claimed_at = time.time()
+        for task in claimed:
+            self.queue_wait.add(claimed_at - task["created_at"])
+
+        heartbeat = asyncio.create_task(self._heartbeat([task["_id"] for task in claimed]))
+        try:
+            runnable = []
+            for task in claimed:
+                if task["attempts"] > self.max_attempts:
+                    # Its earlier workers died mid-task (leases expired) too many times
+                    await self._settle(task, TaskError(f"Gave up after {self.max_attempts} attempts"))
+                else:
+                    runnable.append(task)
+
+            by_kind: Dict[str, List[dict]] = {}
+            for task in runnable:
+                by_kind.setdefault(task["kind"], []).append(task)
+            for kind, batch in by_kind.items():
+                handler = self.handlers.get(kind)
+                if handler is None:
+                    outcomes = [TaskError(f"Unknown task kind: {kind}")] * len(batch)
+                else:
+                    try:
+                        outcomes = await handler(batch)
+                    except Exception as e:
+                        logger.error(f"❌ {kind} handler failed on a batch of {len(batch)}: {e}")
+                        outcomes = [e] * len(batch)
+                for task, outcome in zip(batch, outcomes):
+                    await self._settle(task, outcome)
+        finally:
+            heartbeat.cancel()
+        return len(claimed)
+
+    async def _settle(self, task: dict, outcome: Union[dict, Exception]):
+        if not isinstance(outcome, Exception):
+            recorded = await self.tasks.finish(task["_id"], self.worker_id, "done", result=outcome)
+            self.done += recorded
+        elif isinstance(outcome, TaskError) or task["attempts"] >= self.max_attempts:
+            recorded = await self.tasks.finish(task["_id"], self.worker_id, "failed", error=str(outcome))
+            self.failed += recorded
+        else:
+            delay = min(MAX_RETRY_DELAY, 2 ** task["attempts"])
+            recorded = await self.tasks.retry(task["_id"], self.worker_id, str(outcome), delay)
+            self.retried += recorded
+        if not recorded:
+            self.lost_leases += 1
+            logger.warning(f"⚠ Lease on task {task['_id']} was lost; another worker owns it now")
+
+    async def _heartbeat(self, task_ids: Sequence):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                held = await self.tasks.extend_leases(task_ids, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"⚠ Task heartbeat failed: {e}")
+                continue
+            if len(held) < len(task_ids):
+                logger.warning(f"⚠ Lost the lease on {len(task_ids) - len(held)} tasks")
+
+    async def run(self):
+        """Processes tasks until stop() is called, polling while the queue is empty."""
+        logger.info(f"✅ Task worker {self.worker_id} started")
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Task worker {self.worker_id}: {e}")
+                claimed = 0
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        self._stopping.clear()
+        self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops after the current batch; unfinished tasks go back to the queue when their lease expires."""
+        self._stopping.set()
+        if self._runner:
+            await self._runner
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "done": self.done,
+            "failed": self.failed,
+            "retried": self.retried,
+            "lost_leases": self.lost_leases,
+            "queue_wait": self.queue_wait.stats(),
+        }
@@ -0,0 +1,99 @@
+# Admission control: bounded stages, priority lane and load shedding.
+#   python -m pytest tests/test_admission.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from admission import BULK, INTERACTIVE, AdmissionStage, Overloaded, QueueBacklog  # noqa: E402
+
+
+async def hold(stage, priority, order, name, release, shed=True):
+    async with stage.slot(priority, shed=shed):
+        order.append(name)
+        await release.wait()
+
+
+def test_interactive_waiters_go_first_and_full_queue_is_shed():
+    async def scenario():
+        stage = AdmissionStage("cpu", concurrency=1, max_queue=2)
+        order, release = [], asyncio.Event()
+        running = asyncio.create_task(hold(stage, BULK, order, "bulk-1", release))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(hold(stage, BULK, order, "bulk-2", release)),
+                   asyncio.create_task(hold(stage, INTERACTIVE, order, "ranking", release))]
+        await asyncio.sleep(0)
+        assert stage.stats()["queue_depth"] == 2
+
+        with pytest.raises(Overloaded) as rejected:
+            async with stage.slot(INTERACTIVE):
+                pass
+        assert rejected.value.status_code == 503 and int(rejected.value.headers["Retry-After"]) >= 1
+
+        # Internal work that is already bounded waits instead of being shed
+        unshed = asyncio.create_task(hold(stage, BULK, order, "bulk-3", release, shed=False))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(running, unshed, *waiting)
+        return order, stage.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["bulk-1", "ranking", "bulk-2", "bulk-3"]
+    assert stats["rejected"] == 1 and stats["admitted"] == 4 and stats["active"] == 0
+
+
+def test_reserved_slots_are_only_for_interactive_work():
+    async def scenario():
+        stage = AdmissionStage("cpu", concurrency=2, max_queue=10, reserved=1)
+        order, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(stage, BULK, order, f"bulk-{i}", release)) for i in range(2)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(hold(stage, INTERACTIVE, order, "ranking", release)))
+        await asyncio.sleep(0)
+        started = list(order)
+        release.set()
+        await asyncio.gather(*tasks)
+        return started
+
+    assert asyncio.run(scenario()) == ["bulk-0", "ranking"]
+
+
+def test_cancelled_waiter_gives_its_place_up():
+    async def scenario():
+        stage = AdmissionStage("uploads", concurrency=1, max_queue=5, status_code=429)
+        order, release = [], asyncio.Event()
+        running = asyncio.create_task(hold(stage, BULK, order, "first", release))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(hold(stage, BULK, order, "cancelled", release))
+        after = asyncio.create_task(hold(stage, BULK, order, "after", release))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(running, after)
+        return order, stage.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["first", "after"]
+    assert stats["queue_depth"] == 0 and stats["active"] == 0
+
+
+def test_backlog_refuses_work_past_its_limit():
+    async def scenario():
+        depth = {"queued": 8}
+
+        async def count():
+            return depth["queued"]
+
+        backlog = QueueBacklog("ingest backlog", count, limit=10, refresh_seconds=60)
+        await backlog.check(2)
+        with pytest.raises(Overloaded) as rejected:
+            await backlog.check()
+        return rejected.value, backlog.stats()
+
+    rejected, stats = asyncio.run(scenario())
+    assert rejected.status_code == 503 and rejected.headers["Retry-After"] == "30"
+    assert stats == {"depth": 10, "limit": 10, "rejected": 1}
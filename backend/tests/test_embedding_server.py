@@ -0,0 +1,89 @@
+# Embedding server round trips, micro-batching and failure handling, with
+# the deterministic hashing encoder (no model needed).
+#   python -m pytest tests/test_embedding_server.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_server import EmbeddingClient, EmbeddingError, EmbeddingServer, EmbeddingUnavailable  # noqa: E402
+from embeddings import HashingEncoder  # noqa: E402
+
+
+class FailingEncoder(HashingEncoder):
+    def encode(self, texts):
+        if "boom" in texts:
+            raise RuntimeError("encoder crashed")
+        return super().encode(texts)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "embeddings.sock")
+
+
+async def serving(encoder, socket_path, test, **kwargs):
+    server = EmbeddingServer(encoder, socket_path, **kwargs)
+    await server.start()
+    client = EmbeddingClient(socket_path, timeout=5)
+    try:
+        return await test(server, client)
+    finally:
+        await client.close()
+        await server.close()
+
+
+def test_hashing_encoder_is_deterministic_and_normalized():
+    encoder = HashingEncoder(dim=64)
+    first = encoder.encode(["Python and FastAPI developer", "Kubernetes", ""])
+    assert first.shape == (3, 64) and first.dtype == np.float32
+    np.testing.assert_array_equal(first, HashingEncoder(dim=64).encode(["Python and FastAPI developer", "Kubernetes", ""]))
+    np.testing.assert_allclose(np.linalg.norm(first[:2], axis=1), 1.0, rtol=1e-6)
+    similar, unrelated = encoder.encode(["Python FastAPI developer", "Registered nurse, ICU"]) @ first[0]
+    assert similar > unrelated
+
+
+def test_vectors_match_the_encoder_and_concurrent_requests_share_batches(socket_path):
+    encoder = HashingEncoder(dim=32)
+    texts = [[f"text {i}", "shared skill text"] for i in range(20)]
+
+    async def test(server, client):
+        assert await client.info() == {"model_id": encoder.model_id, "dim": 32}
+        results = await asyncio.gather(*(client.embed(batch) for batch in texts))
+        for batch, vectors in zip(texts, results):
+            np.testing.assert_allclose(vectors, encoder.encode(batch), rtol=1e-6)
+        assert (await client.embed([])).shape == (0, 32)
+        return server.batcher.stats()
+
+    stats = asyncio.run(serving(encoder, socket_path, test, max_batch=64, max_wait_ms=20))
+    assert stats["requests"] == 20 and stats["texts"] == 40
+    assert stats["batches"] < 20
+    assert stats["unique_texts"] < 40  # "shared skill text" is encoded once per batch
+
+
+def test_batches_respect_the_size_limit(socket_path):
+    async def test(server, client):
+        await asyncio.gather(*(client.embed([f"a {i}", f"b {i}", f"c {i}"]) for i in range(10)))
+        return server.batcher.stats()
+
+    stats = asyncio.run(serving(HashingEncoder(dim=16), socket_path, test, max_batch=6, max_wait_ms=20))
+    assert stats["texts"] == 30 and stats["batches"] >= 5
+
+
+def test_encoder_errors_reach_the_caller_and_the_server_keeps_serving(socket_path):
+    async def test(server, client):
+        results = await asyncio.gather(client.embed(["boom"]), client.embed(["fine"]), return_exceptions=True)
+        assert all(isinstance(result, EmbeddingError) for result in results)  # Same batch
+        return await client.embed(["fine"])
+
+    vectors = asyncio.run(serving(FailingEncoder(dim=8), socket_path, test, max_wait_ms=20))
+    assert vectors.shape == (1, 8)
+
+
+def test_client_reports_a_missing_server(socket_path):
+    with pytest.raises(EmbeddingUnavailable):
+        asyncio.run(EmbeddingClient(socket_path).embed(["anything"]))
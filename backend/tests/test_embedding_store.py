@@ -0,0 +1,101 @@
+# Persistent int8 embedding store: keys, persistence, sharing between
+# workers, quantized scoring, and the cache in front of the embedding server.
+#   python -m pytest tests/test_embedding_store.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_server import EmbeddingClient, EmbeddingServer  # noqa: E402
+from embedding_store import CachedEmbedder, EmbeddingStore, quantize, text_key  # noqa: E402
+from embeddings import HashingEncoder, normalize_rows  # noqa: E402
+
+DIM = 48
+
+
+def random_vectors(n, seed=0):
+    return normalize_rows(np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32))
+
+
+def test_quantization_keeps_cosines():
+    vectors = random_vectors(200)
+    codes, scales = quantize(vectors)
+    assert codes.dtype == np.int8 and np.abs(codes.astype(np.int16)).max() <= 127
+    restored = codes.astype(np.float32) * scales[:, None]
+    np.testing.assert_allclose((restored * vectors).sum(axis=1), 1.0, atol=5e-3)
+    zero_codes, zero_scales = quantize(np.zeros((1, DIM)))
+    assert not zero_codes.any() and zero_scales[0] == 0
+
+
+def test_keys_ignore_whitespace_differences():
+    assert text_key("Python  developer\n") == text_key(" Python developer")
+    assert text_key("Python developer") != text_key("python developer")
+
+
+def test_rows_persist_and_are_shared_between_workers(tmp_path):
+    texts = [f"resume section {i}" for i in range(10)]
+    vectors = random_vectors(10)
+    first = EmbeddingStore("model-a", DIM, str(tmp_path))
+    second = EmbeddingStore("model-a", DIM, str(tmp_path))  # Another worker on the box
+    assert (first.rows(texts) == -1).all()
+
+    rows = first.put(texts, vectors)
+    np.testing.assert_array_equal(second.rows(texts), rows)
+    np.testing.assert_array_equal(second.put(texts[:3], vectors[:3]), rows[:3])  # Nothing appended twice
+    assert len(second) == 10
+    first.close()
+    second.close()
+
+    reopened = EmbeddingStore("model-a", DIM, str(tmp_path))
+    np.testing.assert_array_equal(reopened.rows(["resume  section 4", "unknown"]), [rows[4], -1])
+    np.testing.assert_allclose(reopened.vectors(rows), vectors, atol=0.01)
+    assert reopened.stats()["hit_rate"] == 0.5
+    reopened.close()
+
+
+def test_store_rejects_another_dimension_for_the_same_model(tmp_path):
+    EmbeddingStore("model-a", DIM, str(tmp_path)).put(["x"], random_vectors(1))
+    with pytest.raises(ValueError):
+        EmbeddingStore("model-a", DIM * 2, str(tmp_path)).rows(["x"])
+
+
+def test_scores_match_the_dequantized_dot_products(tmp_path):
+    store = EmbeddingStore("model-a", DIM, str(tmp_path))
+    vectors = random_vectors(300)
+    rows = store.put([f"text {i}" for i in range(300)], vectors)
+    queries = random_vectors(4, seed=1)
+    selected = rows[::-1][:120]
+
+    scores = store.scores(queries, selected)
+    assert scores.shape == (120, 4)
+    np.testing.assert_allclose(scores, store.vectors(selected) @ queries.T, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(scores, vectors[selected] @ queries.T, atol=0.02)
+    np.testing.assert_allclose(store.scores(queries[0], selected), scores[:, 0], rtol=1e-5, atol=1e-6)
+
+
+def test_cached_embedder_only_sends_misses_to_the_server(tmp_path):
+    socket_path = str(tmp_path / "embeddings.sock")
+    encoder = HashingEncoder(dim=DIM)
+
+    async def run():
+        server = EmbeddingServer(encoder, socket_path, max_wait_ms=0)
+        await server.start()
+        embedder = CachedEmbedder(EmbeddingClient(socket_path), str(tmp_path / "store"))
+        try:
+            first = await embedder.embed(["python developer", "aws", "python developer"])
+            again = await embedder.embed(["aws", "python  developer", "kubernetes"])
+            return first, again, server.batcher.stats(), embedder.stats()
+        finally:
+            await embedder.close()
+            await embedder.client.close()
+            await server.close()
+
+    first, again, server_stats, store_stats = asyncio.run(run())
+    np.testing.assert_allclose(first, encoder.encode(["python developer", "aws", "python developer"]), atol=0.01)
+    np.testing.assert_array_equal(again[:2], first[[1, 0]])
+    assert server_stats["texts"] == 3  # "python developer", "aws", then only "kubernetes"
+    assert store_stats["entries"] == 3 and store_stats["model_id"] == encoder.model_id
@@ -0,0 +1,64 @@
+# Extraction cache: the bounded disk tier shared by the workers on a box,
+# evicted least recently used first by entries and by bytes.
+#   python -m pytest tests/test_extraction_cache.py
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from extraction_cache import ExtractionCache  # noqa: E402
+
+
+def entry(n):
+    return {"text": f"resume {n}", "skills": ["Python"] * 10}
+
+
+def fill(cache, keys):
+    """Puts an entry per key, each one last used a second after the previous one."""
+    for n, key in enumerate(keys):
+        cache.put(key, entry(key))
+        used = time.time() - len(keys) + n
+        os.utime(cache._path(key), (used, used))
+
+
+def on_disk(cache):
+    return {os.path.basename(path)[:-len(".json")] for _, _, path in cache._disk_tier()}
+
+
+def test_disk_tier_keeps_the_most_recently_used_entries(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_entries=2, max_disk_entries=10)
+    keys = [cache.key(str(n).encode()) for n in range(10)]
+    fill(cache, keys)
+    assert on_disk(cache) == set(keys)
+
+    # Another worker reads the oldest entry from disk: it becomes the most recently used
+    assert ExtractionCache(str(tmp_path), max_entries=2).get(keys[0]) == entry(keys[0])
+
+    extra = cache.key(b"one more")
+    cache.put(extra, entry(extra))
+    assert on_disk(cache) == {keys[0], extra, *keys[3:]}  # Trimmed to 9: the 2 least recently used went
+    assert cache.stats()["disk_entries"] == 9 and cache.stats()["disk_evictions"] == 2
+    assert cache.get(keys[1]) is None and cache.get(keys[2]) is None
+    assert cache.get(keys[0]) == entry(keys[0])
+
+
+def test_disk_tier_is_capped_by_size(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    keys = [cache.key(str(n).encode()) for n in range(40)]
+    cache.max_disk_bytes = 20 * len(json.dumps(entry(keys[0])))
+    fill(cache, keys)
+
+    assert sum(size for _, size, _ in cache._disk_tier()) <= cache.max_disk_bytes
+    kept = on_disk(cache)
+    assert kept and kept == set(keys[-len(kept):])  # Newest kept, oldest evicted
+
+
+def test_entries_already_on_disk_count_towards_the_cap(tmp_path):
+    keys = [f"{n:064x}-v1" for n in range(8)]
+    fill(ExtractionCache(str(tmp_path), version="1"), keys)
+
+    restarted = ExtractionCache(str(tmp_path), version="1", max_disk_entries=8)
+    restarted.put(restarted.key(b"new"), entry("new"))
+    assert on_disk(restarted) == {restarted.key(b"new"), *keys[2:]}  # 9 on disk, trimmed to 7
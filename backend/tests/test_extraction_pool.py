@@ -0,0 +1,57 @@
+# The extraction pool when a worker dies: files caught in the broken pool are
+# resubmitted to a fresh one, and only the broken pool is ever recycled.
+#   python -m pytest tests/test_extraction_pool.py
+import asyncio
+import os
+import sys
+import time
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from extraction import ExtractionPool  # noqa: E402
+
+
+def docx_bytes(text):
+    document = Document()
+    document.add_paragraph(text)
+    stream = BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(size=1, timeout=30)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_file_queued_behind_a_dying_worker_is_resubmitted(pool):
+    async def run():
+        broken = pool._executor
+        busy = broken.submit(time.sleep, 1)  # Holds the only worker
+        extraction = asyncio.create_task(pool.extract(docx_bytes("Skills: Python, SQL"), "resume.docx"))
+        await asyncio.sleep(0.2)  # The resume is queued behind it
+        for process in broken._processes.values():
+            process.kill()
+        text = await extraction
+        return broken, busy, text
+
+    broken, busy, text = asyncio.run(run())
+    assert "Skills: Python, SQL" in text
+    assert pool._executor is not broken
+    assert busy.exception() is not None
+
+
+def test_only_the_broken_pool_is_recycled(pool):
+    broken = pool._executor
+    pool._recycle(broken)
+    fresh = pool._executor
+    pool._recycle(broken)  # A second file that saw the same breakage
+    assert fresh is not broken and pool._executor is fresh
+    assert "Education" in asyncio.run(pool.extract(docx_bytes("Education: BSc"), "resume.docx"))
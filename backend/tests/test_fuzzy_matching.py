@@ -0,0 +1,60 @@
+# Batched rapidfuzz matching (one cdist call per batch) against the
+# fuzzywuzzy token_sort_ratio > 80 check it replaced, including scores that
+# land right at the threshold. Skipped when fuzzywuzzy isn't installed.
+#   python -m pytest tests/test_fuzzy_matching.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fuzzy_matching import FUZZY_THRESHOLD, FuzzySkillIndex  # noqa: E402
+from warm_start import load_taxonomy  # noqa: E402
+
+fuzz = pytest.importorskip("fuzzywuzzy.fuzz")
+
+# The taxonomy's vocabulary, plus a name long enough for an unrounded score between 80 and 80.5
+VOCABULARY = load_taxonomy(os.path.join(os.path.dirname(__file__), "..", "RoleSkills.csv")).names + \
+    ["Natural Language Processing Systems"]
+
+# (raw skill, vocabulary name, fuzzywuzzy score): either side of the threshold
+THRESHOLD_CASES = [
+    ("Java 3", "Java", 80),  # Exactly 80: not a match
+    ("Swifx", "Swift", 80),
+    ("Natural Language Processing Systems internationalize", "Natural Language Processing Systems", 80),  # 80.46
+    ("Advanced Extreme Programming", "Extreme Programming", 81),  # 80.85, rounded up
+    ("Microsoft Azure basics", "Microsoft Azure", 81),
+]
+
+RAW_SKILLS = [case[0] for case in THRESHOLD_CASES] + [
+    "Python", "python3", "Javascript", "Java Script", "ReactJS", "React.js", "nodejs", "Node JS", "Postgres",
+    "PostgreSQL DB", "Mongo DB", "Kubernetes (K8s)", "Amazon Web Services", "Tensorflow 2", "scikit learn",
+    "Pytorch", "Dockers", "CI/CD", "Machine-Learning", "Git Hub", "Springboot", "Typescript", "Power BI",
+    "Programming Object Oriented", "C", "C++", "c#", "R", "Go lang", "Café Management", "", "  ", "!!!",
+]
+
+
+def fuzzywuzzy_matches(raw_skill):
+    return {i for i, name in enumerate(VOCABULARY) if fuzz.token_sort_ratio(raw_skill, name) > FUZZY_THRESHOLD}
+
+
+def test_threshold_cases_score_where_expected():
+    for raw_skill, name, score in THRESHOLD_CASES:
+        assert fuzz.token_sort_ratio(raw_skill, name) == score, raw_skill
+
+
+def test_batched_matching_agrees_with_fuzzywuzzy():
+    index = FuzzySkillIndex(VOCABULARY)
+    expected = [fuzzywuzzy_matches(raw_skill) for raw_skill in RAW_SKILLS]
+    assert index.match(RAW_SKILLS) == expected
+
+    matched = dict(zip(RAW_SKILLS, expected))
+    for raw_skill, name, score in THRESHOLD_CASES:
+        assert (VOCABULARY.index(name) in matched[raw_skill]) == (score > FUZZY_THRESHOLD), raw_skill
+
+
+def test_batches_match_the_union_of_their_strings():
+    index = FuzzySkillIndex(VOCABULARY)
+    batches = [RAW_SKILLS[:10], RAW_SKILLS[5:20], [], RAW_SKILLS[-5:]]
+    assert index.match_batches(batches) == [set().union(*map(fuzzywuzzy_matches, batch)) for batch in batches]
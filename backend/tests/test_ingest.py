@@ -0,0 +1,144 @@
+# Resume ingestion in the app: the task handler (app.ingest_resumes) on the
+# MongoDB resume repository, over in-memory stand-ins for its collections,
+# and resume features parsed while the embedding server is down.
+#   python -m pytest tests/test_ingest.py
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# The app is imported with the embedded backend; the tests swap in the MongoDB repository
+os.environ["STORAGE_BACKEND"] = "sqlite"
+SCRATCH = tempfile.mkdtemp()
+os.environ["SQLITE_PATH"] = os.path.join(SCRATCH, "ingest.db")
+os.environ["EXTRACTION_CACHE_DIR"] = os.path.join(SCRATCH, "extraction_cache")
+
+import app  # noqa: E402
+from embeddings import EmbeddingError, HashingEncoder, LocalEmbedder  # noqa: E402
+from extraction_cache import ExtractionCache  # noqa: E402
+from leaderboard import score_version  # noqa: E402
+from repository import MongoResumeRepository  # noqa: E402
+from semantic_matching import SemanticSkillIndex  # noqa: E402
+from skill_dictionary import SkillDictionary  # noqa: E402
+from sqlite_repository import SQLiteRepository  # noqa: E402
+from task_queue import TaskError  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = {}
+
+    async def insert_many(self, documents, ordered=True):
+        if not documents:
+            raise TypeError("documents must be a non-empty list")  # As pymongo does
+        self.documents.update((document["_id"], document) for document in documents)
+
+
+def test_mongo_insert_many_with_nothing_to_insert():
+    resumes = MongoResumeRepository(FakeCollection(), FakeCollection())
+    assert asyncio.run(resumes.insert_many([], [])) == {}
+
+
+def test_batch_where_every_resume_fails_to_parse(monkeypatch):
+    resumes = MongoResumeRepository(FakeCollection(), FakeCollection())
+    monkeypatch.setattr(app.repository, "resumes", resumes)
+    job_id = ObjectId()
+    tasks = [
+        {"args": app.ingest_task_args(job_id, "notes.txt"), "data": b"not a resume"},
+        {"args": app.ingest_task_args(job_id, "empty.pdf"), "data": b""},
+    ]
+
+    outcomes = asyncio.run(app.ingest_resumes(tasks))
+
+    # Failed for good with the parse error, not retried over a storage error
+    assert all(isinstance(outcome, TaskError) for outcome in outcomes)
+    assert [str(outcome) for outcome in outcomes] == ["Unsupported file format", "Empty or unsupported file format"]
+    assert resumes.collection.documents == {} and resumes.texts.documents == {}
+
+
+class FlakyEmbedder(LocalEmbedder):
+    up = False
+
+    async def embed(self, texts):
+        if not self.up:
+            raise EmbeddingError("embedding server not running")
+        return await super().embed(texts)
+
+
+@pytest.fixture
+def semantic(tmp_path, monkeypatch):
+    # Storage and cache of the test's own (settings read at import may predate this module's)
+    repository = SQLiteRepository(str(tmp_path / "semantic.db"))
+    asyncio.run(repository.ensure_indexes())
+    embedder = FlakyEmbedder(HashingEncoder())
+    index = SemanticSkillIndex(app.skill_taxonomy.names, embedder)
+    dictionary = SkillDictionary(repository.skill_dictionary, app.skill_taxonomy, app.fuzzy_skill_index, index)
+    monkeypatch.setattr(app, "repository", repository)
+    monkeypatch.setattr(app, "extraction_cache", ExtractionCache(str(tmp_path / "cache"), version=app.FEATURES_FALLBACK_VERSION))
+    monkeypatch.setattr(app, "semantic_skill_index", index)
+    monkeypatch.setattr(app, "skill_dictionary", dictionary)
+    yield embedder, index
+    asyncio.run(repository.close())
+
+
+def test_features_matched_while_the_embedder_is_down_are_recomputed_later(semantic, monkeypatch):
+    embedder, index = semantic
+
+    async def extract(file_bytes, filename):
+        return "Skills\nPython, SQL\nExperience\nJan 2020 - Jan 2022 Developer"
+
+    monkeypatch.setattr(app.extraction_pool, "extract", extract)
+    job = {"_id": ObjectId(), "skill_ids": [app.skill_taxonomy.resolve("Python")], "experience_years": 0,
+           "features_version": app.FEATURES_FALLBACK_VERSION}
+
+    async def run():
+        parsed = await app.parse_resume(b"%PDF-1.4 resume", "resume.pdf")
+        document = app.build_resume_document(job["_id"], "resume.pdf", parsed)
+        await app.repository.resumes.insert(document, app.build_resume_text(document, parsed))
+        embedder.up, index._retry_at = True, 0.0  # The embedding server is back
+        current = await app.current_features_version()
+        reparsed = await app.repository.resumes.find_parsed(parsed["content_hash"], current)
+        refreshed = await app.refresh_resume_features([document], job)
+        return parsed, current, reparsed, refreshed
+
+    parsed, current, reparsed, refreshed = asyncio.run(run())
+    assert parsed["features_version"] == app.FEATURES_FALLBACK_VERSION
+    # Neither cached nor reused for another upload of the same file...
+    assert app.extraction_cache.get(app.extraction_cache.key_for_digest(parsed["content_hash"])) is None
+    assert reparsed is None
+    # ...and recomputed, with the stored score, once semantic matching is back
+    assert [resume["features_version"] for resume in refreshed] == [current] and "hashing-v1" in current
+    assert refreshed[0]["score_version"] == score_version(job) and refreshed[0]["score"] > 0
+
+
+def test_features_matched_with_another_embedding_model_are_recomputed(semantic, monkeypatch):
+    embedder, index = semantic
+    embedder.up = True
+
+    async def extract(file_bytes, filename):
+        return "Skills\nPython, SQL\nExperience\nJan 2020 - Jan 2022 Developer"
+
+    monkeypatch.setattr(app.extraction_pool, "extract", extract)
+
+    async def run():
+        parsed = await app.parse_resume(b"%PDF-1.4 resume", "resume.pdf")
+        document = app.build_resume_document(ObjectId(), "resume.pdf", parsed)
+        await app.repository.resumes.insert(document, app.build_resume_text(document, parsed))
+        embedder.encoder = HashingEncoder(dim=128)  # The embedder now serves another model
+        current = await app.current_features_version()
+        reparsed = await app.parse_resume(b"%PDF-1.4 resume", "resume.pdf")
+        stored = await app.repository.resumes.find_parsed(parsed["content_hash"], current)
+        refreshed = await app.refresh_resume_features([document])
+        return parsed, current, reparsed, stored, refreshed
+
+    parsed, current, reparsed, stored, refreshed = asyncio.run(run())
+    assert "hashing-v1-128" in current and parsed["features_version"] != current
+    # Neither the cached nor the stored features of the old model are reused...
+    assert reparsed["features_version"] == current and stored is None
+    # ...and the stored resume is recomputed under the new one
+    assert [resume["features_version"] for resume in refreshed] == [current]
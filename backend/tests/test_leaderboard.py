@@ -0,0 +1,219 @@
+# The materialized per-job leaderboard on the SQLite backend: ordering, tie
+# breaks, cursors, the ranking endpoint's 409 on a stale cursor, and
+# rescoring when the job changes under it (including mid-ingest).
+#   python -m pytest tests/test_leaderboard.py
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "leaderboard.db")
+
+import app  # noqa: E402
+from extraction_cache import ExtractionCache  # noqa: E402
+from leaderboard import Leaderboard, decode_cursor, encode_cursor, score_version  # noqa: E402
+from skill_dictionary import SkillDictionary  # noqa: E402
+from sqlite_repository import SQLiteRepository  # noqa: E402
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "leaderboard.db"))
+    run(repository.ensure_indexes())
+    yield repository
+    run(repository.close())
+
+
+async def add_resumes(repository, job_id, scores, version="v1", text=""):
+    """Stores one scored resume per score, in upload order; returns their ids."""
+    resume_ids = []
+    for score in scores:
+        document = {"_id": ObjectId(), "job_id": str(job_id), "filename": f"{len(resume_ids)}.pdf", "skill_bits": b"",
+                    "work_experience": 0, "features_version": "1", "score": score, "score_version": version}
+        await repository.resumes.insert(document, {"_id": document["_id"], "job_id": str(job_id), "text": text})
+        resume_ids.append(document["_id"])
+    return resume_ids
+
+
+def test_top_is_best_score_first_and_ties_go_to_the_earlier_upload(repository):
+    job_id = ObjectId()
+    ids = run(add_resumes(repository, job_id, [50.0, 90.0, 70.0, 90.0, 70.0, 10.0]))
+    run(add_resumes(repository, ObjectId(), [100.0]))  # Another job's
+    leaderboard = Leaderboard(repository.resumes, repository.jobs)
+
+    ranked = [resume["_id"] for resume in run(leaderboard.top(job_id))]
+    assert ranked == [ids[1], ids[3], ids[2], ids[4], ids[0], ids[5]]
+    assert [resume["_id"] for resume in run(leaderboard.top(job_id, limit=3))] == ranked[:3]
+    assert [resume["_id"] for resume in run(leaderboard.top(job_id, min_score=70))] == ranked[:4]
+
+
+def test_pages_through_ties_without_skipping_or_repeating(repository):
+    job_id = ObjectId()
+    run(add_resumes(repository, job_id, [80.0] * 5 + [60.0] * 4 + [95.0]))
+    leaderboard = Leaderboard(repository.resumes, repository.jobs)
+    expected = [resume["_id"] for resume in run(leaderboard.top(job_id))]
+
+    served, after, has_more = [], None, True
+    while has_more:
+        resumes, has_more = run(leaderboard.page(job_id, 3, after))
+        served.extend(resume["_id"] for resume in resumes)
+        after = decode_cursor(encode_cursor(resumes[-1]["score"], resumes[-1]["_id"], "v1"))[:2]
+    assert served == expected
+
+
+def test_limit_means_the_same_on_both_ranking_paths(repository):
+    job_id = ObjectId()
+    ids = run(add_resumes(repository, job_id, [50.0, 90.0, 70.0]))
+    leaderboard = Leaderboard(repository.resumes, repository.jobs)
+
+    async def stored_scores(batch):
+        return np.array([{ids[0]: 50.0, ids[1]: 90.0, ids[2]: 70.0}[resume["_id"]] for resume in batch])
+
+    async def both(limit):
+        stored = [resume["_id"] for resume in await leaderboard.top(job_id, limit)]
+        streamed = [resume_id for _, resume_id in await leaderboard.stream_top(job_id, stored_scores, limit)]
+        return stored, streamed
+
+    assert run(both(None)) == ([ids[1], ids[2], ids[0]],) * 2
+    assert run(both(2)) == ([ids[1], ids[2]],) * 2
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            run(leaderboard.top(job_id, limit))
+        with pytest.raises(ValueError):
+            run(leaderboard.stream_top(job_id, stored_scores, limit))
+
+
+def test_cursor_round_trip():
+    resume_id = ObjectId()
+    assert decode_cursor(encode_cursor(87.5, resume_id, "abc123")) == (87.5, resume_id, "abc123")
+    assert decode_cursor(encode_cursor(0, resume_id, None)) == (0.0, resume_id, None)
+    assert "=" not in encode_cursor(1.0, resume_id, "v")  # Safe in a query string as is
+    for cursor in ["", "not-a-cursor", encode_cursor(1.0, resume_id, "v")[:-4]]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_rescore_follows_a_job_edited_while_it_runs(repository):
+    job = {"skill_ids": [1], "experience_years": 0, "features_version": "1"}
+    job_id = run(repository.jobs.insert(job))
+    ids = run(add_resumes(repository, job_id, [10.0, 20.0, 30.0]))
+    leaderboard = Leaderboard(repository.resumes, repository.jobs)
+    edited = {"skill_ids": [1, 2], "experience_years": 3}
+
+    async def score(scored_job, batch):
+        if scored_job["skill_ids"] == [1]:
+            await repository.jobs.set_fields(job_id, edited)  # Edited after the first batch
+        return np.full(len(batch), len(scored_job["skill_ids"]) * 10.0)
+
+    async def rescore():
+        rescored = await leaderboard.rescore(dict(job), score, batch_size=2)
+        return rescored, await repository.jobs.get(job_id), await repository.resumes.fetch(ids)
+
+    rescored, stored_job, resumes = run(rescore())
+    version = score_version({**job, **edited})
+    assert stored_job["leaderboard_version"] == version and leaderboard.is_current(stored_job)
+    assert {(resume["score"], resume["score_version"]) for resume in resumes} == {(20.0, version)}
+    assert rescored == 6  # The pass under the old version, then all 3 again under the new one
+
+
+# ✅ The app, on a repository and cache of its own (settings read at import may predate this module's)
+@pytest.fixture
+def client(tmp_path, repository, monkeypatch):
+    monkeypatch.setattr(app, "repository", repository)
+    monkeypatch.setattr(app, "leaderboard", Leaderboard(repository.resumes, repository.jobs))
+    monkeypatch.setattr(app, "extraction_cache", ExtractionCache(str(tmp_path / "cache"), version=app.FEATURES_FALLBACK_VERSION))
+    monkeypatch.setattr(app, "skill_dictionary", SkillDictionary(
+        repository.skill_dictionary, app.skill_taxonomy, app.fuzzy_skill_index, app.semantic_skill_index))
+    return TestClient(app.app)
+
+
+def add_job(description):
+    job = {"job_title": "Engineer", "job_description": description, **run(app.compute_job_features(description))}
+    job["leaderboard_version"] = score_version(job)
+    return run(app.repository.jobs.insert(job)), job
+
+
+def test_stale_cursor_is_rejected_with_409(client):
+    job_id, job = add_job("Python and SQL, 2 years of experience")
+    run(add_resumes(app.repository, job_id, [90.0, 80.0, 70.0], score_version(job)))
+
+    first = client.get(f"/ranked_candidates/{job_id}", params={"page_size": 2})
+    assert first.status_code == 200
+    cursor = first.json()["next_cursor"]
+    assert decode_cursor(cursor)[2] == job["leaderboard_version"]
+
+    run(app.repository.jobs.set_fields(job_id, {"leaderboard_version": "changed"}))  # Rescored since
+    stale = client.get(f"/ranked_candidates/{job_id}", params={"page_size": 2, "cursor": cursor})
+    assert stale.status_code == 409
+    assert client.get(f"/ranked_candidates/{job_id}", params={"cursor": "garbage"}).status_code == 400
+
+
+@pytest.mark.parametrize("leaderboard_version", ["current", "stale"])
+def test_ranking_rejects_a_limit_out_of_range(client, leaderboard_version):
+    job_id, job = add_job("Python and SQL, 2 years of experience")
+    run(add_resumes(app.repository, job_id, [90.0, 80.0], score_version(job)))
+    if leaderboard_version == "stale":
+        run(app.repository.jobs.set_fields(job_id, {"leaderboard_version": "old"}))
+
+    for limit in (0, -1, app.MAX_PAGE_SIZE + 1):
+        response = client.get(f"/get_ranked_candidates_with_feedback/{job_id}", params={"limit": limit})
+        assert response.status_code == 400, limit
+
+
+RESUME_TEXT = "Skills\nPython, SQL, Docker\nExperience\nJan 2019 - Jan 2022 Backend developer"
+
+
+def test_cursor_follows_the_index_scores_of_a_page_rescored_while_served(client):
+    job_id, job = add_job("Python and SQL, 2 years of experience")
+    # Stale features: serving a page recomputes them, and their scores with them
+    ids = run(add_resumes(app.repository, job_id, [99.0, 98.0, 97.0], score_version(job), RESUME_TEXT))
+
+    first = client.get(f"/ranked_candidates/{job_id}", params={"page_size": 2}).json()
+    assert decode_cursor(first["next_cursor"])[:2] == (98.0, ids[1])
+    rescored = run(app.repository.resumes.fetch(ids[:2]))
+    assert all(resume["score"] != 98.0 for resume in rescored)
+
+    second = client.get(f"/ranked_candidates/{job_id}", params={"page_size": 2, "cursor": first["next_cursor"]})
+    assert second.status_code == 200
+    assert [candidate["resume"] for candidate in second.json()["ranked_candidates"]] == ["2.pdf"]
+
+
+def test_resumes_stored_after_a_rescore_of_an_edited_job_get_rescored(client, monkeypatch):
+    job_id, job = add_job("Python and SQL, 2 years of experience")
+    edited = run(app.compute_job_features("Docker and Kubernetes, 5 years of experience"))
+
+    async def extract(file_bytes, filename):
+        return RESUME_TEXT
+
+    async def edited_and_rescored_first(documents, text_documents):
+        # The job is edited and fully rescored while this batch was being scored against it
+        updated = await app.repository.jobs.update(job_id, edited)
+        await app.leaderboard.rescore(updated, app.score_resumes)
+        return await insert_many(documents, text_documents)
+
+    insert_many = app.repository.resumes.insert_many
+    monkeypatch.setattr(app.extraction_pool, "extract", extract)
+    monkeypatch.setattr(app.repository.resumes, "insert_many", edited_and_rescored_first)
+
+    async def ingest():
+        task = {"args": app.ingest_task_args(job_id, "resume.pdf"), "data": b"%PDF-1.4 resume"}
+        [outcome] = await app.ingest_resumes([task])
+        await asyncio.gather(*app.leaderboard._rescoring.values())
+        return outcome, await app.repository.resumes.fetch([ObjectId(outcome["resume_id"])])
+
+    outcome, [resume] = run(ingest())
+    current = {**job, **edited}
+    assert resume["score_version"] == score_version(current)
+    assert resume["score"] == pytest.approx(run(app.score_resumes(current, [resume]))[0])
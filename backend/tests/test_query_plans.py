@@ -0,0 +1,95 @@
+# Explain-plan check for the app's hot queries: every one of them must be
+# answered from an index (see mongo_indexes.py), never by a collection scan.
+#
+# Needs a MongoDB to talk to; uses a throwaway database and drops it after.
+#   MONGODB_TEST_URI=mongodb://localhost:27017 python -m pytest tests/test_query_plans.py
+import asyncio
+import os
+import sys
+
+import pytest
+from bson import ObjectId
+from pymongo import AsyncMongoClient, MongoClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mongo_indexes import CANDIDATE_PROJECTION, JOB_PROJECTION, SCORING_PROJECTION, ensure_indexes  # noqa: E402
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI")
+
+pytestmark = pytest.mark.skipif(not MONGODB_TEST_URI, reason="MONGODB_TEST_URI is not set")
+
+JOB_ID = ObjectId()
+LEADERBOARD_ORDER = [("score", -1), ("_id", 1)]
+
+
+@pytest.fixture(scope="module")
+def db():
+    client = MongoClient(MONGODB_TEST_URI, serverSelectionTimeoutMS=2000)
+    database = client[f"resume_screening_plans_{ObjectId()}"]
+
+    async def create_indexes():
+        async_client = AsyncMongoClient(MONGODB_TEST_URI, serverSelectionTimeoutMS=2000)
+        await ensure_indexes(async_client[database.name])
+        await async_client.close()
+
+    asyncio.run(create_indexes())
+
+    # A few hundred documents so the planner has a real choice to make
+    database["jobs"].insert_one({"_id": JOB_ID, "job_description": "Python developer"})
+    database["resumes"].insert_many([
+        {"job_id": str(JOB_ID) if i % 2 else str(ObjectId()), "score": float(i % 100), "score_version": "v1",
+         "content_hash": f"{i:064x}", "features_version": "1", "skill_bits": b"\0" * 8}
+        for i in range(500)
+    ])
+    yield database
+    client.drop_database(database.name)
+    client.close()
+
+
+def collection_scans(plan):
+    """Every COLLSCAN stage anywhere in an explain() plan tree."""
+    if isinstance(plan, dict):
+        found = [plan] if plan.get("stage") == "COLLSCAN" else []
+        for value in plan.values():
+            found.extend(collection_scans(value))
+        return found
+    if isinstance(plan, list):
+        return [scan for item in plan for scan in collection_scans(item)]
+    return []
+
+
+def hot_queries(db):
+    resumes, texts = db["resumes"], db["resume_texts"]
+    job_id = str(JOB_ID)
+    some_ids = [ObjectId(), ObjectId()]
+    return {
+        "load job": db["jobs"].find({"_id": JOB_ID}, JOB_PROJECTION).limit(1),
+        "leaderboard top": resumes.find({"job_id": job_id}, CANDIDATE_PROJECTION).sort(LEADERBOARD_ORDER).limit(20),
+        "leaderboard top, min_score": resumes.find(
+            {"job_id": job_id, "score": {"$gte": 50}}, CANDIDATE_PROJECTION).sort(LEADERBOARD_ORDER).limit(20),
+        "leaderboard page": resumes.find(
+            {"job_id": job_id, "score": {"$type": "number"},
+             "$or": [{"score": {"$lt": 50.0}}, {"score": 50.0, "_id": {"$gt": some_ids[0]}}]},
+            CANDIDATE_PROJECTION).sort(LEADERBOARD_ORDER).limit(21),
+        "rescore batch": resumes.find({"job_id": job_id, "score_version": {"$ne": "v2"}}, SCORING_PROJECTION).limit(1000),
+        "stream ranking": resumes.find({"job_id": job_id}, SCORING_PROJECTION),
+        "fetch winners": resumes.find({"_id": {"$in": some_ids}}, CANDIDATE_PROJECTION),
+        "same file uploaded": resumes.find({"content_hash": f"{7:064x}", "features_version": "1"}).limit(1),
+        "resume texts": texts.find({"_id": {"$in": some_ids}}),
+        "resume text batch": texts.find({"_id": {"$gt": some_ids[0]}}).sort("_id", 1).limit(500),
+        "skill dictionary": db["skill_dictionary"].find({"_id": {"$in": ["v:python"]}}, {"raw": 1, "skill_ids": 1}),
+        "claim task": db["tasks"].find(
+            {"status": {"$in": ["queued", "running"]}, "available_at": {"$lte": 1e10}}).sort([("available_at", 1)]).limit(1),
+        "tasks by status": db["tasks"].find({"status": "queued"}, {"_id": 1}),
+    }
+
+
+@pytest.mark.parametrize("name", [
+    "load job", "leaderboard top", "leaderboard top, min_score", "leaderboard page", "rescore batch",
+    "stream ranking", "fetch winners", "same file uploaded", "resume texts", "resume text batch", "skill dictionary",
+    "claim task", "tasks by status",
+])
+def test_hot_query_uses_an_index(db, name):
+    plan = hot_queries(db)[name].explain()["queryPlanner"]
+    assert not collection_scans(plan), f"{name} does a collection scan: {plan['winningPlan']}"
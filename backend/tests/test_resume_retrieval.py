@@ -0,0 +1,134 @@
+# Section-chunked resume embeddings and the IVF vector index behind JD →
+# resume retrieval: chunking, training, persistence, replacement, and a
+# backfill from storage with a deterministic stand-in encoder.
+#   python -m pytest tests/test_resume_retrieval.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embeddings import HashingEncoder, LocalEmbedder, normalize_rows  # noqa: E402
+from resume_retrieval import ResumeIndex, chunk_text, resume_document  # noqa: E402
+from sqlite_repository import SQLiteRepository  # noqa: E402
+from vector_index import IVFIndex  # noqa: E402
+
+DIM = 32
+
+
+CENTERS = normalize_rows(np.random.default_rng(0).standard_normal((16, DIM)).astype(np.float32))
+
+
+def clustered_vectors(n, seed=0):
+    """Unit vectors around 16 fixed topics, like embeddings of resumes from a handful of fields."""
+    rng = np.random.default_rng(seed)
+    noise = 0.15 * rng.standard_normal((n, DIM)).astype(np.float32)
+    return normalize_rows(CENTERS[rng.integers(len(CENTERS), size=n)] + noise)
+
+
+def ids(n):
+    return [ObjectId().binary for _ in range(n)]
+
+
+def test_chunks_stay_under_the_word_limit_and_sections_keep_their_weights():
+    text = "Skills\nPython, SQL\nExperience\n" + "\n".join(["built data pipelines in Python"] * 10) + \
+           "\nEducation\nBSc Computer Science"
+    document = resume_document(text)
+    weights = [weight for weight, _ in document]
+    assert weights == [1.0, 1.0, 0.5]  # Skills, experience, education
+    assert all(len(chunk.split()) <= 150 for _, chunks in document for chunk in chunks)
+
+    chunks = chunk_text("\n".join(["five words in this line"] * 5) + "\n" + " ".join(["word"] * 23), max_words=10)
+    assert [len(chunk.split()) for chunk in chunks] == [10, 10, 5, 10, 10, 3]
+    assert chunks[0] == "five words in this line five words in this line"  # Lines kept whole
+    assert resume_document("Just a paragraph about me") == [(1.0, ["Just a paragraph about me"])]
+
+
+def test_flat_search_is_exact_until_the_lists_are_trained(tmp_path):
+    index = IVFIndex("test-model", DIM, str(tmp_path), lists=8, probes=2)
+    vectors = clustered_vectors(100)
+    keys = ids(100)
+    index.add(keys, vectors)
+    assert index.stats()["lists"] is None  # 100 < 8 lists x TRAIN_PER_LIST
+
+    found, scores = index.search(vectors[7], 5)
+    exact = np.argsort(-(vectors @ vectors[7]))[:5]
+    assert found == [keys[i] for i in exact]
+    assert scores[0] == pytest.approx(1.0, abs=0.02)  # int8 storage
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_trained_index_recall_and_persistence(tmp_path):
+    index = IVFIndex("test-model", DIM, str(tmp_path), lists=8, probes=3)
+    vectors = clustered_vectors(2000)
+    keys = ids(2000)
+    for start in range(0, 2000, 250):  # Added incrementally; trains once it holds 256
+        index.add(keys[start:start + 250], vectors[start:start + 250])
+    assert index.stats()["lists"] == 8 and len(index) == 2000
+
+    queries = clustered_vectors(50, seed=1)
+    recall = []
+    for query in queries:
+        exact = {keys[i] for i in np.argsort(-(vectors @ query))[:10]}
+        found, _ = index.search(query, 10)
+        recall.append(len(exact & set(found)) / 10)
+    assert np.mean(recall) >= 0.9
+
+    # Another worker (or a restart) opens the same files: same lists, same answers, nothing re-clustered
+    reopened = IVFIndex("test-model", DIM, str(tmp_path), lists=8, probes=3)
+    assert reopened.search(queries[0], 10)[0] == index.search(queries[0], 10)[0]
+    reopened.add(keys[:1], -vectors[:1])  # Replaces the first vector
+    assert keys[0] not in index.search(vectors[0], 10)[0]  # Seen by the first instance too
+    assert len(index) == 2000 and index.stats()["records"] == 2001
+    index.close()
+    reopened.close()
+
+
+def test_other_models_never_share_an_index(tmp_path):
+    key = ids(1)
+    IVFIndex("model-a", DIM, str(tmp_path)).add(key, clustered_vectors(1))
+    assert IVFIndex("model-a", DIM, str(tmp_path)).contains(key).all()
+    assert not IVFIndex("model-b", DIM, str(tmp_path)).contains(key).any()
+
+
+RESUMES = {
+    "data": "Skills\nPython, Spark, Airflow, SQL\nExperience\nData engineer building batch pipelines",
+    "frontend": "Skills\nReact, TypeScript, CSS\nExperience\nFrontend developer building web dashboards",
+    "nurse": "Summary\nRegistered nurse\nExperience\nIntensive care unit patient care and triage",
+}
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "retrieval.db"))
+    asyncio.run(repository.ensure_indexes())
+    yield repository
+    asyncio.run(repository.close())
+
+
+def test_backfill_then_retrieve_across_jobs(tmp_path, repository):
+    embedder = LocalEmbedder(HashingEncoder(dim=256))
+    resume_index = ResumeIndex(embedder, str(tmp_path / "index"))
+    resume_ids = {}
+
+    async def run():
+        for name, text in RESUMES.items():
+            document = {"_id": ObjectId(), "job_id": str(ObjectId()), "filename": f"{name}.pdf", "skills": [],
+                        "features_version": "1"}
+            resume_ids[name] = document["_id"]
+            await repository.resumes.insert(document, {"_id": document["_id"], "job_id": document["job_id"], "text": text})
+        added = await resume_index.backfill(repository.resumes, batch_size=2)
+        again = await resume_index.backfill(repository.resumes, batch_size=2)
+        data = await resume_index.search("Data engineer: Python, Spark and Airflow pipelines", 2)
+        frontend = await resume_index.search("Frontend developer with React and TypeScript", 1)
+        return added, again, data, frontend
+
+    added, again, data, frontend = asyncio.run(run())
+    assert (added, again) == (3, 0)  # Already indexed resumes are skipped
+    assert data[0][0] == resume_ids["data"] and len(data) == 2
+    assert frontend == [(resume_ids["frontend"], pytest.approx(frontend[0][1]))]
+    assert resume_index.stats()["vectors"] == 3
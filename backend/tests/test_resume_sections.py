@@ -0,0 +1,79 @@
+# The single-pass resume segmenter: headers in any case, inline after a
+# colon, missing or repeated, and lines that only mention a header word,
+# checked against the sections a reader would mark by hand.
+#   python -m pytest tests/test_resume_sections.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from resume_sections import extract_education, extract_skills, extract_work_experience, segment_sections, section_text  # noqa: E402
+
+RESUMES = {
+    "mixed case": (
+        "Jane Doe\njane@example.com\n"
+        "PROFESSIONAL SUMMARY\nBackend engineer who likes queues\n"
+        "technical skills\nPython, Go, SQL\n"
+        "Work Experience\nAcme Corp Jan 2019 - Dec 2021\nExperience with Kafka and Flink at very large scale\n"
+        "EdUcAtIoN\nBSc Computer Science\n"
+    ),
+    "missing sections": (
+        "John Smith\nSkills: Java, Spring Boot, Docker\n"
+        "Employment history\nGlobex Feb 2020 - Mar 2023\nBuilt internal tools and improved the skills matrix\n"
+    ),
+    "repeated headers": (
+        "Skills\nPython\n"
+        "Projects\nSearch engine\n"
+        "Experience\nInitech Jan 2018 - Jan 2020\n"
+        "Projects\nChess bot\n"
+        "  • Skills & Tools\nTerraform, AWS\n"
+        "Certifications\nCKA\n"
+    ),
+    "no headers": "Just a paragraph about a candidate with experience in Python and a degree in physics.",
+}
+
+# Each section's bodies, one list of (stripped, non-empty) lines per occurrence
+EXPECTED_SECTIONS = {
+    "mixed case": {
+        "summary": [["Backend engineer who likes queues"]],
+        "skills": [["Python, Go, SQL"]],
+        # A long line that starts with a header word is body text, not a header
+        "experience": [["Acme Corp Jan 2019 - Dec 2021", "Experience with Kafka and Flink at very large scale"]],
+        "education": [["BSc Computer Science"]],
+    },
+    "missing sections": {
+        "skills": [["Java, Spring Boot, Docker"]],
+        "experience": [["Globex Feb 2020 - Mar 2023", "Built internal tools and improved the skills matrix"]],
+    },
+    "repeated headers": {
+        "skills": [["Python"], ["Terraform, AWS"]],
+        "projects": [["Search engine"], ["Chess bot"]],
+        "experience": [["Initech Jan 2018 - Jan 2020"]],
+        "certifications": [["CKA"]],
+    },
+    "no headers": {},
+}
+
+
+def lines(body):
+    return [line.strip() for line in body.split("\n") if line.strip()]
+
+
+@pytest.mark.parametrize("resume", RESUMES)
+def test_sections_are_the_ones_marked_by_hand(resume):
+    text = RESUMES[resume]
+    found = {name: [lines(text[start:end]) for start, end in spans] for name, spans in segment_sections(text).items()}
+    assert found == EXPECTED_SECTIONS[resume]
+
+
+def test_extractors_read_their_sections():
+    text = RESUMES["repeated headers"]
+    assert section_text(text, segment_sections(text), "projects").split() == ["Search", "engine", "Chess", "bot"]
+    assert extract_skills(text) == ["Python", "Terraform", "AWS"]
+    assert extract_education(RESUMES["mixed case"]) == "BSc Computer Science"
+    assert extract_education(RESUMES["missing sections"]) == "Education section not found in resume."
+    assert extract_skills(RESUMES["missing sections"]) == ["Java", "Spring Boot", "Docker"]
+    assert extract_skills(RESUMES["no headers"]) == ["No skills found"]
+    assert extract_work_experience(RESUMES["mixed case"]) == 3.0  # Jan 2019 - Dec 2021
@@ -0,0 +1,122 @@
+# Semantic skill matching with a deterministic stand-in encoder: nearest
+# vocabulary skills, one embedding call per batch, and the skill
+# dictionary's caching and fallback around it.
+#   python -m pytest tests/test_semantic_matching.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import semantic_matching  # noqa: E402
+from embeddings import EmbeddingError, HashingEncoder, LocalEmbedder  # noqa: E402
+from fuzzy_matching import FuzzySkillIndex  # noqa: E402
+from semantic_matching import SemanticSkillIndex  # noqa: E402
+from skill_dictionary import SkillDictionary  # noqa: E402
+from skill_taxonomy import SkillTaxonomy  # noqa: E402
+from sqlite_repository import SQLiteRepository  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+# What a real model knows and bag-of-words hashing doesn't
+SYNONYMS = {"psql": "postgresql", "container orchestration": "kubernetes", "k8 clusters": "kubernetes"}
+
+
+class SynonymEncoder(HashingEncoder):
+    def encode(self, texts):
+        rewritten = []
+        for text in texts:
+            text = text.lower()
+            for phrase, canonical in SYNONYMS.items():
+                text = text.replace(phrase, canonical)
+            rewritten.append(text)
+        return super().encode(rewritten)
+
+
+class CountingEmbedder(LocalEmbedder):
+    def __init__(self, encoder):
+        super().__init__(encoder)
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(len(texts))
+        return await super().embed(texts)
+
+
+class DownEmbedder(LocalEmbedder):
+    async def embed(self, texts):
+        raise EmbeddingError("embedding server not running")
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    return SkillTaxonomy.from_csv(os.path.join(BACKEND_DIR, "RoleSkills.csv"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "skills.db"))
+    asyncio.run(repository.ensure_indexes())
+    yield repository.skill_dictionary
+    asyncio.run(repository.close())
+
+
+def test_nearest_skills_with_one_embedding_call_per_batch(taxonomy):
+    embedder = CountingEmbedder(SynonymEncoder())
+    index = SemanticSkillIndex(taxonomy.names, embedder, threshold=0.5, top_k=2)
+
+    async def run():
+        first = await index.match(["psql", "Container orchestration", "underwater basket weaving"])
+        second = await index.match(["k8 clusters"])
+        return first, second
+
+    (psql, orchestration, unrelated), (k8,) = asyncio.run(run())
+    postgres, kubernetes = taxonomy.resolve("PostgreSQL"), taxonomy.resolve("Kubernetes")
+    assert postgres in psql and kubernetes in orchestration and kubernetes in k8
+    assert unrelated == set()
+    assert len(psql) <= 2
+    assert embedder.calls == [len(taxonomy.names), 3, 1]  # Vocabulary once, then one call per batch
+    assert index.version == f"sem-{embedder.model_id}-0.5-k2"
+
+
+def test_dictionary_adds_semantic_matches_and_caches_them(taxonomy, store):
+    fuzzy = FuzzySkillIndex(taxonomy.names)
+    embedder = CountingEmbedder(SynonymEncoder())
+    dictionary = SkillDictionary(store, taxonomy, fuzzy, SemanticSkillIndex(taxonomy.names, embedder, threshold=0.5))
+    plain = SkillDictionary(store, taxonomy, fuzzy)
+    postgres = taxonomy.resolve("PostgreSQL")
+
+    async def run():
+        first, version = await dictionary.lookup_many(["PSQL", "Python"])
+        calls_after_first = len(embedder.calls)
+        again, _ = await dictionary.lookup_many(["psql ", "python"])
+        without, _ = await plain.lookup_many(["psql"])
+        return first, version, again, calls_after_first, without
+
+    first, version, again, calls_after_first, without = asyncio.run(run())
+    assert postgres in first["psql"] and taxonomy.resolve("Python") in first["python"]
+    assert again == first and len(embedder.calls) == calls_after_first  # Served from the per-string cache
+    assert postgres not in without["psql"]  # Fuzzy alone misses it
+    assert version == dictionary.version and dictionary.version.startswith(plain.version + "-sem-")
+    assert dictionary.stats()["semantic"]["strings"] == 2
+
+
+def test_dictionary_falls_back_to_exact_and_fuzzy_while_the_embedder_is_down(taxonomy, store, monkeypatch):
+    monkeypatch.setattr(semantic_matching, "SEMANTIC_RETRY_SECONDS", 3600)
+    index = SemanticSkillIndex(taxonomy.names, DownEmbedder(HashingEncoder()))
+    dictionary = SkillDictionary(store, taxonomy, FuzzySkillIndex(taxonomy.names), index)
+
+    async def run():
+        first, version = await dictionary.lookup_many(["Python", "psql"])
+        second, _ = await dictionary.lookup_many(["Python"])
+        return first, version, second
+
+    first, version, second = asyncio.run(run())
+    assert first["python"] == [taxonomy.resolve("Python")]
+    assert first["psql"] == dictionary.match(["psql"]) and taxonomy.resolve("PostgreSQL") not in first["psql"]
+    assert second == {"python": first["python"]}
+    assert version == dictionary.version == dictionary.base_version  # The answers are exact and fuzzy only
+    assert index.stats()["failures"] == 1  # Not retried until SEMANTIC_RETRY_SECONDS pass
+    assert dictionary.memory_hits == 1
@@ -0,0 +1,52 @@
+# Aho-Corasick skill matcher: whole-token matching around punctuation
+# ("C++", "C#", "Node.js"), overlapping skills, and skills at the very end
+# of the text.
+#   python -m pytest tests/test_skill_matcher.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from skill_matcher import SkillMatch, SkillMatcher  # noqa: E402
+
+VOCABULARY = ["C", "C++", "C#", "Node.js", "Node", "Java", "JavaScript", "React", "React Native", ".NET", "Go",
+              "SQL", "PostgreSQL"]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher(VOCABULARY)
+
+
+def test_c_family_is_told_apart(matcher):
+    assert matcher.find_all("C, C++ and C#.") == [SkillMatch(0, 1, "C"), SkillMatch(3, 6, "C++"), SkillMatch(11, 13, "C#")]
+    assert matcher.extract("Modern C++17 and C# 12") == ["C#"]  # "C++17" is one token
+    assert matcher.extract("Embedded c++ (and some c#)") == ["C++", "C#"]
+
+
+def test_node_js(matcher):
+    found = matcher.find_all("Built APIs in node.js and Node")
+    assert SkillMatch(14, 21, "Node.js") in found
+    assert matcher.extract("Built APIs in node.js and Node") == ["Node", "Node.js"]
+    assert matcher.extract("Node.jsx") == ["Node"]  # Node.js must end the token
+    assert matcher.extract("ASP.NET and .NET") == [".NET"]
+
+
+def test_overlapping_skills_are_all_reported(matcher):
+    assert matcher.find_all("React Native and React") == [
+        SkillMatch(0, 5, "React"), SkillMatch(0, 12, "React Native"), SkillMatch(17, 22, "React")]
+    assert matcher.extract("Java, JavaScript") == ["Java", "JavaScript"]
+    assert matcher.extract("PostgreSQL") == ["PostgreSQL"]  # SQL sits inside a longer word
+
+
+@pytest.mark.parametrize("text, skill", [("knows Go", "Go"), ("ships C++", "C++"), ("C#", "C#"), ("uses node.js", "Node.js")])
+def test_skill_at_the_end_of_the_text(matcher, text, skill):
+    assert matcher.find_all(text)[-1] == SkillMatch(len(text) - len(skill), len(text), skill)
+
+
+def test_compiled_matcher_gives_the_same_matches(matcher):
+    compiled = SkillMatcher.from_compiled(**matcher.to_compiled())
+    text = "C, C++ and C# with React Native on Node.js; SQL and Go"
+    assert compiled.find_all(text) == matcher.find_all(text)
@@ -0,0 +1,57 @@
+# Same check as test_query_plans.py for the embedded backend: every hot query
+# in sqlite_repository.SQL must be answered from an index, and the ordered
+# ones must not sort (no temp B-tree). Runs against a temporary file.
+#   python -m pytest tests/test_sqlite_query_plans.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlite_repository import SQL, SQLiteRepository  # noqa: E402
+
+PARAMS = {
+    "job": ("x",),
+    "leaderboard top": ("job", 20),
+    "leaderboard top, min_score": ("job", 50.0, 20),
+    "leaderboard page, ties": ("job", 50.0, "x", 21),
+    "leaderboard page, below": ("job", 50.0, 21),
+    "leaderboard page, first": ("job", 21),
+    "scoring batch": ("job", "", 1000),
+    "unscored": ("job", "v2", 1000),
+    "same file uploaded": ("h", "1"),
+    "resume by id": ("x",),
+    "resume text": ("x",),
+    "resume text batch": ("", 500),
+    "skill dictionary": ("v", "python"),
+    "claimable tasks": (0.0, 8),
+    "task": ("x",),
+    "tasks by status": ("done",),
+}
+
+
+@pytest.fixture(scope="module")
+def repository(tmp_path_factory):
+    repository = SQLiteRepository(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    asyncio.run(repository.ensure_indexes())
+    yield repository
+    asyncio.run(repository.close())
+
+
+def query_plan(repository, name):
+    return [row["detail"] for row in repository.database._call(
+        lambda c: c.execute(f"EXPLAIN QUERY PLAN {SQL[name]}", PARAMS[name]).fetchall()
+    )]
+
+
+def test_every_hot_query_is_checked():
+    assert set(PARAMS) == set(SQL)
+
+
+@pytest.mark.parametrize("name", sorted(SQL))
+def test_hot_query_uses_an_index(repository, name):
+    plan = query_plan(repository, name)
+    assert not [step for step in plan if step.startswith("SCAN")], f"{name} does a table scan: {plan}"
+    assert not [step for step in plan if "TEMP B-TREE" in step], f"{name} sorts its results: {plan}"
@@ -0,0 +1,104 @@
+# Task queue semantics (leases, heartbeats, retries) against the SQLite
+# backend, which is also the local stand-in for MongoDB's queue.
+#   python -m pytest tests/test_task_queue.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlite_repository import SQLiteRepository  # noqa: E402
+from task_queue import TaskError, TaskWorker  # noqa: E402
+
+
+@pytest.fixture
+def tasks(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "tasks.db"))
+    asyncio.run(repository.ensure_indexes())
+    yield repository.tasks
+    asyncio.run(repository.close())
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_claims_are_exclusive_and_in_order(tasks):
+    task_ids = run(tasks.enqueue_many("echo", [({"n": n}, None) for n in range(5)]))
+    first = run(tasks.claim("a", 3, lease_seconds=60))
+    second = run(tasks.claim("b", 3, lease_seconds=60))
+    assert [task["_id"] for task in first] == task_ids[:3]
+    assert [task["_id"] for task in second] == task_ids[3:]
+    assert run(tasks.claim("c", 3, lease_seconds=60)) == []
+    assert run(tasks.counts())["running"] == 5
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_finish(tasks):
+    [task_id] = run(tasks.enqueue_many("echo", [({}, b"file")]))
+    [task] = run(tasks.claim("a", 1, lease_seconds=0))
+    assert task["data"] == b"file"
+    [task] = run(tasks.claim("b", 1, lease_seconds=60))
+    assert task["attempts"] == 2
+    assert not run(tasks.finish(task_id, "a", "done", result={}))
+    assert run(tasks.extend_leases([task_id], "a", 60)) == []
+    assert run(tasks.extend_leases([task_id], "b", 60)) == [task_id]
+    assert run(tasks.finish(task_id, "b", "done", result={"ok": True}))
+    stored = run(tasks.get(task_id))
+    assert stored["status"] == "done" and stored["result"] == {"ok": True} and "data" not in stored
+
+
+def test_worker_records_results_retries_and_failures(tasks):
+    calls = []
+
+    async def handler(batch):
+        calls.append(len(batch))
+        outcomes = []
+        for task in batch:
+            if task["args"]["n"] == 1:
+                outcomes.append(TaskError("bad input"))
+            elif task["args"]["n"] == 2:
+                outcomes.append(RuntimeError("database hiccup"))
+            else:
+                outcomes.append({"n": task["args"]["n"]})
+        return outcomes
+
+    ids = run(tasks.enqueue_many("echo", [({"n": n}, None) for n in range(3)]))
+    run(tasks.enqueue_many("unknown", [({}, None)]))
+    worker = TaskWorker(tasks, {"echo": handler}, batch_size=10, max_attempts=2)
+
+    async def drain():
+        await worker.run_once()
+        # Skip the backoff instead of waiting for it
+        await tasks.database.run(lambda c: c.execute("UPDATE tasks SET available_at = 0 WHERE status = 'queued'"))
+        await worker.run_once()
+
+    run(drain())
+    statuses = {task_id: run(tasks.get(task_id)) for task_id in ids}
+    assert statuses[ids[0]]["status"] == "done" and statuses[ids[0]]["result"] == {"n": 0}
+    assert statuses[ids[1]]["status"] == "failed" and statuses[ids[1]]["error"] == "bad input"
+    assert statuses[ids[2]]["status"] == "failed" and statuses[ids[2]]["attempts"] == 2
+    assert run(tasks.counts()) == {"queued": 0, "running": 0, "done": 1, "failed": 3}
+    assert calls == [3, 1]
+    assert worker.stats()["retried"] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_workers_get_their_own_worker_id(tasks):
+    # serve.py builds the app's workers in the parent and forks them
+    worker = TaskWorker(tasks, {})
+    named = TaskWorker(tasks, {}, worker_id="named")
+    parent_id = worker.worker_id
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, f"{worker.worker_id}\n{named.worker_id}".encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    os.close(write_fd)
+    child_id, child_named = os.read(read_fd, 1024).decode().split("\n")
+    os.close(read_fd)
+    assert child_id != parent_id and str(pid) in child_id
+    assert child_named == "named"
+    assert worker.worker_id == parent_id
@@ -0,0 +1,71 @@
+# The warm-start artifact must reproduce exactly what building from the
+# sources gives: same taxonomy, same matches, same token counts.
+#   python -m pytest tests/test_warm_start.py
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+import warm_start  # noqa: E402
+from skill_taxonomy import SkillTaxonomy  # noqa: E402
+
+TEXT = """Senior engineer: Python, C++, C#, .NET, Node.js and React Native on AWS (k8s, Golang).
+Built REST APIs with Postgres; some JavaScript, no Java. Scikit-learn / sklearn for ML."""
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("warm_start") / "warm_start.bin")
+    warm_start.build(path, os.path.join(BACKEND_DIR, "RoleSkills.csv"), os.path.join(BACKEND_DIR, "token_dist.json"))
+    return warm_start.WarmStart(path)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return SkillTaxonomy.from_csv(os.path.join(BACKEND_DIR, "RoleSkills.csv"))
+
+
+def test_taxonomy_round_trips(artifact, reference):
+    taxonomy = artifact.taxonomy()
+    assert taxonomy.version == reference.version == artifact.header["taxonomy_version"]
+    assert taxonomy.names == reference.names
+    assert taxonomy.surface_forms == reference.surface_forms
+    assert taxonomy.roles == reference.roles
+    for spelling in ["Postgres", "ReactJS", "react.js", "K8s", "not a skill"]:
+        assert taxonomy.resolve(spelling) == reference.resolve(spelling)
+
+
+def test_mapped_matcher_finds_the_same_skills(artifact, reference):
+    matcher = artifact.matcher()
+    assert matcher.find_all(TEXT) == reference.matcher.find_all(TEXT)
+    assert artifact.taxonomy().extract_ids(TEXT) == reference.extract_ids(TEXT)
+
+
+def test_token_counts(artifact):
+    with open(os.path.join(BACKEND_DIR, "token_dist.json"), encoding="utf-8") as f:
+        token_dist = json.load(f)
+    stats = artifact.token_stats()
+    assert len(stats) == len(token_dist)
+    assert all(stats.count(token) == count for token, count in token_dist.items())
+    assert stats.count("no-such-token") == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_an_artifact.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        warm_start.WarmStart(str(path))
+
+
+@pytest.mark.parametrize("module", ["skill_taxonomy", "skill_matcher"])
+def test_stale_once_the_code_that_builds_it_changes(artifact, tmp_path, monkeypatch, module):
+    sources = (os.path.join(BACKEND_DIR, "RoleSkills.csv"), os.path.join(BACKEND_DIR, "token_dist.json"))
+    assert artifact.is_current(*sources)
+    edited = tmp_path / f"{module}.py"
+    edited.write_text(open(getattr(warm_start, module).__file__, encoding="utf-8").read() + "\n# Edited\n")
+    monkeypatch.setattr(getattr(warm_start, module), "__file__", str(edited))
+    assert not artifact.is_current(*sources)
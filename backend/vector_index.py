@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_store import LOCK_EX, LOCK_SH, SCORE_CHUNK, flock, open_record_file, quantize
+from embeddings import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# ✅ Vector index settings (overridable per deployment)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "vector_index")
+VECTOR_INDEX_LISTS = int(os.getenv("VECTOR_INDEX_LISTS", "1024"))
+VECTOR_INDEX_PROBES = int(os.getenv("VECTOR_INDEX_PROBES", "16"))
+
+MAGIC = b"RSIVF\0\0\0"
+FORMAT_VERSION = 1
+HEADER_SIZE = 256
+ID_BYTES = 12  # An ObjectId
+
+# Vectors per list the index holds before the lists are trained (until then, search is exact)
+TRAIN_PER_LIST = 32
+KMEANS_ITERATIONS = 10
+
+# Rows assigned to lists at a time (bounds the temporary rows x lists score matrix)
+ASSIGN_CHUNK = 8192
+
+# Rows added since the lists were last grouped that search scans as a flat tail before regrouping
+MIN_REGROUP_TAIL = 4096
+
+
+def nearest_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """The list (nearest centroid by dot product) of each vector."""
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        lists[start:start + ASSIGN_CHUNK] = np.argmax(vectors[start:start + ASSIGN_CHUNK] @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(vectors: np.ndarray, lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: `lists` L2-normalized centroids for normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assigned = nearest_lists(vectors, centroids)
+        counts = np.bincount(assigned, minlength=lists)
+        sums = np.zeros_like(centroids)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+        sums[filled] = np.add.reduceat(vectors[np.argsort(assigned, kind="stable")], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]  # Re-seed empty lists
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index over one model's L2-normalized
+    vectors, each under a 12-byte ID (a resume's ObjectId).
+
+    An inverted file: the vectors are clustered into `lists` cells by
+    spherical k-means, and a query scores only the vectors in its `probes`
+    nearest cells, so search cost grows with probes/lists of the corpus
+    rather than all of it. Until it holds TRAIN_PER_LIST vectors per list,
+    the index is flat and search is exact; the lists are trained once, on
+    the vectors held at that point.
+
+    Vectors are stored like in EmbeddingStore: int8 with a float32 scale, in
+    an append-only file of fixed-size records that every worker on the box
+    memory-maps, with appends under an exclusive flock. Records carry their
+    list, so opening the index never re-clusters it. Adding an ID again
+    replaces its vector (the older record is skipped by search).
+    """
+
+    def __init__(self, model_id: str, dim: int, directory: str = VECTOR_INDEX_DIR,
+                 lists: int = VECTOR_INDEX_LISTS, probes: int = VECTOR_INDEX_PROBES):
+        self.model_id = model_id
+        self.dim = dim
+        self.lists = lists
+        self.probes = min(probes, lists)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)[:64]
+        base = os.path.join(directory, f"{slug}-{hashlib.sha1(model_id.encode('utf-8')).hexdigest()[:8]}-l{lists}")
+        self.path = base + ".ivf"
+        self.centroids_path = base + ".centroids.npy"
+        self.record = np.dtype([("id", f"V{ID_BYTES}"), ("list", "<i4"), ("scale", "<f4"), ("vector", "i1", (dim,))])
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None  # Opened on first use (after any fork)
+        self._map: Optional[mmap.mmap] = None
+        self._records = np.zeros(0, dtype=self.record)
+        self._centroids: Optional[np.ndarray] = None
+        self._assigned = np.zeros(0, dtype=np.int32)  # List of every row
+        self._live = np.zeros(0, dtype=bool)  # False for rows whose ID was added again later
+        self._rows = {}  # ID -> latest row
+        # Rows [0, _grouped) sorted by list, list p's at _order[_offsets[p]:_offsets[p + 1]]; later rows are the tail
+        self._order = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(lists + 1, dtype=np.int64)
+        self._grouped = 0
+        self.searches = 0
+        self.search_seconds = 0.0
+
+    # ✅ File
+    def _header(self) -> bytes:
+        meta = json.dumps({"model_id": self.model_id, "dim": self.dim, "lists": self.lists}).encode("utf-8")
+        header = MAGIC + struct.pack("<II", FORMAT_VERSION, len(meta)) + meta
+        if len(header) > HEADER_SIZE:
+            raise ValueError(f"Model id too long: {self.model_id}")
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _file(self) -> int:
+        if self._fd is None:
+            self._fd = open_record_file(self.path, self._header())
+        return self._fd
+
+    def _stale(self) -> bool:
+        count = (os.fstat(self._fd).st_size - HEADER_SIZE) // self.record.itemsize
+        return count > len(self._records) or (self._centroids is None and os.path.exists(self.centroids_path))
+
+    def _refresh(self):
+        """Maps and indexes rows appended since the last look, and lists trained meanwhile (caller holds the flock)."""
+        count = (os.fstat(self._fd).st_size - HEADER_SIZE) // self.record.itemsize
+        start = len(self._records)
+        if count > start:
+            # Earlier maps stay alive while arrays handed out still point into them
+            self._map = mmap.mmap(self._fd, HEADER_SIZE + count * self.record.itemsize, access=mmap.ACCESS_READ)
+            self._records = np.frombuffer(self._map, dtype=self.record, count=count, offset=HEADER_SIZE)
+            live = np.concatenate([self._live, np.ones(count - start, dtype=bool)])
+            ids = self._records["id"][start:].tobytes()
+            for i in range(count - start):
+                key = ids[i * ID_BYTES:(i + 1) * ID_BYTES]
+                previous = self._rows.get(key)
+                if previous is not None:
+                    live[previous] = False
+                self._rows[key] = start + i
+            self._live = live
+            self._assigned = np.concatenate([self._assigned, self._records["list"][start:]])
+        if self._centroids is None and os.path.exists(self.centroids_path):
+            self._centroids = np.load(self.centroids_path)
+            self._grouped = 0
+        if self._centroids is not None:
+            # Rows written before the lists were trained
+            untrained = np.flatnonzero(self._assigned < 0)
+            if len(untrained):
+                self._assigned = self._assigned.copy()
+                self._assigned[untrained] = nearest_lists(self._dequantize(untrained), self._centroids)
+            if len(self._records) - self._grouped > max(MIN_REGROUP_TAIL, len(self._records) // 16):
+                self._order = np.argsort(self._assigned, kind="stable").astype(np.int64)
+                self._offsets = np.searchsorted(self._assigned[self._order], np.arange(self.lists + 1))
+                self._grouped = len(self._records)
+
+    def _dequantize(self, rows: np.ndarray) -> np.ndarray:
+        return self._records["vector"][rows].astype(np.float32) * self._records["scale"][rows][:, None]
+
+    def _train(self, vectors: np.ndarray):
+        """Clusters the held vectors plus `vectors` (about to be added) into lists (caller holds the exclusive flock)."""
+        started = time.perf_counter()
+        held = self._dequantize(np.arange(len(self._records)))
+        centroids = train_centroids(np.concatenate([held, vectors]), self.lists)
+        temporary = f"{self.centroids_path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.save(f, centroids)
+        os.replace(temporary, self.centroids_path)
+        logger.info(f"✅ Trained {self.lists} vector index lists on {len(held) + len(vectors)} vectors "
+                    f"in {time.perf_counter() - started:.1f}s")
+
+    # ✅ Updates
+    def add(self, ids: Sequence[bytes], vectors: np.ndarray):
+        """Adds (or replaces) the vectors of the given IDs."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}, got {vectors.shape}")
+        if not len(ids):
+            return
+        with self._lock:
+            fd = self._file()
+            with flock(fd, LOCK_EX):
+                self._refresh()
+                if self._centroids is None and len(self._records) + len(ids) >= self.lists * TRAIN_PER_LIST:
+                    self._train(vectors)
+                    self._refresh()
+                codes, scales = quantize(vectors)
+                block = np.zeros(len(ids), dtype=self.record)
+                block["id"] = np.frombuffer(b"".join(ids), dtype=f"V{ID_BYTES}")
+                block["list"] = nearest_lists(vectors, self._centroids) if self._centroids is not None else -1
+                block["scale"] = scales
+                block["vector"] = codes
+                # At the end of the last whole record, overwriting any torn write of a crashed worker
+                os.pwrite(fd, block.tobytes(), HEADER_SIZE + len(self._records) * self.record.itemsize)
+                self._refresh()
+
+    def contains(self, ids: Sequence[bytes]) -> np.ndarray:
+        """Whether each ID is in the index."""
+        with self._lock:
+            self._sync()
+            return np.array([key in self._rows for key in ids], dtype=bool)
+
+    def _sync(self):
+        fd = self._file()
+        if self._stale():
+            with flock(fd, LOCK_SH):
+                self._refresh()
+
+    # ✅ Search
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.arange(len(self._records))
+        probes = np.argpartition(-(self._centroids @ query), self.probes - 1)[:self.probes]
+        parts = [self._order[self._offsets[p]:self._offsets[p + 1]] for p in probes]
+        tail = np.arange(self._grouped, len(self._records))
+        parts.append(tail[np.isin(self._assigned[self._grouped:], probes)])
+        return np.sort(np.concatenate(parts))  # In file order: fewer pages touched
+
+    def search(self, query: np.ndarray, top_n: int) -> Tuple[List[bytes], np.ndarray]:
+        """
+        The IDs of the (approximately) `top_n` nearest vectors to a
+        normalized float32 query, nearest first, with their dot products.
+        """
+        started = time.perf_counter()
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            self._sync()
+            rows = self._candidates(query)
+            rows = rows[self._live[rows]]
+            records = self._records
+        vectors, scales = records["vector"], records["scale"]
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SCORE_CHUNK):
+            chunk = rows[start:start + SCORE_CHUNK]
+            scores[start:start + len(chunk)] = (vectors[chunk].astype(np.float32) @ query) * scales[chunk]
+        k = min(top_n, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - started
+        return [records["id"][row].tobytes() for row in rows[top]], scores[top]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def stats(self) -> dict:
+        return {
+            "model_id": self.model_id,
+            "vectors": len(self._rows),
+            "records": len(self._records),
+            "bytes": HEADER_SIZE + len(self._records) * self.record.itemsize,
+            "lists": self.lists if self._centroids is not None else None,
+            "probes": self.probes,
+            "searches": self.searches,
+            "mean_search_ms": round(self.search_seconds * 1000 / self.searches, 3) if self.searches else 0.0,
+        }
@@ -0,0 +1,239 @@
+"""
+Prebuilt warm-start artifact: the skill taxonomy, alias table, compiled
+skill matcher, stopwords and token_dist.json statistics in one versioned
+binary file, built once at deploy time:
+
+    python warm_start.py            (from backend/; writes WARM_START_PATH)
+
+Workers memory-map it read-only instead of rebuilding everything at
+startup. The big flat arrays (the matcher's transition table, the token
+statistics) are used straight from the mapping, so every worker on the box
+shares the same page-cache pages for them.
+
+Layout: MAGIC, then a little-endian uint32 header length, then a JSON header
+(format version, source digests, section table), then the sections, each
+8-byte aligned. The artifact is only used while the digests of its sources
+(RoleSkills.csv, token_dist.json, and the skill_taxonomy and skill_matcher
+modules that build the taxonomy, aliases and matcher from them) still
+match; otherwise workers fall back to building from the sources.
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional
+
+import skill_matcher
+import skill_taxonomy
+from skill_matcher import SkillMatcher
+from skill_taxonomy import SkillTaxonomy
+
+logger = logging.getLogger(__name__)
+
+# ✅ Where the artifact lives (built by `python warm_start.py`)
+WARM_START_PATH = os.getenv("WARM_START_PATH", "warm_start.bin")
+
+MAGIC = b"RSWARM\0\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+SKILLS_CSV = "RoleSkills.csv"
+TOKEN_DIST_JSON = "token_dist.json"
+
+# int32 arrays of the compiled matcher
+MATCHER_ARRAYS = ("pattern_lengths", "delta", "out_start", "out_ids")
+
+
+def source_digests(csv_path: str = SKILLS_CSV, token_dist_path: str = TOKEN_DIST_JSON) -> Dict[str, str]:
+    """
+    Digests of everything the artifact is built from: the data files, and
+    the code that turns them into what it stores. The taxonomy's version only
+    covers the CSV and aliases, so a change to how names are normalized or
+    split, or to the compiled matcher's layout, would otherwise go unnoticed.
+    """
+    def file_digest(path):
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    return {
+        "skills_csv": file_digest(csv_path),
+        "token_dist": file_digest(token_dist_path),
+        "skill_taxonomy.py": file_digest(skill_taxonomy.__file__),  # SKILL_ALIASES, normalize_skill, split_skill_entries
+        "skill_matcher.py": file_digest(skill_matcher.__file__),
+    }
+
+
+def _installed_stopwords() -> Optional[list]:
+    try:
+        from nltk.corpus import stopwords
+        return sorted(stopwords.words("english"))
+    except (ImportError, LookupError):
+        return None
+
+
+def build(path: str = WARM_START_PATH, csv_path: str = SKILLS_CSV, token_dist_path: str = TOKEN_DIST_JSON) -> dict:
+    """Builds the artifact from its sources and atomically replaces `path`; returns its header."""
+    taxonomy = SkillTaxonomy.from_csv(csv_path)
+    compiled = taxonomy.matcher.to_compiled()
+    with open(token_dist_path, encoding="utf-8") as f:
+        token_dist = json.load(f)
+    tokens = sorted(token_dist)
+    if any("\n" in token for token in tokens):
+        raise ValueError(f"{token_dist_path}: tokens may not contain newlines")
+    stopwords = _installed_stopwords()
+    if stopwords is None:
+        logger.warning("⚠ NLTK stopwords are not installed; building the artifact without them")
+
+    token_blob = "\n".join(tokens).encode("utf-8")
+    token_offsets = array("I", [0])
+    for token in tokens:
+        token_offsets.append(token_offsets[-1] + len(token.encode("utf-8")) + 1)
+
+    sections = {
+        "taxonomy": json.dumps(taxonomy.to_state()).encode("utf-8"),
+        "matcher": json.dumps({"skills": compiled["skills"], "classes": compiled["classes"]}).encode("utf-8"),
+        **{f"matcher.{name}": array("i", compiled[name]).tobytes() for name in MATCHER_ARRAYS},
+        "token_dist.tokens": token_blob,
+        "token_dist.offsets": token_offsets.tobytes(),
+        "token_dist.counts": array("I", (token_dist[token] for token in tokens)).tobytes(),
+    }
+    if stopwords is not None:
+        sections["stopwords"] = "\n".join(stopwords).encode("utf-8")
+
+    # Section offsets are relative to the end of the header, so they don't depend on its length
+    table, offset = {}, 0
+    for name, data in sections.items():
+        table[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % ALIGNMENT)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "taxonomy_version": taxonomy.version,
+        "sources": source_digests(csv_path, token_dist_path),
+        "built_at": time.time(),
+        "sections": table,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGNMENT)
+
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for data in sections.values():
+            f.write(data + b"\0" * (-len(data) % ALIGNMENT))
+    os.replace(temp_path, path)
+    return header
+
+
+class WarmStart:
+    """A read-only, memory-mapped warm-start artifact."""
+
+    def __init__(self, path: str = WARM_START_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a warm-start artifact")
+        (header_length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        body = len(MAGIC) + 4
+        self.header = json.loads(self._map[body:body + header_length])
+        if self.header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {self.header['format_version']}, expected {FORMAT_VERSION}")
+        self._base = body + header_length
+        self._view = memoryview(self._map)
+
+    def has(self, name: str) -> bool:
+        return name in self.header["sections"]
+
+    def section(self, name: str) -> memoryview:
+        """A zero-copy view of one section."""
+        offset, length = self.header["sections"][name]
+        start = self._base + offset
+        return self._view[start:start + length]
+
+    def is_current(self, csv_path: str = SKILLS_CSV, token_dist_path: str = TOKEN_DIST_JSON) -> bool:
+        return self.header["sources"] == source_digests(csv_path, token_dist_path)
+
+    def matcher(self) -> SkillMatcher:
+        compiled = json.loads(self.section("matcher").tobytes())
+        arrays = {name: self.section(f"matcher.{name}").cast("i") for name in MATCHER_ARRAYS}
+        return SkillMatcher.from_compiled(compiled["skills"], compiled["classes"], **arrays)
+
+    def taxonomy(self) -> SkillTaxonomy:
+        return SkillTaxonomy.from_state(json.loads(self.section("taxonomy").tobytes()), self.matcher())
+
+    def stopwords(self) -> Optional[FrozenSet[str]]:
+        if not self.has("stopwords"):
+            return None
+        return frozenset(self.section("stopwords").tobytes().decode("utf-8").split("\n"))
+
+    def token_stats(self) -> "TokenStats":
+        return TokenStats(self.section("token_dist.tokens"), self.section("token_dist.offsets").cast("I"),
+                          self.section("token_dist.counts").cast("I"))
+
+
+class TokenStats:
+    """
+    token_dist.json counts, looked up by binary search over the sorted,
+    memory-mapped token list (nothing is copied into a per-worker dict).
+    """
+
+    def __init__(self, tokens: memoryview, offsets: memoryview, counts: memoryview):
+        self._tokens = tokens
+        self._offsets = offsets
+        self._counts = counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _token(self, index: int) -> bytes:
+        return self._tokens[self._offsets[index]:self._offsets[index + 1] - 1].tobytes()
+
+    def count(self, token: str) -> int:
+        """How often `token` occurs in the corpus (0 if never)."""
+        key = token.encode("utf-8")
+        index = bisect.bisect_left(range(len(self)), key, key=self._token)
+        return self._counts[index] if index < len(self) and self._token(index) == key else 0
+
+
+@lru_cache(maxsize=None)
+def shared() -> Optional[WarmStart]:
+    """This process's mapping of WARM_START_PATH, if it exists and is built from the current sources."""
+    if not os.path.exists(WARM_START_PATH):
+        return None
+    try:
+        artifact = WarmStart(WARM_START_PATH)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠ Ignoring warm-start artifact {WARM_START_PATH}: {e}")
+        return None
+    if not artifact.is_current():
+        logger.warning(f"⚠ Warm-start artifact {WARM_START_PATH} is stale; rebuild it with `python warm_start.py`")
+        return None
+    return artifact
+
+
+def load_taxonomy(csv_path: str = SKILLS_CSV) -> SkillTaxonomy:
+    """The skill taxonomy from the warm-start artifact when it's current, else built from the CSV."""
+    artifact = shared() if csv_path == SKILLS_CSV else None
+    if artifact is not None:
+        taxonomy = artifact.taxonomy()
+        logger.info(f"✅ Skill taxonomy {taxonomy.version} loaded from {artifact.path}")
+        return taxonomy
+    return SkillTaxonomy.from_csv(csv_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the warm-start artifact")
+    parser.add_argument("--output", default=WARM_START_PATH)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    header = build(args.output)
+    size = os.path.getsize(args.output)
+    print(f"✅ Wrote {args.output}: taxonomy {header['taxonomy_version']}, {len(header['sections'])} sections, "
+          f"{size / 1024:.0f} KB in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,24 @@
+# Runs the background ingestion workers without serving HTTP, so queued
+# uploads can be drained by dedicated processes or nodes:
+#   INGEST_WORKERS=2 python worker.py      (from backend/)
+# API processes can then run with INGEST_WORKERS=0.
+import asyncio
+import signal
+
+from app import app, logger
+
+
+async def main():
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    # The app's own startup/shutdown hooks start the extraction pool, storage and workers
+    async with app.router.lifespan_context(app):
+        logger.info("✅ Ingestion worker process running (Ctrl+C to stop)")
+        await stopping.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
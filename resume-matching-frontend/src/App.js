@@ -6,12 +6,16 @@ const api = axios.create({
     baseURL: "http://127.0.0.1:8000",
 });
 
+// Candidates fetched per "Load more"
+const PAGE_SIZE = 20;
+
 function App() {
   const [jobTitle, setJobTitle] = useState("");
   const [jobDescription, setJobDescription] = useState("");
   const [resumeFile, setResumeFile] = useState(null);
   const [jobId, setJobId] = useState("");
   const [rankedCandidates, setRankedCandidates] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
 
   const handleError = (message, error) => {
@@ -39,6 +43,16 @@ function App() {
     }
   };
 
+  const waitForTask = async (taskId) => {
+    for (;;) {
+      const response = await api.get(`/tasks/${taskId}`);
+      if (response.data.status === "done" || response.data.status === "failed") {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const uploadResume = async () => {
     if (!resumeFile) {
       alert("Please select a file to upload.");
@@ -52,10 +66,16 @@ function App() {
     formData.append("file", resumeFile);
     setLoading(true);
     try {
-      await api.post(`/upload_resume/${jobId}`, formData, {
+      const response = await api.post(`/upload_resume/${jobId}`, formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      alert("Resume uploaded successfully!");
+      // Parsing happens in the background: poll the task until it settles
+      const task = await waitForTask(response.data.task_id);
+      if (task.status === "done") {
+        alert("Resume uploaded successfully!");
+      } else {
+        alert(`Resume could not be processed: ${task.error}`);
+      }
     } catch (error) {
       handleError("Failed to upload resume. Please try again.", error);
     } finally {
@@ -63,6 +83,20 @@ function App() {
     }
   };
 
+  // Fetches one page of the ranking; without a cursor it starts over from the top
+  const fetchRankingPage = async (cursor) => {
+    const params = { page_size: PAGE_SIZE };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    const { data } = await api.get(`/ranked_candidates/${jobId}`, { params });
+    console.log("Ranked candidates:", data.ranked_candidates);
+    setRankedCandidates((previous) =>
+      cursor ? [...previous, ...data.ranked_candidates] : data.ranked_candidates
+    );
+    setNextCursor(data.next_cursor);
+  };
+
   const rankResumes = async () => {
     if (!jobId) {
       alert("Please create a job first.");
@@ -70,9 +104,7 @@ function App() {
     }
     setLoading(true);
     try {
-      const { data } = await api.get(`/get_ranked_candidates_with_feedback/${jobId}`);
-      console.log("Ranked candidates:", data.ranked_candidates);
-      setRankedCandidates(data.ranked_candidates || []);
+      await fetchRankingPage(null);
     } catch (error) {
       handleError("Failed to rank resumes. Please check the backend.", error);
     } finally {
@@ -80,6 +112,24 @@ function App() {
     }
   };
 
+  const loadMoreCandidates = async () => {
+    setLoading(true);
+    try {
+      await fetchRankingPage(nextCursor);
+    } catch (error) {
+      if (error.response && error.response.status === 409) {
+        // The ranking changed since the first page: start over
+        await fetchRankingPage(null).catch((retryError) =>
+          handleError("Failed to rank resumes. Please check the backend.", retryError)
+        );
+      } else {
+        handleError("Failed to load more candidates. Please check the backend.", error);
+      }
+    } finally {
+      setLoading(false);
+    }
+  };
+
   return (
     <div style={{ padding: "20px", fontFamily: "Arial, sans-serif" }}>
       <h1>Job and Resume Matching</h1>
@@ -136,16 +186,16 @@ function App() {
                 <span style={{ fontWeight: "bold" }}>
                   Skills:
                 </span>{" "}
-                {candidate.skills.length > 0
-                  ? candidate.skills.join(", ")
+                {candidate.extracted_resume_skills.length > 0
+                  ? candidate.extracted_resume_skills.join(", ")
                   : "None"}
                 <br />
                 <span style={{ fontWeight: "bold", color: "red" }}>
                   Feedback:
                 </span>{" "}
-                {candidate.detailed_feedback ? (
+                {candidate.feedback ? (
                   <span style={{ color: "red" }}>
-                    {candidate.detailed_feedback}
+                    {candidate.feedback}
                   </span>
                 ) : (
                   <span>No improvements needed.</span>
@@ -155,6 +205,11 @@ function App() {
           ) : (
             <p>No ranked candidates yet.</p>
           )}
+          {nextCursor && (
+            <button onClick={loadMoreCandidates} disabled={loading}>
+              Load more
+            </button>
+          )}
         </div>
       </section>
     </div>